@@ -12,7 +12,7 @@ setup(
             'tiny-code=tiny_code.__main__:run_app',
         ],
     },
-    packages=find_packages(),
+    packages=find_packages(exclude=['tests']),
     package_data={'tiny_code': ['configs/*', 'styles/*']},
     python_requires='>=3.9',
     install_requires=[
@@ -0,0 +1,149 @@
+import random
+import unittest
+
+from tiny_code.outline import SymbolIndex, get_parser
+
+SOURCE = """import os
+
+
+class Reader:
+    def __init__(self, path):
+        self.path = path
+
+    def read(self):
+        with open(self.path) as file:
+            return file.read()
+
+
+@cache
+def load(path):
+    if os.path.exists(path):
+        def inner():
+            return Reader(path).read()
+
+        return inner()
+    return None
+
+
+def main():
+    try:
+        print(load('a'))
+    except OSError:
+        pass
+"""
+INSERTS = (
+    '\n    def method(self):\n        pass\n',
+    '\nclass Wrapper:\n',
+    '    def nested():\n',
+    '\n\n@decorator\ndef decorated():\n    return 1\n',
+    '\nif flag:\n    def branch(): pass\n',
+    '\n',
+    '    ',
+    '#',
+    ':',
+    '(',
+    '"',
+    'def ',
+    '',
+)
+
+
+def get_point(text: str, index: int) -> tuple[int, int]:
+    before = text[:index]
+    line_start = before.rfind('\n') + 1
+    return before.count('\n'), len(before[line_start:].encode('utf-8'))
+
+
+@unittest.skipIf(get_parser is None, 'tree_sitter_languages is not installed')
+class TestSymbolIndexUpdate(unittest.TestCase):
+    def test_update_matches_build(self) -> None:
+        """
+        After random edits the updated index has the symbols of an index
+        built from scratch, and it is built again when update gives up as the
+        editor does
+        """
+        parser = get_parser('python')
+        for seed in range(20):
+            generator = random.Random(seed)
+            text = SOURCE
+            tree = parser.parse(text.encode('utf-8'))
+            index = SymbolIndex.build(text=text, language='python', version=0)
+            for version in range(1, 60):
+                start = generator.randrange(len(text) + 1)
+                end = min(
+                    len(text), start + generator.choice((0, 0, 1, 5, 40))
+                )
+                inserted = generator.choice(INSERTS)
+                new_text = text[:start] + inserted + text[end:]
+                start_point = get_point(text=text, index=start)
+                old_end_point = get_point(text=text, index=end)
+                new_end_point = get_point(
+                    text=new_text, index=start + len(inserted)
+                )
+                start_byte = len(text[:start].encode('utf-8'))
+                tree.edit(
+                    start_byte=start_byte,
+                    old_end_byte=len(text[:end].encode('utf-8')),
+                    new_end_byte=start_byte + len(inserted.encode('utf-8')),
+                    start_point=start_point,
+                    old_end_point=old_end_point,
+                    new_end_point=new_end_point,
+                )
+                new_tree = parser.parse(new_text.encode('utf-8'), tree)
+                is_updated = index.update(
+                    root_node=new_tree.root_node,
+                    lines=new_text.split('\n'),
+                    start_row=start_point[0],
+                    old_end_row=old_end_point[0],
+                    new_end_row=new_end_point[0],
+                    changed_ranges=tree.changed_ranges(new_tree),
+                    version=version,
+                )
+                text, tree = new_text, new_tree
+                built_index = SymbolIndex.build(
+                    text=text, language='python', version=version
+                )
+                if is_updated:
+                    self.assertEqual(
+                        index.symbols,
+                        built_index.symbols,
+                        f'seed {seed}, edit {version}: {inserted!r} at '
+                        f'{start_point}',
+                    )
+                else:
+                    index = built_index
+
+    def test_update_keeps_the_symbols_below(self) -> None:
+        text = SOURCE
+        parser = get_parser('python')
+        tree = parser.parse(text.encode('utf-8'))
+        index = SymbolIndex.build(text=text, language='python', version=0)
+        inserted = 'def first():\n    pass\n\n\n'
+        new_text = inserted + text
+        tree.edit(
+            start_byte=0,
+            old_end_byte=0,
+            new_end_byte=len(inserted),
+            start_point=(0, 0),
+            old_end_point=(0, 0),
+            new_end_point=(4, 0),
+        )
+        new_tree = parser.parse(new_text.encode('utf-8'), tree)
+        self.assertTrue(
+            index.update(
+                root_node=new_tree.root_node,
+                lines=new_text.split('\n'),
+                start_row=0,
+                old_end_row=0,
+                new_end_row=4,
+                changed_ranges=tree.changed_ranges(new_tree),
+                version=1,
+            )
+        )
+        self.assertEqual(
+            index.symbols,
+            SymbolIndex.build(
+                text=new_text, language='python', version=1
+            ).symbols,
+        )
+        self.assertEqual(index.symbols[0][3:], ('def', 'first'))
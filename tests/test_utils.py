@@ -0,0 +1,180 @@
+from pathlib import Path
+import os
+import random
+import tempfile
+import unittest
+
+from tiny_code.utils import (
+    clear_dir,
+    closest_multiple_of,
+    comment_or_uncomment_text,
+    find_first_char_non_void,
+    tab_text,
+)
+
+SEEDS = range(200)
+BODIES = (
+    'x = 1',
+    'return value',
+    'if a and b:',
+    'print("#")',
+    '; not a comment for #',
+    'é = "ünïcode"',
+    '',
+    '   ',
+    '\t',
+)
+
+
+def generate_lines(
+    generator: random.Random, indents: tuple[str, ...], bodies: tuple[str, ...]
+) -> list[str]:
+    return [
+        generator.choice(indents) + generator.choice(bodies)
+        for _ in range(generator.randint(1, 30))
+    ]
+
+
+class TestIndentHelpers(unittest.TestCase):
+    def test_find_first_char_non_void(self) -> None:
+        for seed in SEEDS:
+            generator = random.Random(seed)
+            line = ''.join(
+                generator.choice(' \t\x0cx#é')
+                for _ in range(generator.randint(0, 20))
+            )
+            index = find_first_char_non_void(line)
+            self.assertEqual(line[:index].strip(), '', repr(line))
+            self.assertTrue(
+                index == len(line) or not line[index].isspace(), repr(line)
+            )
+
+    def test_closest_multiple_of(self) -> None:
+        for seed in SEEDS:
+            generator = random.Random(seed)
+            multiple_of = generator.randint(1, 16)
+            number = generator.randint(-1000, 1000)
+            up = closest_multiple_of(multiple_of, number, 'up')
+            down = closest_multiple_of(multiple_of, number, 'down')
+            self.assertEqual(up % multiple_of, 0)
+            self.assertEqual(down % multiple_of, 0)
+            self.assertTrue(0 <= up - number < multiple_of)
+            self.assertTrue(0 <= number - down < multiple_of)
+        with self.assertRaises(ValueError):
+            closest_multiple_of(0, 10, 'up')
+
+    def test_tab_then_shift_tab_restores_space_indented_text(self) -> None:
+        for seed in SEEDS:
+            generator = random.Random(seed)
+            tab_size = generator.randint(1, 8)
+            indents = tuple(' ' * (tab_size * level) for level in range(4))
+            text = '\n'.join(
+                generate_lines(
+                    generator=generator,
+                    indents=indents,
+                    bodies=tuple(body for body in BODIES if body.strip()),
+                )
+            )
+            tabbed_text = tab_text(text, 'tab', tab_size)
+            for line, tabbed_line in zip(
+                text.split('\n'), tabbed_text.split('\n')
+            ):
+                self.assertEqual(
+                    find_first_char_non_void(tabbed_line),
+                    find_first_char_non_void(line) + tab_size,
+                )
+            self.assertEqual(
+                tab_text(tabbed_text, 'shift+tab', tab_size), text
+            )
+
+    def test_tab_aligns_the_indent(self) -> None:
+        for seed in SEEDS:
+            generator = random.Random(seed)
+            tab_size = generator.randint(1, 8)
+            lines = generate_lines(
+                generator=generator,
+                indents=tuple(' ' * width for width in range(10)),
+                bodies=BODIES,
+            )
+            text = '\n'.join(lines)
+            for action in ('tab', 'shift+tab'):
+                for line, updated_line in zip(
+                    lines, tab_text(text, action, tab_size).split('\n')
+                ):
+                    width = find_first_char_non_void(line)
+                    updated_width = find_first_char_non_void(updated_line)
+                    self.assertEqual(updated_width % tab_size, 0, repr(line))
+                    if action == 'tab':
+                        self.assertTrue(0 < updated_width - width <= tab_size)
+                    else:
+                        self.assertTrue(0 <= width - updated_width <= tab_size)
+
+
+class TestCommentHelpers(unittest.TestCase):
+    def test_comment_then_uncomment_restores_the_text(self) -> None:
+        """
+        Whitespace-only lines are emptied, the others get their indent and
+        content back
+        """
+        for seed in SEEDS:
+            generator = random.Random(seed)
+            comment_char = generator.choice('#;/')
+            lines = [
+                line
+                for line in generate_lines(
+                    generator=generator,
+                    indents=('', '    ', '\t', '  \t '),
+                    bodies=BODIES,
+                )
+                if not line.strip().startswith(comment_char)
+            ]
+            text = '\n'.join(lines)
+            commented_text = comment_or_uncomment_text(text, comment_char)
+            for line, commented_line in zip(lines, commented_text.split('\n')):
+                if line.strip():
+                    self.assertEqual(
+                        commented_line.strip()[: len(comment_char) + 1],
+                        f'{comment_char} ',
+                    )
+            self.assertEqual(
+                comment_or_uncomment_text(commented_text, comment_char),
+                '\n'.join(line if line.strip() else '' for line in lines),
+            )
+
+
+class TestClearDir(unittest.TestCase):
+    def test_clear_dir_removes_nested_directories(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            dir_path = Path(temp_dir, 'cache')
+            dir_path.joinpath('a', 'b', 'c').mkdir(parents=True)
+            dir_path.joinpath('a', 'file.txt').write_text('a')
+            dir_path.joinpath('a', 'b', 'c', 'file.txt').write_text('c')
+            dir_path.joinpath('empty').mkdir()
+            clear_dir(dir_path=dir_path)
+            self.assertTrue(dir_path.is_dir())
+            self.assertEqual(list(dir_path.iterdir()), [])
+
+    def test_clear_dir_does_not_follow_symlinked_directories(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            dir_path = Path(temp_dir, 'cache')
+            target_path = Path(temp_dir, 'target')
+            target_path.joinpath('sub').mkdir(parents=True)
+            target_path.joinpath('sub', 'file.txt').write_text('kept')
+            dir_path.joinpath('nested').mkdir(parents=True)
+            try:
+                os.symlink(
+                    target_path,
+                    dir_path.joinpath('nested', 'link'),
+                    target_is_directory=True,
+                )
+            except (OSError, NotImplementedError):
+                self.skipTest('symlinks are not supported')
+            clear_dir(dir_path=dir_path)
+            self.assertEqual(list(dir_path.iterdir()), [])
+            self.assertEqual(
+                target_path.joinpath('sub', 'file.txt').read_text(), 'kept'
+            )
+
+    def test_clear_dir_ignores_missing_directories(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            clear_dir(dir_path=Path(temp_dir, 'missing'))
@@ -2,9 +2,57 @@ from pathlib import Path
 
 from rich.console import Console
 from rich.panel import Panel
+import argparse
+import os
+import re
 import sys
 
 
+def is_batch_mode() -> bool:
+    return sys.argv[1:2] == ['batch']
+
+
+def is_bench_mode() -> bool:
+    return sys.argv[1:2] == ['bench']
+
+
+def parse_file_argument(argument: str) -> tuple[Path, tuple[int, int]]:
+    """
+    Splits `path[:line[:column]]`, lines and columns start at 1
+    """
+    match = re.fullmatch(r'(.+?)(?::(\d+))?(?::(\d+))?', argument)
+    if Path(argument).exists() or match is None:
+        return Path(argument), (0, 0)
+    path, line, column = match.groups()
+    return Path(path), (
+        max(int(line or 1) - 1, 0),
+        max(int(column or 1) - 1, 0),
+    )
+
+
+def reopen_stdin_from_terminal() -> int:
+    """
+    Keeps the piped stdin in a new file descriptor and reads the keys from the
+    terminal instead. Returns the file descriptor of the pipe
+    """
+    stdin_fd = sys.stdin.fileno()
+    pipe_fd = os.dup(stdin_fd)
+    tty_fd = os.open('/dev/tty', os.O_RDWR)
+    os.dup2(tty_fd, stdin_fd)
+    os.close(tty_fd)
+    return pipe_fd
+
+
+def print_error(message: str) -> None:
+    Console().print(
+        Panel(
+            f'[bold red]{message}[/]',
+            title='ERROR',
+            border_style='bold red',
+        )
+    )
+
+
 def before_run_app() -> None:
     def adjust_python_path() -> None:
         """
@@ -15,42 +63,126 @@ def before_run_app() -> None:
             sys.path.append(str(MODULE_PARENT_PATH))
 
     def monkey_patch() -> None:
-        from tiny_code.monkey_patch import monkey_patch_pathlib
+        from tiny_code.monkey_patch import (
+            monkey_patch_pathlib,
+            monkey_patch_wrapped_document,
+        )
 
         monkey_patch_pathlib()
+        monkey_patch_wrapped_document()
 
     adjust_python_path()
-    monkey_patch()
+    if not is_batch_mode() and not is_bench_mode():
+        monkey_patch()
 
 
 def run_app() -> None:
+    if is_batch_mode():
+        from tiny_code.batch import run_batch
+
+        sys.exit(run_batch(argv=sys.argv[2:]))
+    if is_bench_mode():
+        from tiny_code.bench import run_bench
+
+        sys.exit(run_bench(argv=sys.argv[2:]))
+
     from tiny_code.app import TinyCodeApp
+    from tiny_code.entities import FileArgument
 
     console = Console()
 
-    if len(sys.argv) < 2:
+    parser = argparse.ArgumentParser(prog='tiny-code')
+    parser.add_argument(
+        'paths',
+        nargs='*',
+        help='a directory, files as `path[:line[:column]]` or `-` to read '
+        'stdin',
+    )
+    parser.add_argument(
+        '--profile',
+        action='store_true',
+        help='profile the app from startup, the profile is saved on exit',
+    )
+    parser.add_argument(
+        '--trace',
+        action='store_true',
+        help='record the message handlers timings, saved on exit as a '
+        'Chrome trace',
+    )
+    args = parser.parse_args()
+
+    if not args.paths:
+        print_error(
+            message='You must provide a directory path, files or `-`. '
+            'Use: `tiny-code .`'
+        )
+        return
+
+    dir_path = None
+    file_arguments = []
+    read_stdin = False
+    for argument in args.paths:
+        if argument == '-':
+            read_stdin = True
+            continue
+        path, cursor_location = parse_file_argument(argument=argument)
+        path = path.resolve()
+        if path.is_dir() and dir_path is None:
+            dir_path = path
+        elif path.is_file():
+            file_arguments.append(
+                FileArgument(path=path, cursor_location=cursor_location)
+            )
+        elif path.is_dir():
+            print_error(message='You can provide only one directory path')
+            return
+        else:
+            print_error(
+                message=f'`{path}` not exists or is not a valid directory '
+                'or file path'
+            )
+            return
+    if dir_path is None:
+        dir_path = (
+            file_arguments[0].path.parent if file_arguments else Path.cwd()
+        )
+
+    stdin_fd = None
+    if read_stdin:
+        if sys.stdin.isatty():
+            print_error(message='Nothing is piped to stdin')
+            return
+        try:
+            stdin_fd = reopen_stdin_from_terminal()
+        except OSError:
+            print_error(message='There is no terminal to read the keys from')
+            return
+
+    tiny_code_app = TinyCodeApp(
+        dir_path=dir_path,
+        profile=args.profile,
+        trace=args.trace,
+        file_arguments=file_arguments,
+        stdin_fd=stdin_fd,
+    )
+    tiny_code_app.run()
+
+    if tiny_code_app.profile_path is not None:
         console.print(
             Panel(
-                '[bold red]You must provide a directory path. Use: `tiny-code .`[/]',
-                title='ERROR',
-                border_style='bold red',
+                f'[bold green]Profile saved to `{tiny_code_app.profile_path}`[/]',
+                title='PROFILE',
+                border_style='bold green',
             )
         )
-        return
-
-    dir_path = Path(sys.argv[1]).resolve()
-    if not dir_path.is_dir():
+    if tiny_code_app.trace_path is not None:
         console.print(
             Panel(
-                f'[bold red]`{dir_path}` not exists or is not a valid directory path[/]',
-                title='ERROR',
-                border_style='bold red',
+                f'[bold green]Trace saved to `{tiny_code_app.trace_path}`[/]',
+                title='TRACE',
+                border_style='bold green',
             )
         )
-        return
-
-    tiny_code_app = TinyCodeApp(dir_path=dir_path)
-    tiny_code_app.run()
 
 
 if __name__ == '__main__':
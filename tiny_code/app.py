@@ -1,18 +1,99 @@
+from array import array
 from pathlib import Path
+from typing import Iterable, Literal, Optional, Sequence, Union
+import codecs
+import os
+import re
+import threading
+import time
 
-from textual import on
+from textual import events, on, work
 from textual.app import App, Binding, ComposeResult
+from textual.screen import ModalScreen
+from textual.timer import Timer
 from textual.widgets import Footer, Header
+from textual.widgets.text_area import Document, Selection
+from textual.worker import get_current_worker
 
+from tiny_code.compression import (
+    DECOMPRESSION_ERRORS,
+    detect_compression,
+    open_decompressed,
+    read_decompressed,
+    strip_compression_suffix,
+    write_compressed,
+)
 from tiny_code.config import ConfigManager
-from tiny_code.consts import STYLE_TCSS_PATH
-from tiny_code.custom_widgets import CustomDirectoryTree, CustomTextArea
+from tiny_code.consts import (
+    CSV_INDEX_CHUNK_SIZE,
+    FILE_CHUNK_SIZE,
+    FILE_DECOMPRESSED_MAX_SIZE,
+    FILE_FIRST_CHUNK_SIZE,
+    FILE_MAX_CHUNK_SIZE,
+    FIND_INCREMENTAL_MAX_SIZE,
+    FIND_REFRESH_DELAY,
+    JSON_FORMAT_CHUNK_SIZE,
+    GIT_STATUS_INTERVAL,
+    LANGUAGES_MAP,
+    OUTLINE_REFRESH_DELAY,
+    SESSION_MAX_LISTING_ENTRIES,
+    SESSION_SAVE_INTERVAL,
+    STDIN_FLUSH_INTERVAL,
+    STDIN_FLUSH_SIZE,
+    STDIN_MAX_BUFFER_SIZE,
+    STYLE_TCSS_PATH,
+    TRACE_LAG_INTERVAL,
+)
+from tiny_code.csv_table import (
+    CSV_SUFFIXES,
+    CsvFile,
+    index_rows,
+    open_memory_map,
+)
+from tiny_code.custom_widgets import (
+    CsvTable,
+    CustomDirectoryTree,
+    CustomTextArea,
+    FindBar,
+    SplitTextArea,
+    SymbolOutline,
+)
+from tiny_code.disk_usage import DiskUsageScanner
+from tiny_code.file_cache import FileCacheManager, FileKey
+from tiny_code.entities import FileArgument, FileSnapshot, OpenFile, Session
+from tiny_code.follow import FileFollower
+from tiny_code.long_lines import Highlight
+from tiny_code.json_format import (
+    JsonFormatError,
+    JSON_INITIAL_STATE,
+    JsonFormatState,
+    format_json_chunk,
+)
+from tiny_code.profiler import Profiler
+from tiny_code.git_status import GitStatusProvider, find_git_dir
 from tiny_code.modal_screens import (
     ConfigsScreen,
     CreateFileOrDirScreen,
+    FileChangedScreen,
+    FileOperationScreen,
+    FindReplaceScreen,
+    GoToScreen,
     HelpScreen,
+    WorkspaceSymbolsScreen,
+)
+from tiny_code.outline import OUTLINE_LANGUAGES, SymbolIndex
+from tiny_code.search import FindMatches, find_in_lines
+from tiny_code.session import SessionManager
+from tiny_code.stdin_reader import StdinReader
+from tiny_code.tracer import MessageTracer
+from tiny_code.utils import (
+    create_process_pool,
+    format_size,
+    hash_file,
+    merge_lines,
+    remove_dir_or_file,
 )
-from tiny_code.utils import remove_dir_or_file
+from tiny_code.workspace_index import WorkspaceIndex
 
 
 class TinyCodeApp(App, inherit_bindings=False):
@@ -49,42 +130,326 @@ class TinyCodeApp(App, inherit_bindings=False):
             show=False,
             priority=True,
         ),
+        Binding(
+            key='ctrl+t',
+            action='toggle_follow_mode()',
+            description='Follow file',
+            show=False,
+            priority=True,
+        ),
+        Binding(
+            key='ctrl+f',
+            action='toggle_find_bar()',
+            description='Show|Hide find bar',
+            show=False,
+            priority=True,
+        ),
+        Binding(
+            key='f3',
+            action='find_next()',
+            description='Find next',
+            show=False,
+            priority=True,
+        ),
+        Binding(
+            key='shift+f3',
+            action='find_previous()',
+            description='Find previous',
+            show=False,
+            priority=True,
+        ),
+        Binding(
+            key='ctrl+r',
+            action='show_modal_find_replace()',
+            description='Find & replace',
+            show=False,
+            priority=True,
+        ),
+        Binding(
+            key='ctrl+o',
+            action='toggle_outline_visibility()',
+            description='Show|Hide outline',
+            show=False,
+            priority=True,
+        ),
+        Binding(
+            key='ctrl+g',
+            action='show_modal_go_to()',
+            description='Go to line or symbol',
+            show=False,
+            priority=True,
+        ),
+        Binding(
+            key='ctrl+p',
+            action='show_modal_workspace_symbols()',
+            description='Go to definition',
+            show=False,
+            priority=True,
+        ),
+        Binding(
+            key='ctrl+pagedown',
+            action='open_next_file_argument(1)',
+            description='Next file argument',
+            show=False,
+            priority=True,
+        ),
+        Binding(
+            key='ctrl+pageup',
+            action='open_next_file_argument(-1)',
+            description='Previous file argument',
+            show=False,
+            priority=True,
+        ),
+        Binding(
+            key='ctrl+backslash',
+            action='toggle_split_view()',
+            description='Split view',
+            show=False,
+            priority=True,
+        ),
+        Binding(
+            key='f4',
+            action='toggle_csv_table()',
+            description='Show as table|text',
+            show=False,
+            priority=True,
+        ),
+        Binding(
+            key='f7',
+            action='toggle_disk_usage()',
+            description='Show|Hide disk usage',
+            show=False,
+            priority=True,
+        ),
+        Binding(
+            key='f8',
+            action='format_json(False)',
+            description='Format JSON',
+            show=False,
+            priority=True,
+        ),
+        Binding(
+            key='shift+f8',
+            action='format_json(True)',
+            description='Minify JSON',
+            show=False,
+            priority=True,
+        ),
+        Binding(
+            key='f9',
+            action='toggle_profiler()',
+            description='Start|Stop profiler',
+            show=False,
+            priority=True,
+        ),
     ]
 
-    def __init__(self, dir_path: Path):
+    def __init__(
+        self,
+        dir_path: Path,
+        profile: bool = False,
+        trace: bool = False,
+        file_arguments: Sequence[FileArgument] = (),
+        stdin_fd: Optional[int] = None,
+    ):
         super().__init__()
         self.dir_path = dir_path
+        self.file_arguments = list(file_arguments)
+        self.file_argument_index: int = -1
+        self.stdin_fd = stdin_fd
+        self.stdin_reader: Optional[StdinReader] = None
+        self.profiler = Profiler()
+        self.profile_path: Optional[Path] = None
+        if profile:
+            self.profiler.start()
+        self.tracer: Optional[MessageTracer] = None
+        self.trace_path: Optional[Path] = None
+        if trace:
+            self.tracer = MessageTracer()
+            self.tracer.install(
+                traced_types=(
+                    TinyCodeApp,
+                    CustomDirectoryTree,
+                    CustomTextArea,
+                    ModalScreen,
+                )
+            )
         self.modal_screen_active: bool = False
+        self.file_selected: Optional[Path] = None
+        self.file_selected_size: int = 0
+        self.file_loading: bool = False
+        self.file_saving: bool = False
+        self.file_save_lock = threading.Lock()
+        self.file_compression: Optional[str] = None
+        self.file_truncated: bool = False
+        self.file_snapshot: Optional[FileSnapshot] = None
+        self.file_base_lines: Optional[list[str]] = None
+        self.file_dismissed_snapshot: Optional[FileSnapshot] = None
+        self.file_follower: Optional[FileFollower] = None
+        self.follow_timer: Optional[Timer] = None
+        self.follow_max_lines: int = 0
+        self.follow_reading: bool = False
+        self.csv_table_row: Optional[int] = None
+        self.json_formatting: bool = False
+        self.outline_timer: Optional[Timer] = None
+        self.find_timer: Optional[Timer] = None
+        self.find_origin: tuple[int, int] = (0, 0)
+        self.find_select_pending: bool = False
+        self.workspace_index = WorkspaceIndex(dir_path=dir_path)
+        self.disk_usage_scanner = DiskUsageScanner()
+        self.git_status_provider: Optional[GitStatusProvider] = None
+        git_dir = find_git_dir(dir_path=dir_path)
+        if git_dir is not None:
+            work_tree, git_dir_path = git_dir
+            self.git_status_provider = GitStatusProvider(
+                work_tree=work_tree, git_dir=git_dir_path
+            )
 
     def compose(self) -> ComposeResult:
         yield Header()
-        yield CustomDirectoryTree(self.dir_path)
-        yield CustomTextArea()
+        yield CustomDirectoryTree(
+            self.dir_path,
+            show_ignored_files=ConfigManager.get().show_ignored_files,
+        )
+        yield CustomTextArea(id='text-area')
+        yield SplitTextArea(id='split-text-area')
+        yield CsvTable()
+        yield SymbolOutline()
+        yield FindBar()
         yield Footer()
 
     def on_mount(self) -> None:
         self.dir_tree = self.query_one(selector=CustomDirectoryTree)
-        self.text_area = self.query_one(selector=CustomTextArea)
+        self.text_area = self.query_one('#text-area', CustomTextArea)
+        self.split_text_area = self.query_one(
+            '#split-text-area', SplitTextArea
+        )
+        self.csv_table = self.query_one(selector=CsvTable)
+        self.outline = self.query_one(selector=SymbolOutline)
+        self.find_bar = self.query_one(selector=FindBar)
 
         current_config = ConfigManager.get()
         self.text_area.theme = current_config.theme
         self.text_area.tab_size = current_config.tab_size
+        self.text_area.long_line_threshold = current_config.long_line_threshold
+        self.text_area.history.memory_limit = (
+            current_config.undo_memory_limit_mb * 1024 * 1024
+        )
+
+        # Files given in the command line replace the open files of the
+        # session
+        session = SessionManager.get(dir_path=self.dir_path)
+        if session is not None:
+            self.restore_session(
+                session=session,
+                restore_open_files=not self.file_arguments
+                and self.stdin_fd is None,
+            )
+        if self.stdin_fd is not None:
+            self.start_reading_stdin()
+        elif self.file_arguments:
+            self.action_open_next_file_argument(step=1)
+        self.set_interval(SESSION_SAVE_INTERVAL, self.save_session)
+        self.index_workspace()
+
+        if self.git_status_provider is not None:
+            self.refresh_git_status()
+            self.set_interval(GIT_STATUS_INTERVAL, self.refresh_git_paths)
+
+        if self.tracer is not None:
+            self.set_interval(TRACE_LAG_INTERVAL, self.tracer.record_lag)
+
+    def restore_session(
+        self, session: Session, restore_open_files: bool = True
+    ) -> None:
+        self.dir_tree.directory_listings.update(
+            {
+                Path(path): directory_listing
+                for path, directory_listing in session.directory_listings.items()
+            }
+        )
+        self.run_worker(
+            self.dir_tree.restore_expanded_paths(
+                expanded_paths=[Path(path) for path in session.expanded_paths]
+            )
+        )
+
+        if not restore_open_files:
+            return
+        for open_file in session.open_files:
+            file_path = Path(open_file.path)
+            if not file_path.is_file():
+                continue
+            self.open_file(
+                file_path=file_path,
+                cursor_location=open_file.cursor_location,
+                scroll_offset=open_file.scroll_offset,
+            )
+            self.text_area.language = open_file.language
+
+    def get_session(self) -> Session:
+        open_files = []
+        if self.csv_table.csv_file is not None:
+            open_files.append(
+                OpenFile(
+                    path=str(self.file_selected),
+                    cursor_location=(self.csv_table.cursor_row, 0),
+                    scroll_offset=(0, 0),
+                    language=None,
+                )
+            )
+        elif self.file_selected is not None:
+            open_files.append(
+                OpenFile(
+                    path=str(self.file_selected),
+                    cursor_location=self.text_area.cursor_location,
+                    scroll_offset=tuple(self.text_area.scroll_offset),
+                    language=self.text_area.language,
+                )
+            )
+        return Session(
+            expanded_paths=[
+                str(path) for path in self.dir_tree.get_expanded_paths()
+            ],
+            directory_listings={
+                str(path): directory_listing
+                for path, directory_listing in list(
+                    self.dir_tree.directory_listings.items()
+                )
+                if len(directory_listing.entries)
+                <= SESSION_MAX_LISTING_ENTRIES
+            },
+            open_files=open_files,
+        )
+
+    def save_session(self) -> None:
+        self.write_session(session=self.get_session())
+
+    @work(thread=True, exclusive=True, group='session', exit_on_error=False)
+    def write_session(self, session: Session) -> None:
+        SessionManager.set(dir_path=self.dir_path, session=session)
+
+    async def action_quit(self) -> None:
+        try:
+            SessionManager.set(
+                dir_path=self.dir_path, session=self.get_session()
+            )
+        except OSError:
+            pass
+        if self.profiler.is_running:
+            self.stop_profiler()
+        if self.tracer is not None:
+            self.stop_tracer()
+        self.workers.cancel_group(self, 'workspace-index')
+        self.workers.cancel_group(self, 'stdin')
+        self.workers.cancel_group(self, 'disk-usage')
+        self.workspace_index.close()
+        self.exit()
 
     @on(CustomDirectoryTree.FileSelected)
     def on_file_selected(
         self, event: CustomDirectoryTree.FileSelected
     ) -> None:
-        LANGUAGES_MAP = {
-            '.py': 'python',
-            '.json': 'json',
-            '.toml': 'toml',
-            '.html': 'html',
-            '.yaml': 'yaml',
-            '.yml': 'yaml',
-            '.md': 'markdown',
-            '.sql': 'sql',
-            '.css': 'css',
-        }
         file_selected = event.path.resolve()
         if not file_selected.is_file():
             self.notify(
@@ -97,17 +462,598 @@ class TinyCodeApp(App, inherit_bindings=False):
             self.dir_tree.reload()
             return
 
-        self.text_area.border_title = f'Code editor - {file_selected.name}'
-        self.file_selected = file_selected
+        self.open_file(file_path=file_selected)
+
+    def open_file(
+        self,
+        file_path: Path,
+        cursor_location: tuple[int, int] = (0, 0),
+        scroll_offset: Optional[tuple[int, int]] = None,
+        as_text: bool = False,
+    ) -> None:
+        """
+        CSV and TSV files are shown as a table unless `as_text`, then the
+        cursor location is the row and column of the table
+        """
+        self.stop_following()
+        self.cancel_loading()
+        self.cancel_json_format()
+        self.detach_stdin()
+        self.close_csv_table()
+        self.text_area.border_title = f'Code editor - {file_path.name}'
+        self.file_selected = file_path
+        file_stat = file_path.stat()
+        self.file_selected_size = file_stat.st_size
+        self.file_snapshot = FileSnapshot(
+            size=file_stat.st_size,
+            mtime_ns=file_stat.st_mtime_ns,
+            content_hash=None,
+        )
+        self.file_base_lines = None
+        self.file_compression = detect_compression(file_path=file_path)
+        if self.file_truncated:
+            self.file_truncated = False
+            self.text_area.read_only = False
+            self.text_area.set_status(key='truncated', value=None)
+        self.hash_file_selected(
+            file_path=file_path, file_snapshot=self.file_snapshot
+        )
+        if (
+            not as_text
+            and self.file_compression is None
+            and file_path.suffix.lower() in CSV_SUFFIXES
+        ):
+            self.open_csv_table(file_path=file_path, row=cursor_location[0])
+            return
         language_syntax = LANGUAGES_MAP.get(
-            self.file_selected.suffix.lower(), None
+            strip_compression_suffix(
+                file_path=file_path, compression=self.file_compression
+            ).suffix.lower(),
+            None,
+        )
+
+        # Paint the first chunk right away and stream the rest of the file
+        # from a worker, so the time to show a file does not depend on its
+        # size. Compressed files are all decompressed by the worker.
+        decoder = codecs.getincrementaldecoder('utf-8')()
+        first_chunk = b''
+        if self.file_compression is None:
+            with self.file_selected.open('rb') as file:
+                first_chunk = file.read(FILE_FIRST_CHUNK_SIZE)
+        is_loaded = (
+            self.file_compression is None
+            and len(first_chunk) >= self.file_selected_size
         )
         try:
-            self.text_area.load_text(self.file_selected.read_text())
-            self.text_area.language = language_syntax
-        except Exception:
-            self.text_area.load_text(str(self.file_selected.read_bytes()))
-            self.text_area.language = language_syntax
+            text = decoder.decode(first_chunk, final=is_loaded)
+        except UnicodeDecodeError:
+            self.load_binary_file(file_path=self.file_selected)
+            return
+
+        self.text_area.load_document(text=text, language=language_syntax)
+        if is_loaded:
+            self.file_base_lines = list(self.text_area.document.lines)
+            self.move_to_location(
+                cursor_location=cursor_location, scroll_offset=scroll_offset
+            )
+            return
+
+        self.file_loading = True
+        self.text_area.read_only = True
+        self.text_area.set_status(key='loading', value='Loading...')
+        self.load_remaining_file(
+            file_path=self.file_selected,
+            offset=len(first_chunk),
+            compression=self.file_compression,
+            decoder=decoder,
+            language=language_syntax,
+            cursor_location=cursor_location,
+            scroll_offset=scroll_offset,
+        )
+
+    def open_csv_table(self, file_path: Path, row: int) -> None:
+        try:
+            csv_file = CsvFile(
+                file_path=file_path,
+                delimiter=CSV_SUFFIXES[file_path.suffix.lower()],
+            )
+        except (OSError, ValueError):
+            self.notify(
+                title='⚠️',
+                message=f'Fail to show `{str(file_path)}` as a table.',
+                severity='warning',
+                timeout=10,
+            )
+            self.open_file(
+                file_path=file_path, cursor_location=(row, 0), as_text=True
+            )
+            return
+
+        self.close_split_view()
+        # The text is not loaded, the table reads the rows from the file
+        self.text_area.load_document(text='', language=None)
+        self.text_area.read_only = True
+        self.text_area.styles.display = 'none'
+        self.csv_table.styles.display = 'block'
+        self.csv_table.border_title = f'Table - {file_path.name}'
+        self.csv_table.border_subtitle = 'Indexing 0%'
+        self.csv_table.set_csv_file(csv_file=csv_file)
+        self.csv_table.focus()
+        self.csv_table_row = row
+        self.index_csv_file(csv_file=csv_file)
+
+    def close_csv_table(self) -> None:
+        if self.csv_table.csv_file is None:
+            return
+        self.workers.cancel_group(self, 'csv-index')
+        self.csv_table.csv_file.close()
+        self.csv_table.set_csv_file(csv_file=None)
+        self.csv_table.styles.display = 'none'
+        self.text_area.styles.display = 'block'
+        self.text_area.read_only = False
+        if self.focused is self.csv_table:
+            self.text_area.focus()
+
+    @work(thread=True, exclusive=True, group='csv-index', exit_on_error=False)
+    def index_csv_file(self, csv_file: CsvFile) -> None:
+        worker = get_current_worker()
+        # A map of its own, the table closes its map when another file opens
+        data, size = open_memory_map(file_path=csv_file.file_path)
+        if data is not None:
+            with data:
+                in_quotes = False
+                for start in range(0, size, CSV_INDEX_CHUNK_SIZE):
+                    if worker.is_cancelled:
+                        return
+                    end = min(start + CSV_INDEX_CHUNK_SIZE, size)
+                    row_offsets, in_quotes = index_rows(
+                        data=data, start=start, end=end, in_quotes=in_quotes
+                    )
+                    self.call_from_thread(
+                        self.add_csv_rows,
+                        csv_file=csv_file,
+                        row_offsets=row_offsets,
+                        percent=end * 100 // size,
+                    )
+        if not worker.is_cancelled:
+            self.call_from_thread(self.finish_csv_index, csv_file=csv_file)
+
+    def add_csv_rows(
+        self, csv_file: CsvFile, row_offsets: array, percent: int
+    ) -> None:
+        if csv_file is not self.csv_table.csv_file:
+            return
+        csv_file.add_row_offsets(row_offsets=row_offsets)
+        self.csv_table.update_rows()
+        self.csv_table.border_subtitle = f'Indexing {percent}%'
+        if (
+            self.csv_table_row is not None
+            and self.csv_table.data_row_count > self.csv_table_row
+        ):
+            self.csv_table.go_to_row(row=self.csv_table_row, center=True)
+            self.csv_table_row = None
+
+    def finish_csv_index(self, csv_file: CsvFile) -> None:
+        if csv_file is not self.csv_table.csv_file:
+            return
+        csv_file.is_indexed = True
+        self.csv_table.update_rows()
+        self.csv_table.border_subtitle = (
+            f'{self.csv_table.data_row_count} rows'
+        )
+        if self.csv_table_row is not None:
+            self.csv_table.go_to_row(row=self.csv_table_row, center=True)
+            self.csv_table_row = None
+
+    def action_toggle_csv_table(self) -> None:
+        if (
+            self.file_selected is None
+            or self.file_compression is not None
+            or self.file_selected.suffix.lower() not in CSV_SUFFIXES
+        ):
+            self.notify(
+                title='❌',
+                message='Only CSV and TSV files can be shown as a table.',
+                severity='error',
+                timeout=4,
+            )
+            self.bell()
+            return
+        # The header is the first line of the text
+        if self.csv_table.csv_file is not None:
+            self.open_file(
+                file_path=self.file_selected,
+                cursor_location=(self.csv_table.cursor_row + 1, 0),
+                as_text=True,
+            )
+            return
+        if self.file_loading:
+            self.notify(
+                title='❌',
+                message='Wait for the file to finish loading.',
+                severity='error',
+                timeout=4,
+            )
+            self.bell()
+            return
+        if self.file_base_lines != self.text_area.document.lines:
+            self.notify(
+                title='❌',
+                message='Save the file before showing it as a table.',
+                severity='error',
+                timeout=4,
+            )
+            self.bell()
+            return
+        self.open_file(
+            file_path=self.file_selected,
+            cursor_location=(max(self.text_area.cursor_location[0] - 1, 0), 0),
+        )
+
+    def action_toggle_split_view(self) -> None:
+        if self.split_text_area.split_peer is not None:
+            self.close_split_view()
+            return
+        if self.file_selected is None or self.csv_table.csv_file is not None:
+            self.notify(
+                title='❌',
+                message='Open a file as text to split its view.',
+                severity='error',
+                timeout=4,
+            )
+            self.bell()
+            return
+        self.split_text_area.share_document(source=self.text_area)
+        self.split_text_area.styles.display = 'block'
+        self.split_text_area.focus()
+        self.split_text_area.call_after_refresh(
+            self.split_text_area.scroll_cursor_visible, center=True
+        )
+
+    def close_split_view(self) -> None:
+        if self.split_text_area.split_peer is None:
+            return
+        if self.focused is self.split_text_area:
+            self.text_area.focus()
+        self.split_text_area.detach_document()
+        self.split_text_area.styles.display = 'none'
+
+    def cancel_loading(self) -> None:
+        self.workers.cancel_group(self, 'file-loader')
+        if self.file_loading:
+            self.file_loading = False
+            self.text_area.read_only = False
+            self.text_area.set_status(key='loading', value=None)
+
+    def load_binary_file(self, file_path: Path) -> None:
+        self.cancel_loading()
+        self.text_area.load_text(str(file_path.read_bytes()))
+
+    @work(
+        thread=True,
+        exclusive=True,
+        group='file-loader',
+        exit_on_error=False,
+    )
+    def load_remaining_file(
+        self,
+        file_path: Path,
+        offset: int,
+        compression: Optional[str],
+        decoder: codecs.IncrementalDecoder,
+        language: Optional[str],
+        cursor_location: tuple[int, int],
+        scroll_offset: Optional[tuple[int, int]],
+    ) -> None:
+        worker = get_current_worker()
+        # Keyed before reading, a change while loading makes the key stale
+        # instead of caching the highlights of a mixed version
+        file_key = None
+        highlights = None
+        if language is not None:
+            file_key = FileCacheManager.get_file_key(file_path=file_path)
+        if file_key is not None:
+            highlights = FileCacheManager.get_highlights(
+                file_path=file_path, file_key=file_key, language=language
+            )
+        chunk_size = FILE_CHUNK_SIZE
+        pending_text = ''
+        truncated = False
+        loaded_size = offset
+        try:
+            with file_path.open('rb') as file:
+                file.seek(offset)
+                # The progress is the position in the file, so the compressed
+                # one for compressed files
+                stream = file
+                if compression is not None:
+                    stream = open_decompressed(
+                        file=file, compression=compression
+                    )
+                while not worker.is_cancelled:
+                    try:
+                        chunk = stream.read(chunk_size)
+                    except DECOMPRESSION_ERRORS:
+                        chunk, truncated = b'', True
+                    if (
+                        compression is not None
+                        and offset + len(chunk) > FILE_DECOMPRESSED_MAX_SIZE
+                    ):
+                        chunk = chunk[: FILE_DECOMPRESSED_MAX_SIZE - offset]
+                        truncated = True
+                    try:
+                        text = pending_text + decoder.decode(
+                            chunk, final=not chunk or truncated
+                        )
+                    except UnicodeDecodeError:
+                        self.call_from_thread(
+                            self.load_binary_file, file_path=file_path
+                        )
+                        return
+
+                    # Keep a trailing `\r` until the next chunk so a `\r\n`
+                    # split between chunks is not read as two line breaks.
+                    pending_text = ''
+                    if chunk and not truncated and text.endswith('\r'):
+                        text, pending_text = text[:-1], '\r'
+
+                    offset += len(chunk)
+                    loaded_size = file.tell()
+                    self.call_from_thread(
+                        self.append_loaded_text,
+                        file_path=file_path,
+                        text=text,
+                        loaded_size=loaded_size,
+                    )
+                    if not chunk or truncated:
+                        break
+                    # Every append re-parses the document, so growing the chunks
+                    # keeps the total work close to linear.
+                    chunk_size = min(chunk_size * 2, FILE_MAX_CHUNK_SIZE)
+        except OSError as error:
+            self.call_from_thread(
+                self.fail_loading, file_path=file_path, error=error
+            )
+            return
+
+        if not worker.is_cancelled:
+            self.call_from_thread(
+                self.finish_loading,
+                file_path=file_path,
+                loaded_size=loaded_size,
+                truncated=truncated,
+                language=language,
+                file_key=file_key,
+                highlights=highlights,
+                cursor_location=cursor_location,
+                scroll_offset=scroll_offset,
+            )
+
+    def fail_loading(self, file_path: Path, error: OSError) -> None:
+        if file_path != self.file_selected or not self.file_loading:
+            return
+        self.file_loading = False
+        self.text_area.read_only = False
+        self.text_area.set_status(key='loading', value=None)
+        # Only the start of the file was read, saving it would lose the rest
+        self.file_selected = None
+        self.file_snapshot = None
+        self.file_base_lines = None
+        self.text_area.border_title = CustomTextArea.BORDER_TITLE
+        self.text_area.load_document(text='', language=None)
+        self.notify(
+            title='❌',
+            message=f'Fail to read `{str(file_path)}` | {str(error)}.',
+            severity='error',
+            timeout=10,
+        )
+        self.bell()
+
+    def append_loaded_text(
+        self, file_path: Path, text: str, loaded_size: int
+    ) -> None:
+        if file_path != self.file_selected or not self.file_loading:
+            return
+        if text:
+            self.text_area.append_text(text=text)
+        loaded_percent = loaded_size * 100 // max(self.file_selected_size, 1)
+        self.text_area.set_status(
+            key='loading', value=f'Loading {min(loaded_percent, 100)}%'
+        )
+
+    def finish_loading(
+        self,
+        file_path: Path,
+        loaded_size: int,
+        truncated: bool,
+        language: Optional[str],
+        file_key: Optional[FileKey],
+        highlights: Optional[dict[int, list[Highlight]]],
+        cursor_location: tuple[int, int],
+        scroll_offset: Optional[tuple[int, int]],
+    ) -> None:
+        if file_path != self.file_selected or not self.file_loading:
+            return
+        self.file_loading = False
+        self.file_selected_size = loaded_size
+        self.file_base_lines = list(self.text_area.document.lines)
+        self.text_area.finish_appending(highlights=highlights)
+        if highlights is None and file_key is not None and not truncated:
+            self.write_file_cache(
+                file_path=file_path,
+                file_key=file_key,
+                language=language,
+                highlights=self.text_area.get_highlights(),
+            )
+        self.text_area.set_status(key='loading', value=None)
+        # Saving a truncated file would lose its end
+        self.file_truncated = truncated
+        self.text_area.read_only = truncated
+        if truncated:
+            self.text_area.set_status(key='truncated', value='Truncated')
+            self.notify(
+                title='⚠️',
+                message=f'`{str(file_path)}` is corrupted or decompresses '
+                f'to more than {FILE_DECOMPRESSED_MAX_SIZE // 1024 // 1024} '
+                'MiB, it is shown read-only up to that point.',
+                severity='warning',
+                timeout=10,
+            )
+        self.move_to_location(
+            cursor_location=cursor_location, scroll_offset=scroll_offset
+        )
+
+    @work(thread=True, group='file-cache', exit_on_error=False)
+    def write_file_cache(
+        self,
+        file_path: Path,
+        file_key: FileKey,
+        language: str,
+        highlights: dict[int, list[Highlight]],
+    ) -> None:
+        try:
+            FileCacheManager.set_highlights(
+                file_path=file_path,
+                file_key=file_key,
+                language=language,
+                highlights=highlights,
+            )
+        except (OSError, ValueError):
+            pass
+
+    def action_open_next_file_argument(self, step: int) -> None:
+        if not self.file_arguments:
+            self.notify(
+                title='❌',
+                message='Open files from the command line to go through '
+                'them.',
+                severity='error',
+                timeout=4,
+            )
+            self.bell()
+            return
+
+        self.file_argument_index = (self.file_argument_index + step) % len(
+            self.file_arguments
+        )
+        file_argument = self.file_arguments[self.file_argument_index]
+        if not file_argument.path.is_file():
+            self.notify(
+                title='❌',
+                message=f'File `{str(file_argument.path)}` not exists or is '
+                'not a file.',
+                severity='error',
+                timeout=10,
+            )
+            self.bell()
+            return
+        self.open_file(
+            file_path=file_argument.path,
+            cursor_location=file_argument.cursor_location,
+        )
+
+    def start_reading_stdin(self) -> None:
+        self.stdin_reader = StdinReader(fd=self.stdin_fd)
+        self.text_area.border_title = 'Code editor - stdin'
+        self.text_area.load_document(text='', language=None)
+        self.text_area.read_only = True
+        self.text_area.set_status(key='stdin', value='Reading stdin...')
+        self.read_stdin(stdin_reader=self.stdin_reader)
+
+    def detach_stdin(self) -> None:
+        """
+        Another buffer replaces stdin in the editor, the rest of the stream
+        is kept in a temporary file
+        """
+        if self.stdin_reader is None or self.stdin_reader.detached:
+            return
+        self.stdin_reader.detached = True
+        self.text_area.read_only = False
+        self.text_area.set_status(key='stdin', value=None)
+
+    @work(thread=True, group='stdin', exit_on_error=False)
+    def read_stdin(self, stdin_reader: StdinReader) -> None:
+        worker = get_current_worker()
+        pending_text = ''
+        flushed_size = 0
+        flush_time = time.monotonic()
+        while not worker.is_cancelled and not stdin_reader.is_finished:
+            pending_text += stdin_reader.read(timeout=STDIN_FLUSH_INTERVAL)
+            if not stdin_reader.is_finished and (
+                stdin_reader.read_size == flushed_size
+                or len(pending_text) < STDIN_FLUSH_SIZE
+                and time.monotonic() - flush_time < STDIN_FLUSH_INTERVAL
+            ):
+                continue
+
+            # Keep a trailing `\r` until the next read so a `\r\n` split
+            # between reads is not shown as two line breaks.
+            text, pending_text = pending_text, ''
+            if not stdin_reader.is_finished and text.endswith('\r'):
+                text, pending_text = text[:-1], '\r'
+            flushed_size = stdin_reader.read_size
+            flush_time = time.monotonic()
+            self.call_from_thread(
+                self.append_stdin_text, stdin_reader=stdin_reader, text=text
+            )
+
+        if worker.is_cancelled:
+            stdin_reader.close()
+            return
+        self.call_from_thread(
+            self.finish_reading_stdin, stdin_reader=stdin_reader
+        )
+
+    def append_stdin_text(self, stdin_reader: StdinReader, text: str) -> None:
+        if stdin_reader is not self.stdin_reader or stdin_reader.detached:
+            return
+        if text:
+            self.text_area.append_text(text=text)
+        read_size_mib = stdin_reader.read_size / 1024 / 1024
+        if stdin_reader.is_spilled:
+            self.text_area.set_status(
+                key='stdin',
+                value=f'Reading stdin {read_size_mib:.1f} MiB, showing the '
+                f'first {STDIN_MAX_BUFFER_SIZE // 1024 // 1024} MiB',
+            )
+        else:
+            self.text_area.set_status(
+                key='stdin', value=f'Reading stdin {read_size_mib:.1f} MiB'
+            )
+
+    def finish_reading_stdin(self, stdin_reader: StdinReader) -> None:
+        if stdin_reader is not self.stdin_reader:
+            return
+        self.stdin_reader = None
+        if not stdin_reader.detached:
+            self.text_area.finish_appending()
+            self.text_area.read_only = False
+            self.text_area.set_status(key='stdin', value=None)
+        if not stdin_reader.is_spilled:
+            return
+        if stdin_reader.detached:
+            message = f'Stdin saved to `{str(stdin_reader.spill_path)}`.'
+        else:
+            message = (
+                f'Stdin was bigger than '
+                f'{STDIN_MAX_BUFFER_SIZE // 1024 // 1024} MiB, the editor '
+                'shows its beginning and the whole stream is saved to '
+                f'`{str(stdin_reader.spill_path)}`.'
+            )
+        self.notify(title='✅', message=message, timeout=10)
+
+    def move_to_location(
+        self,
+        cursor_location: tuple[int, int],
+        scroll_offset: Optional[tuple[int, int]] = None,
+    ) -> None:
+        if scroll_offset is None:
+            self.text_area.move_cursor(cursor_location, center=True)
+            return
+        self.text_area.move_cursor(cursor_location)
+        self.call_after_refresh(
+            self.text_area.scroll_to, *scroll_offset, animate=False
+        )
 
     @on(CustomDirectoryTree.FileDeleteRequested)
     def on_file_deleted(
@@ -137,6 +1083,8 @@ class TinyCodeApp(App, inherit_bindings=False):
             self.bell()
         finally:
             self.dir_tree.reload()
+            self.refresh_git_status()
+            self.refresh_disk_usage()
 
     @on(CustomDirectoryTree.DirectoryDeleteRequested)
     def on_directory_deleted(
@@ -208,6 +1156,8 @@ class TinyCodeApp(App, inherit_bindings=False):
             self.bell()
         finally:
             self.dir_tree.reload()
+            self.refresh_git_status()
+            self.refresh_disk_usage()
 
     @on(CustomDirectoryTree.FileOrDirectoryCreateRequested)
     def on_file_or_dir_created(
@@ -218,23 +1168,1186 @@ class TinyCodeApp(App, inherit_bindings=False):
         self.push_screen(CreateFileOrDirScreen(directory_path=event.path))
         self.modal_screen_active = True
 
-    @on(CustomTextArea.SaveRequested)
-    def on_file_saved(self, event: CustomTextArea.SaveRequested) -> None:
-        if isinstance(event.content, str):
-            self.file_selected.write_text(event.content)
-        elif isinstance(event.content, bytes):
-            self.file_selected.write_bytes(event.content)
-
-    def action_toggle_directory_tree_visibility(self) -> None:
-        if self.dir_tree.styles.display == 'none':
-            self.dir_tree.styles.display = 'block'
-        elif self.dir_tree.styles.display == 'block':
-            self.dir_tree.styles.display = 'none'
-
-    def action_show_modal_configs(self) -> None:
+    @on(CustomDirectoryTree.FileOperationRequested)
+    def on_file_operation_requested(
+        self, event: CustomDirectoryTree.FileOperationRequested
+    ) -> None:
         if self.modal_screen_active:
             return
-        self.push_screen(screen=ConfigsScreen())
+        self.push_screen(
+            FileOperationScreen(path=event.path, operation=event.operation)
+        )
+        self.modal_screen_active = True
+
+    def finish_file_operation(
+        self,
+        source: Path,
+        destination: Path,
+        operation: Literal['copy', 'move', 'rename'],
+    ) -> None:
+        changed_directories = [destination.parent]
+        if operation != 'copy':
+            changed_directories.append(source.parent)
+        self.dir_tree.reload_directories(paths=changed_directories)
+        self.refresh_git_status()
+        self.refresh_disk_usage()
+        self.index_workspace()
+        if operation == 'copy' or self.file_selected is None:
+            return
+
+        # The open file follows its file or directory when it is moved
+        try:
+            relative_path = self.file_selected.relative_to(source.resolve())
+        except ValueError:
+            return
+        self.file_selected = destination.resolve().joinpath(relative_path)
+        self.text_area.border_title = (
+            f'Code editor - {self.file_selected.name}'
+        )
+
+    @on(CustomTextArea.SaveRequested)
+    def on_file_saved(self, event: CustomTextArea.SaveRequested) -> None:
+        if self.file_selected is None:
+            self.notify(
+                title='❌',
+                message='Open a file before saving it.',
+                severity='error',
+                timeout=4,
+            )
+            self.bell()
+            return
+
+        self.check_file_changes(content=event.content)
+
+    def save_file(self, content: Union[str, bytes]) -> None:
+        base_lines = list(self.text_area.document.lines)
+        if self.file_compression is not None:
+            if isinstance(content, str):
+                content = content.encode('utf-8')
+            self.file_saving = True
+            self.save_compressed_file(
+                file_path=self.file_selected,
+                data=content,
+                compression=self.file_compression,
+                base_lines=base_lines,
+            )
+            return
+        if isinstance(content, str):
+            self.file_selected.write_text(content)
+        elif isinstance(content, bytes):
+            self.file_selected.write_bytes(content)
+
+        self.finish_saving(
+            file_path=self.file_selected,
+            file_stat=self.file_selected.stat(),
+            base_lines=base_lines,
+        )
+
+    # A description keeps textual from building one with the repr of the
+    # buffer passed to the worker
+    @work(
+        thread=True,
+        exclusive=True,
+        group='file-save',
+        description='save_compressed_file',
+        exit_on_error=False,
+    )
+    def save_compressed_file(
+        self,
+        file_path: Path,
+        data: bytes,
+        compression: str,
+        base_lines: list[str],
+    ) -> None:
+        worker = get_current_worker()
+        try:
+            # The lock keeps a save from replacing the file after a newer
+            # one, which cancels it
+            with self.file_save_lock:
+                if worker.is_cancelled:
+                    return
+                write_compressed(
+                    file_path=file_path, data=data, compression=compression
+                )
+                file_stat = file_path.stat()
+        except OSError as error:
+            self.call_from_thread(
+                self.fail_saving, file_path=file_path, error=error
+            )
+            return
+        self.call_from_thread(
+            self.finish_saving,
+            file_path=file_path,
+            file_stat=file_stat,
+            base_lines=base_lines,
+        )
+
+    def finish_saving(
+        self, file_path: Path, file_stat: os.stat_result, base_lines: list[str]
+    ) -> None:
+        self.file_saving = False
+        self.refresh_git_paths(paths=[file_path])
+        self.index_workspace_paths(paths=[file_path])
+        if file_path != self.file_selected:
+            return
+        self.file_selected_size = file_stat.st_size
+        self.file_snapshot = FileSnapshot(
+            size=file_stat.st_size,
+            mtime_ns=file_stat.st_mtime_ns,
+            content_hash=None,
+        )
+        self.file_base_lines = base_lines
+        self.hash_file_selected(
+            file_path=file_path, file_snapshot=self.file_snapshot
+        )
+
+    def fail_saving(self, file_path: Path, error: OSError) -> None:
+        self.file_saving = False
+        self.notify(
+            title='❌',
+            message=f'Fail to save `{str(file_path)}` | {str(error)}.',
+            severity='error',
+            timeout=10,
+        )
+        self.bell()
+
+    @work(thread=True, exclusive=True, group='file-hash', exit_on_error=False)
+    def hash_file_selected(
+        self, file_path: Path, file_snapshot: FileSnapshot
+    ) -> None:
+        worker = get_current_worker()
+        content_hash = hash_file(
+            file_path=file_path, is_cancelled=lambda: worker.is_cancelled
+        )
+        file_stat = file_path.stat()
+        if (file_stat.st_size, file_stat.st_mtime_ns) == (
+            file_snapshot.size,
+            file_snapshot.mtime_ns,
+        ):
+            file_snapshot.content_hash = content_hash
+
+    @work(thread=True, exclusive=True, group='git-status', exit_on_error=False)
+    def refresh_git_status(self) -> None:
+        if self.git_status_provider is None:
+            return
+        worker = get_current_worker()
+        git_status = self.git_status_provider.refresh(
+            is_cancelled=lambda: worker.is_cancelled
+        )
+        if git_status is not None and not worker.is_cancelled:
+            self.call_from_thread(self.dir_tree.set_git_status, git_status)
+
+    @work(thread=True, group='git-status', exit_on_error=False)
+    def refresh_git_paths(self, paths: Iterable[Path] = ()) -> None:
+        """
+        Recomputes the git status of `paths`, called without paths it only
+        picks up changes made to the index (commits, staging, checkouts)
+        """
+        if self.git_status_provider is None:
+            return
+        worker = get_current_worker()
+        git_status = self.git_status_provider.refresh_paths(
+            paths=paths, is_cancelled=lambda: worker.is_cancelled
+        )
+        if git_status is not None and not worker.is_cancelled:
+            self.call_from_thread(self.dir_tree.set_git_status, git_status)
+
+    def action_toggle_disk_usage(self) -> None:
+        if self.dir_tree.disk_usage is not None:
+            self.workers.cancel_group(self, 'disk-usage')
+            self.dir_tree.set_disk_usage(None)
+            self.dir_tree.border_subtitle = ''
+            return
+        # The sizes of the last scan are shown until they are measured again
+        self.dir_tree.set_disk_usage(dict(self.disk_usage_scanner.sizes))
+        self.dir_tree.border_subtitle = 'Measuring…'
+        self.refresh_disk_usage()
+
+    @work(thread=True, exclusive=True, group='disk-usage', exit_on_error=False)
+    def refresh_disk_usage(self) -> None:
+        if self.dir_tree.disk_usage is None:
+            return
+        worker = get_current_worker()
+        root_path = self.dir_tree.root.data.path
+        is_finished = self.disk_usage_scanner.scan(
+            root_path=root_path,
+            on_sizes=lambda sizes: self.call_from_thread(
+                self.dir_tree.update_disk_usage, sizes
+            ),
+            is_cancelled=lambda: worker.is_cancelled,
+        )
+        if is_finished and not worker.is_cancelled:
+            self.call_from_thread(
+                self.finish_disk_usage,
+                self.disk_usage_scanner.sizes.get(root_path, 0),
+            )
+
+    def finish_disk_usage(self, total_size: int) -> None:
+        if self.dir_tree.disk_usage is None:
+            return
+        self.dir_tree.set_disk_usage(dict(self.disk_usage_scanner.sizes))
+        self.dir_tree.border_subtitle = f'{format_size(total_size)} in total'
+
+    @work(
+        thread=True,
+        exclusive=True,
+        group='workspace-index',
+        exit_on_error=False,
+    )
+    def index_workspace(self) -> None:
+        worker = get_current_worker()
+        self.workspace_index.update(is_cancelled=lambda: worker.is_cancelled)
+
+    @work(thread=True, group='workspace-index', exit_on_error=False)
+    def index_workspace_paths(self, paths: Iterable[Path]) -> None:
+        worker = get_current_worker()
+        self.workspace_index.update(
+            is_cancelled=lambda: worker.is_cancelled, paths=paths
+        )
+
+    @on(events.AppFocus)
+    def on_app_focused(self) -> None:
+        self.check_file_selected_changes()
+        self.refresh_git_status()
+
+    @on(events.DescendantFocus)
+    def on_descendant_focused(self, event: events.DescendantFocus) -> None:
+        if event.widget in (self.text_area, self.split_text_area):
+            self.check_file_selected_changes()
+
+    def check_file_selected_changes(self) -> None:
+        if (
+            self.file_selected is None
+            or self.file_loading
+            or self.file_saving
+            or self.file_follower is not None
+            or self.modal_screen_active
+        ):
+            return
+        if self.csv_table.csv_file is not None:
+            self.check_csv_file_changes()
+            return
+        self.check_file_changes(content=None)
+
+    def check_csv_file_changes(self) -> None:
+        """
+        A table has no changes to lose, it is indexed again if the file
+        changed on disk
+        """
+        try:
+            file_stat = self.file_selected.stat()
+        except OSError:
+            return
+        if (file_stat.st_size, file_stat.st_mtime_ns) != (
+            self.file_snapshot.size,
+            self.file_snapshot.mtime_ns,
+        ):
+            self.open_file(
+                file_path=self.file_selected,
+                cursor_location=(self.csv_table.cursor_row, 0),
+            )
+
+    def check_file_changes(self, content: Optional[Union[str, bytes]]) -> None:
+        """
+        Compares the file on disk with the snapshot taken when it was loaded.
+        The `content` is saved if the file did not change, otherwise the user
+        chooses what to do with the changes
+        """
+        try:
+            file_stat = self.file_selected.stat()
+        except FileNotFoundError:
+            file_stat = None
+        except OSError as error:
+            self.notify_file_check_error(
+                file_path=self.file_selected, error=error, content=content
+            )
+            return
+
+        # The snapshot is taken again when the file being saved is written
+        if (
+            self.file_saving
+            or file_stat is None
+            or self.file_snapshot is None
+            or (file_stat.st_size, file_stat.st_mtime_ns)
+            == (self.file_snapshot.size, self.file_snapshot.mtime_ns)
+        ):
+            if content is not None:
+                self.save_file(content=content)
+            return
+
+        self.verify_file_changes(
+            file_path=self.file_selected,
+            file_snapshot=self.file_snapshot,
+            content=content,
+        )
+
+    # A description keeps textual from building one with the repr of the
+    # buffer passed to the worker
+    @work(
+        thread=True,
+        exclusive=True,
+        group='file-check',
+        description='verify_file_changes',
+        exit_on_error=False,
+    )
+    def verify_file_changes(
+        self,
+        file_path: Path,
+        file_snapshot: FileSnapshot,
+        content: Optional[Union[str, bytes]],
+    ) -> None:
+        try:
+            file_stat = file_path.stat()
+            disk_snapshot = FileSnapshot(
+                size=file_stat.st_size,
+                mtime_ns=file_stat.st_mtime_ns,
+                content_hash=hash_file(file_path=file_path),
+            )
+        except OSError as error:
+            self.call_from_thread(
+                self.notify_file_check_error,
+                file_path=file_path,
+                error=error,
+                content=content,
+            )
+            return
+        self.call_from_thread(
+            self.handle_file_changes,
+            file_path=file_path,
+            file_snapshot=file_snapshot,
+            disk_snapshot=disk_snapshot,
+            content=content,
+        )
+
+    def notify_file_check_error(
+        self,
+        file_path: Path,
+        error: Exception,
+        content: Optional[Union[str, bytes]],
+    ) -> None:
+        # Without the check the content is not saved, it could overwrite
+        # changes made on disk
+        action = 'save' if content is not None else 'check the changes of'
+        self.notify(
+            title='❌',
+            message=f'Fail to {action} `{str(file_path)}` | {str(error)}.',
+            severity='error',
+            timeout=10,
+        )
+        self.bell()
+
+    def handle_file_changes(
+        self,
+        file_path: Path,
+        file_snapshot: FileSnapshot,
+        disk_snapshot: FileSnapshot,
+        content: Optional[Union[str, bytes]],
+    ) -> None:
+        if file_snapshot is not self.file_snapshot:
+            return
+        # Only the mtime changed (e.g. `touch`), the content is the same
+        if disk_snapshot.content_hash == file_snapshot.content_hash:
+            self.file_snapshot = disk_snapshot
+            if content is not None:
+                self.save_file(content=content)
+            return
+
+        if self.modal_screen_active or (
+            content is None and disk_snapshot == self.file_dismissed_snapshot
+        ):
+            return
+        self.push_screen(
+            FileChangedScreen(
+                file_path=file_path,
+                disk_snapshot=disk_snapshot,
+                content=content,
+            )
+        )
+        self.modal_screen_active = True
+
+    def reload_file_selected(self) -> None:
+        self.open_file(
+            file_path=self.file_selected,
+            cursor_location=self.text_area.cursor_location,
+        )
+
+    def merge_file_selected(self) -> None:
+        if self.file_base_lines is None:
+            self.notify(
+                title='❌',
+                message=f'Fail to merge `{str(self.file_selected)}`.',
+                severity='error',
+                timeout=10,
+            )
+            self.bell()
+            return
+
+        self.merge_file_changes(
+            file_path=self.file_selected,
+            compression=self.file_compression,
+            file_snapshot=self.file_snapshot,
+            base_lines=self.file_base_lines,
+            our_lines=list(self.text_area.document.lines),
+        )
+
+    @work(
+        thread=True,
+        exclusive=True,
+        group='file-check',
+        description='merge_file_changes',
+        exit_on_error=False,
+    )
+    def merge_file_changes(
+        self,
+        file_path: Path,
+        compression: Optional[str],
+        file_snapshot: FileSnapshot,
+        base_lines: list[str],
+        our_lines: list[str],
+    ) -> None:
+        try:
+            file_stat = file_path.stat()
+            if compression is None:
+                their_lines = Document(
+                    file_path.read_text(encoding='utf-8')
+                ).lines
+            else:
+                their_lines = Document(
+                    read_decompressed(
+                        file_path=file_path, compression=compression
+                    ).decode('utf-8')
+                ).lines
+            disk_snapshot = FileSnapshot(
+                size=file_stat.st_size,
+                mtime_ns=file_stat.st_mtime_ns,
+                content_hash=hash_file(file_path=file_path),
+            )
+        except (*DECOMPRESSION_ERRORS, UnicodeDecodeError) as error:
+            self.call_from_thread(
+                self.notify_file_merge_error, file_path=file_path, error=error
+            )
+            return
+        merged_lines, has_conflicts = merge_lines(
+            base_lines=base_lines,
+            our_lines=our_lines,
+            their_lines=their_lines,
+        )
+        self.call_from_thread(
+            self.apply_merged_lines,
+            file_snapshot=file_snapshot,
+            disk_snapshot=disk_snapshot,
+            their_lines=their_lines,
+            merged_lines=merged_lines,
+            has_conflicts=has_conflicts,
+        )
+
+    def notify_file_merge_error(
+        self, file_path: Path, error: Exception
+    ) -> None:
+        self.notify(
+            title='❌',
+            message=f'Fail to merge `{str(file_path)}` | {str(error)}.',
+            severity='error',
+            timeout=10,
+        )
+        self.bell()
+
+    def apply_merged_lines(
+        self,
+        file_snapshot: FileSnapshot,
+        disk_snapshot: FileSnapshot,
+        their_lines: list[str],
+        merged_lines: list[str],
+        has_conflicts: bool,
+    ) -> None:
+        if file_snapshot is not self.file_snapshot:
+            return
+        self.text_area.replace(
+            insert=self.text_area.document.newline.join(merged_lines),
+            start=(0, 0),
+            end=self.text_area.document_end,
+        )
+        self.file_snapshot = disk_snapshot
+        self.file_base_lines = their_lines
+        if has_conflicts:
+            self.notify(
+                title='⚠️',
+                message='Merged with conflicts, look for `<<<<<<< editor`.',
+                severity='warning',
+                timeout=10,
+            )
+        else:
+            self.notify(
+                title='✅',
+                message='Merged the changes from disk.',
+                timeout=4,
+            )
+
+    def action_toggle_follow_mode(self) -> None:
+        if self.file_follower is not None:
+            self.stop_following()
+            return
+        if self.file_selected is None:
+            self.notify(
+                title='❌',
+                message='Open a file before following it.',
+                severity='error',
+                timeout=4,
+            )
+            self.bell()
+            return
+        if self.file_loading:
+            self.notify(
+                title='❌',
+                message='Wait for the file to finish loading.',
+                severity='error',
+                timeout=4,
+            )
+            self.bell()
+            return
+        if self.csv_table.csv_file is not None:
+            self.notify(
+                title='❌',
+                message='Show the file as text (f4) before following it.',
+                severity='error',
+                timeout=4,
+            )
+            self.bell()
+            return
+        if self.file_compression is not None:
+            self.notify(
+                title='❌',
+                message='Compressed files can not be followed.',
+                severity='error',
+                timeout=4,
+            )
+            self.bell()
+            return
+
+        self.start_following()
+
+    def start_following(self) -> None:
+        try:
+            self.file_follower = FileFollower(
+                file_path=self.file_selected, offset=self.file_selected_size
+            )
+        except OSError:
+            self.notify(
+                title='❌',
+                message=f'Fail to follow `{str(self.file_selected)}`.',
+                severity='error',
+                timeout=10,
+            )
+            self.bell()
+            return
+
+        current_config = ConfigManager.get()
+        self.follow_max_lines = current_config.follow_max_lines
+        self.follow_timer = self.set_interval(
+            current_config.follow_poll_interval, self.poll_followed_file
+        )
+        self.text_area.read_only = True
+        self.text_area.set_status(key='follow', value='Following')
+        self.poll_followed_file()
+
+    def stop_following(self) -> None:
+        if self.file_follower is None:
+            return
+        self.follow_timer.stop()
+        self.follow_timer = None
+        self.file_follower = None
+        # Saving the lines kept would lose the dropped ones, the file stays
+        # read-only until it is opened again
+        self.text_area.read_only = self.file_truncated
+        self.text_area.set_status(key='follow', value=None)
+        if not self.file_truncated:
+            self.file_base_lines = list(self.text_area.document.lines)
+            self.hash_file_selected(
+                file_path=self.file_selected, file_snapshot=self.file_snapshot
+            )
+
+    def poll_followed_file(self) -> None:
+        # One read at a time, a slow read would otherwise let the next one
+        # append its chunk first
+        if self.follow_reading or self.file_follower is None:
+            return
+        self.follow_reading = True
+        self.read_followed_file(file_follower=self.file_follower)
+
+    @work(thread=True, group='follow', exit_on_error=False)
+    def read_followed_file(self, file_follower: FileFollower) -> None:
+        text, rotated = '', False
+        try:
+            text, rotated = file_follower.read_appended()
+        finally:
+            self.call_from_thread(
+                self.append_followed_text, file_follower, text, rotated
+            )
+
+    def append_followed_text(
+        self, file_follower: FileFollower, text: str, rotated: bool
+    ) -> None:
+        self.follow_reading = False
+        if file_follower is not self.file_follower or not (text or rotated):
+            return
+
+        if rotated:
+            self.text_area.load_text(text)
+            if self.file_truncated:
+                self.file_truncated = False
+                self.text_area.set_status(key='truncated', value=None)
+        else:
+            self.text_area.insert(
+                text=text, location=self.text_area.document_end
+            )
+
+        # Keep only the newest lines, like a ring buffer
+        lines_to_drop = (
+            self.text_area.document.line_count - self.follow_max_lines
+        )
+        if lines_to_drop > 0:
+            self.text_area.delete(start=(0, 0), end=(lines_to_drop, 0))
+            if not self.file_truncated:
+                self.file_truncated = True
+                self.text_area.set_status(key='truncated', value='Truncated')
+        self.text_area.history.clear()
+        self.text_area.update_history_status()
+        self.text_area.move_cursor(self.text_area.document_end)
+
+        # The buffer holds the file up to the offset read, the changes made
+        # on disk after it are still detected
+        self.file_selected_size = file_follower.offset
+        self.file_snapshot = FileSnapshot(
+            size=file_follower.offset,
+            mtime_ns=file_follower.mtime_ns,
+            content_hash=None,
+        )
+
+    def action_format_json(self, minify: bool) -> None:
+        if self.json_formatting:
+            self.cancel_json_format()
+            self.notify(message='Formatting cancelled.', timeout=4)
+            return
+        if self.file_loading:
+            self.notify(
+                title='❌',
+                message='Wait for the file to finish loading.',
+                severity='error',
+                timeout=4,
+            )
+            self.bell()
+            return
+        if self.text_area.read_only:
+            self.notify(
+                title='❌',
+                message='The open file is read-only.',
+                severity='error',
+                timeout=4,
+            )
+            self.bell()
+            return
+
+        self.json_formatting = True
+        self.text_area.set_status(key='json-format', value='Formatting 0%')
+        self.format_json(
+            text=self.text_area.text,
+            indent=None if minify else self.text_area.tab_size,
+            version=self.text_area.content_version,
+        )
+
+    def cancel_json_format(self) -> None:
+        self.workers.cancel_group(self, 'json-format')
+        if self.json_formatting:
+            self.json_formatting = False
+            self.text_area.set_status(key='json-format', value=None)
+
+    @work(
+        thread=True,
+        exclusive=True,
+        group='json-format',
+        description='format_json',
+        exit_on_error=False,
+    )
+    def format_json(
+        self, text: str, indent: Optional[int], version: int
+    ) -> None:
+        worker = get_current_worker()
+        # Big documents are formatted in another process, the tokenizer
+        # holds the GIL and would make the editor stutter
+        executor = (
+            create_process_pool()
+            if len(text) > JSON_FORMAT_CHUNK_SIZE
+            else None
+        )
+        state: JsonFormatState = JSON_INITIAL_STATE
+        formatted_chunks = []
+        offset = 0
+        chunk_size = JSON_FORMAT_CHUNK_SIZE
+        try:
+            while True:
+                end = min(offset + chunk_size, len(text))
+                is_final = end == len(text)
+                arguments = (text[offset:end], state, indent, is_final)
+                if executor is None:
+                    formatted, state, consumed = format_json_chunk(*arguments)
+                else:
+                    formatted, state, consumed = executor.submit(
+                        format_json_chunk, *arguments
+                    ).result()
+                if worker.is_cancelled:
+                    return
+                formatted_chunks.append(formatted)
+                offset += consumed
+                if is_final:
+                    break
+                # A token longer than the chunk, as a huge string
+                chunk_size = chunk_size * 2 if not consumed else chunk_size
+                self.call_from_thread(
+                    self.update_json_format_progress,
+                    percent=offset * 100 // len(text),
+                )
+        except JsonFormatError as error:
+            error_offset = offset + error.offset
+            line = text.count('\n', 0, error_offset)
+            column = error_offset - (text.rfind('\n', 0, error_offset) + 1)
+            self.call_from_thread(
+                self.fail_json_format,
+                message=f'{error.message} at {line + 1}:{column + 1}.',
+                location=(line, column),
+            )
+            return
+        finally:
+            if executor is not None:
+                executor.shutdown(wait=False, cancel_futures=True)
+
+        formatted_text = ''.join(formatted_chunks)
+        if not worker.is_cancelled:
+            self.call_from_thread(
+                self.apply_json_format, text=formatted_text, version=version
+            )
+
+    def update_json_format_progress(self, percent: int) -> None:
+        if self.json_formatting:
+            self.text_area.set_status(
+                key='json-format', value=f'Formatting {percent}%'
+            )
+
+    def fail_json_format(
+        self, message: str, location: tuple[int, int]
+    ) -> None:
+        if not self.json_formatting:
+            return
+        self.cancel_json_format()
+        self.text_area.move_cursor(location, center=True)
+        self.notify(
+            title='❌',
+            message=f'Invalid JSON, {message}',
+            severity='error',
+            timeout=10,
+        )
+        self.bell()
+
+    def apply_json_format(self, text: str, version: int) -> None:
+        if not self.json_formatting:
+            return
+        self.cancel_json_format()
+        if version != self.text_area.content_version:
+            self.notify(
+                title='❌',
+                message='The file changed while formatting, try again.',
+                severity='error',
+                timeout=4,
+            )
+            self.bell()
+            return
+        # A single edit, undone at once with ctrl+z
+        self.text_area.replace(
+            insert=text, start=(0, 0), end=self.text_area.document_end
+        )
+        self.text_area.move_cursor((0, 0))
+
+    def action_toggle_profiler(self) -> None:
+        if self.profiler.is_running:
+            self.stop_profiler()
+            if self.profile_path is not None:
+                self.notify(
+                    title='✅',
+                    message=f'Profile saved to `{str(self.profile_path)}`.',
+                    timeout=10,
+                )
+            return
+        self.profiler.start()
+        self.notify(
+            title='⏺',
+            message='Profiling, press f9 again to stop.',
+            timeout=4,
+        )
+
+    def get_profile_metadata(self) -> dict[str, object]:
+        metadata = {'dir_path': str(self.dir_path), 'file_path': None}
+        if self.file_selected is not None:
+            metadata.update(
+                file_path=str(self.file_selected),
+                file_size=self.file_selected_size,
+                language=self.text_area.language,
+                line_count=self.text_area.document.line_count,
+                soft_wrap=self.text_area.soft_wrap,
+                following=self.file_follower is not None,
+            )
+        return metadata
+
+    def stop_tracer(self) -> None:
+        self.tracer.uninstall()
+        try:
+            self.trace_path = self.tracer.dump(
+                metadata=self.get_profile_metadata()
+            )
+        except OSError:
+            self.trace_path = None
+
+    def stop_profiler(self) -> None:
+        try:
+            self.profile_path = self.profiler.stop(
+                metadata=self.get_profile_metadata()
+            )
+        except OSError as error:
+            self.profile_path = None
+            self.notify(
+                title='❌',
+                message=f'Fail to save the profile | {str(error)}.',
+                severity='error',
+                timeout=10,
+            )
+            self.bell()
+
+    def action_toggle_directory_tree_visibility(self) -> None:
+        if self.dir_tree.styles.display == 'none':
+            self.dir_tree.styles.display = 'block'
+        elif self.dir_tree.styles.display == 'block':
+            self.dir_tree.styles.display = 'none'
+
+    def action_show_modal_configs(self) -> None:
+        if self.modal_screen_active:
+            return
+        self.push_screen(screen=ConfigsScreen())
+        self.modal_screen_active = True
+
+    def action_toggle_outline_visibility(self) -> None:
+        if self.outline.styles.display == 'none':
+            self.outline.styles.display = 'block'
+            self.refresh_outline()
+        elif self.outline.styles.display == 'block':
+            self.outline.styles.display = 'none'
+
+    @on(CustomTextArea.Changed)
+    def on_text_changed(self) -> None:
+        if self.find_bar.styles.display != 'none':
+            self.find_bar.set_status('…')
+            if self.find_timer is not None:
+                self.find_timer.stop()
+            self.find_timer = self.set_timer(
+                FIND_REFRESH_DELAY, self.request_find_matches
+            )
+        if self.outline.styles.display == 'none':
+            return
+        if self.outline_timer is not None:
+            self.outline_timer.stop()
+        self.outline_timer = self.set_timer(
+            OUTLINE_REFRESH_DELAY, self.refresh_outline
+        )
+
+    def refresh_outline(self) -> None:
+        if self.outline.styles.display == 'none':
+            return
+        if self.text_area.is_symbol_index_current:
+            self.outline.set_symbols(self.text_area.symbol_index.symbols)
+        elif not self.request_symbol_index():
+            self.outline.set_symbols([])
+
+    def request_symbol_index(self) -> bool:
+        """
+        Builds the symbol index of the open file in a worker, returns False
+        if its language has no outline
+        """
+        language = self.text_area.language
+        if self.file_selected is None or language not in OUTLINE_LANGUAGES:
+            return False
+        if not self.file_loading:
+            self.build_symbol_index(
+                text=self.text_area.text,
+                language=language,
+                version=self.text_area.content_version,
+            )
+        return True
+
+    @work(
+        thread=True,
+        exclusive=True,
+        group='symbol-index',
+        description='build_symbol_index',
+        exit_on_error=False,
+    )
+    def build_symbol_index(
+        self, text: str, language: str, version: int
+    ) -> None:
+        symbol_index = SymbolIndex.build(
+            text=text, language=language, version=version
+        )
+        if symbol_index is not None and not get_current_worker().is_cancelled:
+            self.call_from_thread(self.set_symbol_index, symbol_index)
+
+    def set_symbol_index(self, symbol_index: SymbolIndex) -> None:
+        if symbol_index.version != self.text_area.content_version:
+            return
+        self.text_area.symbol_index = symbol_index
+        self.refresh_outline()
+        if isinstance(self.screen, GoToScreen):
+            self.screen.update_results()
+
+    @on(SymbolOutline.SymbolSelected)
+    def on_symbol_selected(self, event: SymbolOutline.SymbolSelected) -> None:
+        line, column, _, _, _ = event.symbol
+        self.go_to_location(location=(line, column))
+
+    def go_to_location(self, location: tuple[int, int]) -> None:
+        row, column = location
+        if self.csv_table.csv_file is not None:
+            self.csv_table.go_to_row(row=row, center=True)
+            self.csv_table.focus()
+            return
+        row = min(row, self.text_area.document.line_count - 1)
+        self.text_area.move_cursor((row, column), center=True)
+        self.text_area.focus()
+
+    def go_to_file_location(
+        self, file_path: Path, location: tuple[int, int]
+    ) -> None:
+        if file_path == self.file_selected and not self.file_loading:
+            self.go_to_location(location=location)
+            return
+        if not file_path.is_file():
+            self.notify(
+                title='❌',
+                message=f'File `{str(file_path)}` not exists or is not a file.',
+                severity='error',
+                timeout=10,
+            )
+            self.bell()
+            self.index_workspace_paths(paths=[file_path])
+            return
+        self.open_file(file_path=file_path, cursor_location=location)
+        self.text_area.focus()
+
+    def action_toggle_find_bar(self) -> None:
+        if self.find_bar.styles.display == 'none':
+            self.find_bar.styles.display = 'block'
+            self.find_origin = min(self.text_area.selection)
+            selected_text = self.text_area.selected_text
+            if selected_text and '\n' not in selected_text:
+                self.find_bar.input_find.value = selected_text
+            self.find_bar.input_find.focus()
+            self.update_find()
+        elif self.find_bar.styles.display == 'block':
+            self.find_bar.styles.display = 'none'
+            self.workers.cancel_group(self, 'find')
+            self.text_area.set_find_pattern(None)
+            self.text_area.focus()
+
+    @on(FindBar.Changed)
+    def update_find(self) -> None:
+        """
+        Highlights the visible matches right away, the worker selects the
+        first match from where the find started then finds the matches of the
+        whole buffer
+        """
+        self.workers.cancel_group(self, 'find')
+        try:
+            pattern = self.find_bar.get_pattern()
+        except re.error:
+            self.text_area.set_find_pattern(None)
+            self.find_bar.set_status('Invalid regex')
+            return
+        self.text_area.set_find_pattern(pattern)
+        if pattern is None:
+            self.find_bar.set_status('')
+            return
+
+        self.find_select_pending = True
+        self.find_bar.set_status('…')
+        self.request_find_matches(select_from=self.find_origin)
+
+    def request_find_matches(
+        self, select_from: Optional[tuple[int, int]] = None
+    ) -> None:
+        pattern = self.text_area.find_pattern
+        if pattern is None or self.file_loading:
+            return
+        # The worker gets a copy of the line list, edits replace its items
+        self.find_matches(
+            lines=list(self.text_area.document.lines),
+            pattern=pattern,
+            version=self.text_area.content_version,
+            select_from=select_from,
+        )
+
+    @work(
+        thread=True,
+        exclusive=True,
+        group='find',
+        description='find_matches',
+        exit_on_error=False,
+    )
+    def find_matches(
+        self,
+        lines: list[str],
+        pattern: re.Pattern,
+        version: int,
+        select_from: Optional[tuple[int, int]],
+    ) -> None:
+        worker = get_current_worker()
+        if select_from is not None:
+            # The match next to `select_from` is selected without waiting for
+            # the whole buffer to be searched
+            first_matches = find_in_lines(
+                lines=lines,
+                pattern=pattern,
+                start=select_from,
+                max_size=FIND_INCREMENTAL_MAX_SIZE,
+                max_matches=1,
+                is_cancelled=lambda: worker.is_cancelled,
+            )
+            if first_matches is None or worker.is_cancelled:
+                return
+            first_matches.version = version
+            self.call_from_thread(
+                self.select_first_find_match, first_matches, pattern
+            )
+        find_matches = find_in_lines(
+            lines=lines,
+            pattern=pattern,
+            is_cancelled=lambda: worker.is_cancelled,
+        )
+        if find_matches is not None and not worker.is_cancelled:
+            find_matches.version = version
+            self.call_from_thread(self.set_find_matches, find_matches, pattern)
+
+    def select_first_find_match(
+        self, find_matches: FindMatches, pattern: re.Pattern
+    ) -> None:
+        if (
+            find_matches.version != self.text_area.content_version
+            or pattern is not self.text_area.find_pattern
+            or not self.find_select_pending
+        ):
+            return
+        if find_matches:
+            self.find_select_pending = False
+            self.select_find_match(*find_matches.get_match(0))
+        else:
+            self.text_area.move_cursor(self.find_origin)
+
+    def set_find_matches(
+        self, find_matches: FindMatches, pattern: re.Pattern
+    ) -> None:
+        if (
+            find_matches.version != self.text_area.content_version
+            or pattern is not self.text_area.find_pattern
+        ):
+            return
+        self.text_area.find_matches = find_matches
+        if self.find_select_pending:
+            self.find_select_pending = False
+            index = find_matches.find_next(
+                location=self.find_origin, include_location=True
+            )
+            if index is not None:
+                self.select_find_match(*find_matches.get_match(index))
+        self.update_find_status()
+
+    @on(CustomTextArea.SelectionChanged)
+    def update_find_status(self) -> None:
+        if (
+            self.find_bar.styles.display == 'none'
+            or not self.text_area.is_find_matches_current
+        ):
+            return
+        find_matches = self.text_area.find_matches
+        match_count = f'{len(find_matches)}'
+        if not find_matches.is_complete:
+            match_count += '+'
+        index = find_matches.index_of(*sorted(self.text_area.selection))
+        if not find_matches:
+            self.find_bar.set_status('No matches')
+        elif index is None:
+            self.find_bar.set_status(f'{match_count} matches')
+        else:
+            self.find_bar.set_status(f'{index + 1} of {match_count}')
+
+    def select_find_match(
+        self, start: tuple[int, int], end: tuple[int, int]
+    ) -> None:
+        self.text_area.selection = Selection(start=start, end=end)
+        self.text_area.scroll_cursor_visible(center=True)
+
+    @on(FindBar.Submitted)
+    def action_find_next(self) -> None:
+        self.go_to_find_match(forward=True)
+
+    def action_find_previous(self) -> None:
+        self.go_to_find_match(forward=False)
+
+    def go_to_find_match(self, forward: bool) -> None:
+        """
+        Jumps through the matches found by the worker, until they are found
+        again after an edit the worker selects the next match from the cursor
+        """
+        if (
+            self.find_bar.styles.display == 'none'
+            or self.text_area.find_pattern is None
+        ):
+            return
+        start, end = sorted(self.text_area.selection)
+        if self.text_area.is_find_matches_current:
+            find_matches = self.text_area.find_matches
+            if forward:
+                index = find_matches.find_next(
+                    location=start, include_location=start == end
+                )
+            else:
+                index = find_matches.find_previous(location=start)
+        elif forward:
+            self.find_origin = end
+            self.find_select_pending = True
+            self.request_find_matches(select_from=end)
+            return
+        else:
+            index = None
+        if index is None:
+            self.bell()
+            return
+        self.find_origin, _ = match = find_matches.get_match(index)
+        self.select_find_match(*match)
+
+    def action_show_modal_workspace_symbols(self) -> None:
+        if self.modal_screen_active:
+            return
+        self.push_screen(
+            screen=WorkspaceSymbolsScreen(
+                symbol_name=self.text_area.selected_text.strip().split('\n')[0]
+            )
+        )
+        self.modal_screen_active = True
+
+    def action_show_modal_go_to(self) -> None:
+        if self.modal_screen_active or self.file_selected is None:
+            return
+        self.push_screen(screen=GoToScreen())
+        self.modal_screen_active = True
+
+    def action_show_modal_find_replace(self) -> None:
+        if self.modal_screen_active:
+            return
+        self.push_screen(screen=FindReplaceScreen())
         self.modal_screen_active = True
 
     def action_show_modal_help(self) -> None:
@@ -0,0 +1,183 @@
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from itertools import islice
+from pathlib import Path
+from typing import Optional
+import argparse
+import glob
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+from tiny_code.utils import comment_or_uncomment_text, tab_text
+
+TRANSFORMS = ('tab', 'untab', 'toggle-comment')
+LINES_PER_CHUNK = 10000
+
+
+def transform_text(
+    text: str, transform: str, tab_size: int, comment_char: str
+) -> str:
+    if transform == 'tab':
+        return tab_text(text=text, action='tab', tab_size=tab_size)
+    elif transform == 'untab':
+        return tab_text(text=text, action='shift+tab', tab_size=tab_size)
+    elif transform == 'toggle-comment':
+        return comment_or_uncomment_text(text=text, comment_char=comment_char)
+    raise ValueError(f'Unknown transform `{transform}`')
+
+
+def transform_file(
+    file_path: str,
+    transform: str,
+    tab_size: int,
+    comment_char: str,
+    check: bool,
+) -> tuple[str, int, bool, float, Optional[str]]:
+    """
+    Applies the transform line by line, streaming the file into a temporary
+    file that atomically replaces the original one if anything changed
+
+    Returns a tuple with the file path, its size, if it changed, the elapsed
+    seconds and an error message
+    """
+    start_time = time.perf_counter()
+    file_path = Path(file_path)
+    file_size = 0
+    changed = False
+    file_descriptor, temp_path = tempfile.mkstemp(
+        dir=file_path.parent, prefix=f'.{file_path.name}.', suffix='.tmp'
+    )
+    try:
+        with open(
+            file_path, 'r', encoding='utf-8', newline=''
+        ) as source_file, os.fdopen(
+            file_descriptor, 'w', encoding='utf-8', newline=''
+        ) as temp_file:
+            while lines := list(islice(source_file, LINES_PER_CHUNK)):
+                bodies = [line.rstrip('\r\n') for line in lines]
+                transformed_bodies = transform_text(
+                    text='\n'.join(bodies),
+                    transform=transform,
+                    tab_size=tab_size,
+                    comment_char=comment_char,
+                ).split('\n')
+                changed = changed or transformed_bodies != bodies
+                temp_file.writelines(
+                    transformed_body + line[len(body) :]
+                    for line, body, transformed_body in zip(
+                        lines, bodies, transformed_bodies
+                    )
+                )
+                file_size += sum(len(line) for line in lines)
+
+        if changed and not check:
+            shutil.copymode(file_path, temp_path)
+            os.replace(temp_path, file_path)
+        else:
+            os.unlink(temp_path)
+    except Exception as error:
+        if os.path.exists(temp_path):
+            os.unlink(temp_path)
+        return (
+            str(file_path),
+            file_size,
+            False,
+            time.perf_counter() - start_time,
+            str(error),
+        )
+
+    return (
+        str(file_path),
+        file_size,
+        changed,
+        time.perf_counter() - start_time,
+        None,
+    )
+
+
+def find_files(patterns: list[str]) -> list[str]:
+    file_paths = {}
+    for pattern in patterns:
+        for path in glob.glob(pattern, recursive=True) or [pattern]:
+            if os.path.isdir(path):
+                for dir_path, dir_names, file_names in os.walk(path):
+                    dir_names[:] = [
+                        name for name in dir_names if name != '.git'
+                    ]
+                    for file_name in file_names:
+                        file_paths[os.path.join(dir_path, file_name)] = None
+            elif os.path.isfile(path):
+                file_paths[path] = None
+    return list(file_paths)
+
+
+def run_batch(argv: list[str]) -> int:
+    parser = argparse.ArgumentParser(
+        prog='tiny-code batch',
+        description='Apply a tiny-code transform to many files in parallel',
+    )
+    parser.add_argument('transform', choices=TRANSFORMS)
+    parser.add_argument('paths', nargs='+', help='files, directories or globs')
+    parser.add_argument('--tab-size', type=int, default=4)
+    parser.add_argument('--comment-char', default='#')
+    parser.add_argument(
+        '--jobs', type=int, default=None, help='number of worker processes'
+    )
+    parser.add_argument(
+        '--check',
+        action='store_true',
+        help='do not write, exit with 1 if any file would change',
+    )
+    parser.add_argument(
+        '--quiet', action='store_true', help='only print the summary'
+    )
+    args = parser.parse_args(argv)
+
+    file_paths = find_files(patterns=args.paths)
+    if not file_paths:
+        print('No files found', file=sys.stderr)
+        return 1
+
+    start_time = time.perf_counter()
+    total_size = 0
+    changed_count = 0
+    error_count = 0
+    with ProcessPoolExecutor(max_workers=args.jobs) as executor:
+        futures = [
+            executor.submit(
+                transform_file,
+                file_path=file_path,
+                transform=args.transform,
+                tab_size=args.tab_size,
+                comment_char=args.comment_char,
+                check=args.check,
+            )
+            for file_path in file_paths
+        ]
+        for future in as_completed(futures):
+            file_path, file_size, changed, elapsed, error = future.result()
+            total_size += file_size
+            changed_count += changed
+            if error is not None:
+                error_count += 1
+                print(f'ERROR {file_path}: {error}', file=sys.stderr)
+            elif not args.quiet:
+                status = 'changed' if changed else 'unchanged'
+                print(
+                    f'{elapsed * 1000:9.2f} ms {file_size:>12} chars '
+                    f'{status:>9} {file_path}'
+                )
+
+    elapsed = time.perf_counter() - start_time
+    print(
+        f'{len(file_paths)} files ({changed_count} changed, {error_count} '
+        f'errors), {total_size} chars in {elapsed:.2f}s: '
+        f'{len(file_paths) / elapsed:.1f} files/s, '
+        f'{total_size / elapsed / 1024 / 1024:.2f} M chars/s'
+    )
+
+    if error_count or (args.check and changed_count):
+        return 1
+    return 0
@@ -0,0 +1,181 @@
+from pathlib import Path
+from typing import Callable
+import argparse
+import importlib
+import json
+import random
+import statistics
+import sys
+import timeit
+
+from tiny_code import utils
+from tiny_code.consts import BENCHMARKS_DIR_PATH
+
+BENCH_FUNCTIONS = (
+    'find_first_char_non_void',
+    'closest_multiple_of',
+    'tab_text',
+    'comment_or_uncomment_text',
+)
+DEFAULT_SIZES = (1, 100, 10000, 1000000)
+INDENTS = ('', '', '    ', '        ', '  ', '\t', '\t\t', '\t    ', '  \t ')
+BODIES = (
+    'x = 1',
+    'return value',
+    '# comment',
+    '#comment',
+    '; comment',
+    'if a and b:',
+    'print("#")',
+    'é = "ünïcode"',
+    '',
+    '   ',
+    '\t',
+)
+
+
+def generate_text(line_count: int, seed: int) -> str:
+    """
+    Lines of code indented with spaces, tabs or both, with blank,
+    whitespace-only and commented lines
+    """
+    generator = random.Random(seed)
+    return '\n'.join(
+        generator.choice(INDENTS) + generator.choice(BODIES)
+        for _ in range(line_count)
+    )
+
+
+def get_cases(
+    functions: dict[str, Callable], text: str
+) -> dict[str, Callable[[], object]]:
+    """
+    Calls to measure on `text`, the functions of one line are called on
+    every line
+    """
+    lines = text.split('\n')
+    indent_widths = [
+        functions['find_first_char_non_void'](line) for line in lines
+    ]
+    find_first_char_non_void = functions['find_first_char_non_void']
+    closest_multiple_of = functions['closest_multiple_of']
+    tab_text = functions['tab_text']
+    comment_or_uncomment_text = functions['comment_or_uncomment_text']
+    return {
+        'find_first_char_non_void': lambda: [
+            find_first_char_non_void(line) for line in lines
+        ],
+        'closest_multiple_of': lambda: [
+            closest_multiple_of(4, width, 'up') for width in indent_widths
+        ],
+        'tab_text(tab)': lambda: tab_text(text, 'tab', 4),
+        'tab_text(shift+tab)': lambda: tab_text(text, 'shift+tab', 4),
+        'comment_or_uncomment_text': lambda: comment_or_uncomment_text(
+            text, '#'
+        ),
+    }
+
+
+def measure(case: Callable[[], object], repeat: int) -> float:
+    """
+    Median seconds per call, each sample runs for at least 0.2s
+    """
+    timer = timeit.Timer(case)
+    number, _ = timer.autorange()
+    return statistics.median(
+        elapsed / number for elapsed in timer.repeat(repeat, number)
+    )
+
+
+def run_bench(argv: list[str]) -> int:
+    parser = argparse.ArgumentParser(
+        prog='tiny-code bench',
+        description='Time the indent and comment helpers and compare them '
+        'with a saved baseline',
+    )
+    parser.add_argument(
+        '--sizes',
+        type=lambda sizes: [int(size) for size in sizes.split(',')],
+        default=list(DEFAULT_SIZES),
+        help='comma separated line counts of the generated texts',
+    )
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument(
+        '--threshold',
+        type=float,
+        default=1.25,
+        help='slowdown from the baseline reported as a regression',
+    )
+    parser.add_argument(
+        '--save-baseline',
+        action='store_true',
+        help='save the timings as the baseline instead of comparing them',
+    )
+    parser.add_argument(
+        '--baseline',
+        default=str(BENCHMARKS_DIR_PATH.joinpath('baseline.json')),
+    )
+    parser.add_argument(
+        '--candidate',
+        help='module with reimplementations of the helpers, timed instead of '
+        'the current ones',
+    )
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+
+    functions = {name: getattr(utils, name) for name in BENCH_FUNCTIONS}
+    if args.candidate is not None:
+        try:
+            candidate = importlib.import_module(args.candidate)
+        except ImportError as error:
+            print(f'ERROR {error}', file=sys.stderr)
+            return 1
+        functions.update(
+            (name, getattr(candidate, name))
+            for name in BENCH_FUNCTIONS
+            if hasattr(candidate, name)
+        )
+
+    baseline = {}
+    if not args.save_baseline:
+        try:
+            with open(args.baseline, encoding='utf-8') as baseline_file:
+                baseline = json.load(baseline_file)
+        except (OSError, ValueError):
+            print(f'No baseline in `{args.baseline}`, use --save-baseline')
+
+    timings = {}
+    regressions = 0
+    for size in args.sizes:
+        text = generate_text(line_count=size, seed=args.seed)
+        for name, case in get_cases(functions=functions, text=text).items():
+            key = f'{name}/{size}'
+            timings[key] = measure(case=case, repeat=args.repeat)
+            comparison = ''
+            if key in baseline:
+                ratio = timings[key] / baseline[key]
+                comparison = f'{ratio:6.2f}x baseline'
+                if ratio > args.threshold:
+                    regressions += 1
+                    comparison += ' REGRESSION'
+            print(
+                f'{timings[key] * 1000:12.4f} ms {size:>9} lines '
+                f'{name:<28} {comparison}'
+            )
+
+    if args.save_baseline:
+        Path(args.baseline).parent.mkdir(parents=True, exist_ok=True)
+        utils.atomic_write_text(
+            file_path=args.baseline, text=json.dumps(timings, indent=4)
+        )
+        print(f'Baseline saved to `{args.baseline}`')
+        return 0
+
+    if regressions:
+        print(
+            f'{regressions} timings slower than {args.threshold}x the '
+            'baseline',
+            file=sys.stderr,
+        )
+        return 1
+    return 0
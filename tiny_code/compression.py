@@ -0,0 +1,84 @@
+from pathlib import Path
+from typing import BinaryIO, Optional
+import bz2
+import gzip
+import lzma
+import stat
+
+from tiny_code.utils import atomic_write_bytes
+
+# Compression: (magic number, file suffix)
+COMPRESSIONS = {
+    'gzip': (b'\x1f\x8b', '.gz'),
+    'bzip2': (b'BZh', '.bz2'),
+    'xz': (b'\xfd7zXZ\x00', '.xz'),
+}
+
+# Errors of a corrupted or truncated compressed stream
+DECOMPRESSION_ERRORS = (OSError, EOFError, lzma.LZMAError)
+
+
+def detect_compression(file_path: Path) -> Optional[str]:
+    """
+    Looks at the magic number, not at the suffix
+    """
+    with file_path.open('rb') as file:
+        header = file.read(
+            max(len(magic_number) for magic_number, _ in COMPRESSIONS.values())
+        )
+    for compression, (magic_number, _) in COMPRESSIONS.items():
+        if header.startswith(magic_number):
+            return compression
+    return None
+
+
+def strip_compression_suffix(
+    file_path: Path, compression: Optional[str]
+) -> Path:
+    """
+    `app.log.gz` => `app.log`, to pick the language of the compressed file
+    """
+    if (
+        compression is not None
+        and file_path.suffix.lower() == COMPRESSIONS[compression][1]
+    ):
+        return file_path.with_suffix('')
+    return file_path
+
+
+def open_decompressed(file: BinaryIO, compression: str) -> BinaryIO:
+    """
+    Decompresses `file` as it is read, the position of `file` tells how much
+    of the compressed data was read
+    """
+    if compression == 'gzip':
+        return gzip.GzipFile(fileobj=file, mode='rb')
+    if compression == 'bzip2':
+        return bz2.BZ2File(file, mode='rb')
+    return lzma.LZMAFile(file, mode='rb')
+
+
+def read_decompressed(file_path: Path, compression: str) -> bytes:
+    with file_path.open('rb') as file:
+        return open_decompressed(file=file, compression=compression).read()
+
+
+def write_compressed(file_path: Path, data: bytes, compression: str) -> None:
+    """
+    The file is replaced by a copy compressed next to it, so it is never left
+    half written, and keeps its permissions
+    """
+    if compression == 'gzip':
+        # Level 6 is the default of the gzip command, 9 is much slower
+        data = gzip.compress(data, compresslevel=6)
+    elif compression == 'bzip2':
+        data = bz2.compress(data)
+    else:
+        data = lzma.compress(data)
+    # Replacing a symlink would turn it into a file
+    file_path = file_path.resolve()
+    try:
+        mode = stat.S_IMODE(file_path.stat().st_mode)
+    except FileNotFoundError:
+        mode = None
+    atomic_write_bytes(file_path=file_path, data=data, mode=mode)
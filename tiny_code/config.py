@@ -16,6 +16,17 @@ class ConfigManager:
             break_lines=current_config.get('break_lines'),
             theme=current_config.get('theme'),
             tab_size=current_config.get('tab_size'),
+            show_ignored_files=current_config.get('show_ignored_files', False),
+            undo_memory_limit_mb=current_config.get(
+                'undo_memory_limit_mb', 64
+            ),
+            follow_max_lines=current_config.get('follow_max_lines', 10000),
+            follow_poll_interval=current_config.get(
+                'follow_poll_interval', 0.5
+            ),
+            long_line_threshold=current_config.get(
+                'long_line_threshold', 10000
+            ),
         )
 
     @classmethod
@@ -1,10 +1,96 @@
 from pathlib import Path
+import os
 
 MODULE_PATH = Path(__file__).parent
 
 JSON_CONFIG_PATH = MODULE_PATH.joinpath('configs/configs.json')
 STYLE_TCSS_PATH = MODULE_PATH.joinpath('styles/style.tcss')
 
+CACHE_DIR_PATH = Path(
+    os.environ.get('XDG_CACHE_HOME', Path.home().joinpath('.cache'))
+).joinpath('tiny-code')
+SESSIONS_DIR_PATH = CACHE_DIR_PATH.joinpath('sessions')
+
+PROFILES_DIR_PATH = CACHE_DIR_PATH.joinpath('profiles')
+TRACES_DIR_PATH = CACHE_DIR_PATH.joinpath('traces')
+BENCHMARKS_DIR_PATH = CACHE_DIR_PATH.joinpath('benchmarks')
+WORKSPACE_INDEXES_DIR_PATH = CACHE_DIR_PATH.joinpath('indexes')
+STDIN_DIR_PATH = CACHE_DIR_PATH.joinpath('stdin')
+FILE_CACHE_DIR_PATH = CACHE_DIR_PATH.joinpath('files')
+TRACE_RING_SIZE = 200000
+TRACE_LAG_INTERVAL = 0.1
+
+SESSION_SAVE_INTERVAL = 30
+SESSION_MAX_LISTING_ENTRIES = 10000
+
+DIRECTORY_PAGE_SIZE = 200
+
+GIT_STATUS_INTERVAL = 5
+
+SEARCH_FILES_PER_TASK = 64
+SEARCH_MAX_FILE_SIZE = 16 * 1024 * 1024
+SEARCH_BINARY_SNIFF_SIZE = 8192
+SEARCH_MAX_PREVIEW_LINES = 3
+SEARCH_MAX_RESULTS = 1000
+
+OUTLINE_REFRESH_DELAY = 0.3
+OUTLINE_MAX_UPDATE_ROWS = 2000
+GO_TO_MAX_RESULTS = 100
+
+FIND_CHUNK_SIZE = 64 * 1024
+FIND_MAX_MATCHES = 1000000
+FIND_INCREMENTAL_MAX_SIZE = 1024 * 1024
+FIND_REFRESH_DELAY = 0.3
+FIND_MATCH_STYLE = 'black on rgb(254,255,172)'
+FIND_CURRENT_MATCH_STYLE = 'bold black on rgb(255,165,0)'
+
+WORKSPACE_INDEX_FILES_PER_TASK = 32
+WORKSPACE_INDEX_BULK_FILES = 1000
+WORKSPACE_INDEX_MAX_FILE_SIZE = 4 * 1024 * 1024
+
+FOLLOW_READ_CHUNK_SIZE = 4 * 1024 * 1024
+
+FILE_FIRST_CHUNK_SIZE = 64 * 1024
+FILE_CHUNK_SIZE = 1024 * 1024
+FILE_MAX_CHUNK_SIZE = 32 * 1024 * 1024
+FILE_DECOMPRESSED_MAX_SIZE = 1024 * 1024 * 1024
+FILE_CACHE_HEAD_SIZE = 64 * 1024
+FILE_CACHE_MAX_SIZE = 256 * 1024 * 1024
+
+STDIN_READ_SIZE = 1024 * 1024
+STDIN_FLUSH_SIZE = 4 * 1024 * 1024
+STDIN_FLUSH_INTERVAL = 0.1
+STDIN_MAX_BUFFER_SIZE = 64 * 1024 * 1024
+
+LONG_LINE_CHUNK_SIZE = 1024
+LONG_LINE_BRACKET_SEARCH_SIZE = 64 * 1024
+
+JSON_FORMAT_CHUNK_SIZE = 4 * 1024 * 1024
+
+DISK_USAGE_THREADS = 8
+DISK_USAGE_REFRESH_INTERVAL = 0.2
+
+CSV_INDEX_CHUNK_SIZE = 1024 * 1024
+CSV_SNIFF_SIZE = 64 * 1024
+CSV_SAMPLE_ROWS = 200
+CSV_MAX_COLUMN_WIDTH = 40
+CSV_ROW_CACHE_SIZE = 1000
+
+FILE_COPY_CHUNK_SIZE = 64 * 1024 * 1024
+FILE_OPERATION_PROGRESS_INTERVAL = 0.1
+
+LANGUAGES_MAP = {
+    '.py': 'python',
+    '.json': 'json',
+    '.toml': 'toml',
+    '.html': 'html',
+    '.yaml': 'yaml',
+    '.yml': 'yaml',
+    '.md': 'markdown',
+    '.sql': 'sql',
+    '.css': 'css',
+}
+
 TEXT_AREA_COLOR_THEMES = ('dracula', 'github_light', 'monokai', 'vscode_dark')
 
 INLINE_COMMENT_CHAR_MAP = {
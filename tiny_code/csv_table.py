@@ -0,0 +1,125 @@
+from array import array
+from itertools import accumulate, islice
+from pathlib import Path
+from typing import Optional
+import csv
+import mmap
+import os
+
+from rich.cells import cell_len
+
+from tiny_code.consts import CSV_MAX_COLUMN_WIDTH, CSV_SNIFF_SIZE
+
+# Delimiter of each file suffix, None to guess it from the file
+CSV_SUFFIXES = {'.csv': None, '.tsv': '\t'}
+
+
+def open_memory_map(file_path: Path) -> tuple[Optional[mmap.mmap], int]:
+    """
+    Read-only map of the file and its size, empty files can not be mapped
+    """
+    with file_path.open('rb') as file:
+        size = os.fstat(file.fileno()).st_size
+        if not size:
+            return None, 0
+        return mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ), size
+
+
+def index_rows(
+    data: mmap.mmap, start: int, end: int, in_quotes: bool
+) -> tuple[array, bool]:
+    """
+    Offsets of the rows starting in `data[start:end]`, and whether `end` is
+    inside a quoted field. A line break only ends a row outside quotes,
+    escaped quotes (`""`) toggle the state twice
+    """
+    row_offsets = array('Q')
+    position = start
+    for index, segment in enumerate(data[start:end].split(b'"')):
+        if index:
+            in_quotes = not in_quotes
+            position += 1
+        if not in_quotes and b'\n' in segment:
+            line_ends = accumulate(
+                (length + 1 for length in map(len, segment.split(b'\n')[:-1])),
+                initial=position,
+            )
+            row_offsets.extend(islice(line_ends, 1, None))
+        position += len(segment)
+    return row_offsets, in_quotes
+
+
+def get_cell_text(cell: str) -> str:
+    return cell.replace('\r\n', '↵').replace('\n', '↵').replace('\t', ' ')
+
+
+def infer_column_widths(rows: list[list[str]]) -> list[int]:
+    column_widths: list[int] = []
+    for row in rows:
+        for column, cell in enumerate(row):
+            width = min(cell_len(get_cell_text(cell)), CSV_MAX_COLUMN_WIDTH)
+            if column == len(column_widths):
+                column_widths.append(max(width, 1))
+            elif width > column_widths[column]:
+                column_widths[column] = width
+    return column_widths
+
+
+class CsvFile:
+    """
+    Rows of a CSV or TSV file parsed from a memory map when they are shown,
+    only the offsets of the rows (8 bytes each) are kept in memory
+    """
+
+    def __init__(self, file_path: Path, delimiter: Optional[str]) -> None:
+        self.file_path = file_path
+        self.data, self.size = open_memory_map(file_path=file_path)
+        self.row_offsets = array('Q', [0] if self.size else [])
+        self.is_indexed: bool = False
+        if delimiter is None:
+            delimiter = self.sniff_delimiter()
+        self.delimiter = delimiter
+
+    def sniff_delimiter(self) -> str:
+        if self.data is None:
+            return ','
+        sample = self.data[:CSV_SNIFF_SIZE].decode('utf-8', errors='replace')
+        try:
+            return csv.Sniffer().sniff(sample, delimiters=',;\t|').delimiter
+        except csv.Error:
+            return ','
+
+    @property
+    def row_count(self) -> int:
+        return len(self.row_offsets)
+
+    def add_row_offsets(self, row_offsets: array) -> None:
+        # A line break ending the file does not start another row, nor do
+        # rows written after the file was mapped
+        while row_offsets and row_offsets[-1] >= self.size:
+            row_offsets.pop()
+        self.row_offsets.extend(row_offsets)
+
+    def get_row(self, row: int) -> list[str]:
+        start = self.row_offsets[row]
+        end = (
+            self.row_offsets[row + 1]
+            if row + 1 < len(self.row_offsets)
+            else self.size
+        )
+        # The last row is only known to end at the end of the file once the
+        # whole file is indexed
+        if row + 1 == len(self.row_offsets) and not self.is_indexed:
+            end = self.data.find(b'\n', start)
+            end = self.size if end == -1 else end + 1
+        text = self.data[start:end].decode('utf-8', errors='replace')
+        text = text.removesuffix('\n').removesuffix('\r')
+        try:
+            return next(csv.reader([text], delimiter=self.delimiter), [])
+        except csv.Error:
+            return [text]
+
+    def close(self) -> None:
+        if self.data is not None:
+            self.data.close()
+            self.data = None
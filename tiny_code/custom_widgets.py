@@ -1,21 +1,63 @@
+from collections import defaultdict
+from itertools import islice
 from pathlib import Path
-from typing import Optional, Union, Iterable
+from typing import Literal, Optional, Union, Iterable, Iterator, Sequence
+import os
+import re
 
 import pyperclip
+from rich.cells import cell_len
 from rich.style import Style
 from rich.text import Text
+from textual import on, work
+from textual.app import ComposeResult
+from textual.binding import Binding
+from textual.containers import Horizontal
+from textual.geometry import Offset, Size
 from textual.events import Key
 from textual.message import Message
-from textual.widgets import DirectoryTree, TextArea
+from textual.reactive import reactive
+from textual.scroll_view import ScrollView
+from textual.strip import Strip
+from textual.widgets import (
+    DirectoryTree,
+    Input,
+    Label,
+    OptionList,
+    Switch,
+    TextArea,
+)
 from textual.widgets._directory_tree import TOGGLE_STYLE, DirEntry, TreeNode
+from textual.document._document_navigator import DocumentNavigator
+from textual.document._wrapped_document import WrappedDocument
+from textual.widgets.text_area import Edit, EditResult, Location, Selection
+from textual.worker import WorkerCancelled, WorkerFailed, get_current_worker
 
 from tiny_code.utils import (
     find_first_char_non_void,
     find_last_char_non_void,
+    format_size,
     tab_text,
     comment_or_uncomment_text,
 )
-from tiny_code.consts import INLINE_COMMENT_CHAR_MAP
+from tiny_code.consts import (
+    CSV_MAX_COLUMN_WIDTH,
+    CSV_ROW_CACHE_SIZE,
+    CSV_SAMPLE_ROWS,
+    DIRECTORY_PAGE_SIZE,
+    FIND_CURRENT_MATCH_STYLE,
+    FIND_MATCH_STYLE,
+    INLINE_COMMENT_CHAR_MAP,
+    LONG_LINE_BRACKET_SEARCH_SIZE,
+)
+from tiny_code.csv_table import CsvFile, get_cell_text, infer_column_widths
+from tiny_code.entities import DirectoryListing, GitStatus
+from tiny_code.git_status import get_path_status
+from tiny_code.history import CompactEditHistory
+from tiny_code.ignore import IgnoreMatcher
+from tiny_code.long_lines import Highlight, LongLineIndex
+from tiny_code.outline import Symbol, SymbolIndex, format_symbol
+from tiny_code.search import FindMatches, compile_pattern
 
 
 class CustomTextArea(TextArea):
@@ -29,12 +71,659 @@ class CustomTextArea(TextArea):
             super().__init__()
             self.content = content
 
-    def __init__(self) -> None:
+    def __init__(self, id: Optional[str] = None) -> None:
         self.tab_size: int = None
-        super().__init__(show_line_numbers=True, soft_wrap=False)
+        self.status: dict[str, str] = {}
+        self.content_version: int = 0
+        self.symbol_index: Optional[SymbolIndex] = None
+        self.find_pattern: Optional[re.Pattern] = None
+        self.find_matches: Optional[FindMatches] = None
+        self.long_line_threshold: int = None
+        self.long_line_mode: bool = False
+        self.long_line_indexes: dict[int, LongLineIndex] = {}
+        # The other view of the document in split mode
+        self.split_peer: Optional[CustomTextArea] = None
+        super().__init__(show_line_numbers=True, soft_wrap=False, id=id)
+        self.history = CompactEditHistory(
+            max_checkpoints=self.history.max_checkpoints,
+            checkpoint_timer=self.history.checkpoint_timer,
+            checkpoint_max_characters=self.history.checkpoint_max_characters,
+        )
+
+    def set_status(self, key: str, value: Optional[str]) -> None:
+        if value is None:
+            self.status.pop(key, None)
+        else:
+            self.status[key] = value
+        self.border_subtitle = ' | '.join(self.status.values()) or None
+
+    def update_history_status(self) -> None:
+        self.set_status(
+            'history',
+            f'Undo {self.history.memory_usage / 1024 / 1024:.1f} MiB',
+        )
+
+    @property
+    def is_symbol_index_current(self) -> bool:
+        return (
+            self.symbol_index is not None
+            and self.symbol_index.version == self.content_version
+        )
+
+    @property
+    def is_find_matches_current(self) -> bool:
+        return (
+            self.find_matches is not None
+            and self.find_matches.version == self.content_version
+        )
+
+    def set_find_pattern(self, pattern: Optional[re.Pattern]) -> None:
+        self.find_pattern = pattern
+        self.find_matches = None
+        self.refresh()
+
+    def _set_theme(self, theme: str) -> None:
+        super()._set_theme(theme)
+        # The theme is a shallow copy, its syntax styles are shared
+        self._theme.syntax_styles = {
+            **self._theme.syntax_styles,
+            'find.match': Style.parse(FIND_MATCH_STYLE),
+            'find.current': Style.parse(FIND_CURRENT_MATCH_STYLE),
+        }
+
+    def get_find_columns(
+        self, line_index: int, start_column: int, end_column: int
+    ) -> list[tuple[int, int, str]]:
+        """
+        Matches of the find pattern between two columns of a line, as syntax
+        highlights with columns
+        """
+        selection = tuple(sorted(self.selection))
+        find_columns = []
+        for match in self.find_pattern.finditer(
+            self.document[line_index], start_column, end_column
+        ):
+            start, end = match.span()
+            if start == end:
+                continue
+            if selection == ((line_index, start), (line_index, end)):
+                highlight_name = 'find.current'
+            else:
+                highlight_name = 'find.match'
+            find_columns.append((start, end, highlight_name))
+        return find_columns
+
+    def get_find_highlights(
+        self, line_index: int
+    ) -> list[tuple[int, int, str]]:
+        """
+        Matches of the find pattern in the visible part of a line, as syntax
+        highlights with utf-8 byte offsets
+        """
+        line = self.document[line_index]
+        scroll_x, _ = self.scroll_offset
+        find_highlights = self.get_find_columns(
+            line_index=line_index,
+            start_column=0,
+            end_column=min(len(line), scroll_x + 2 * self.size.width),
+        )
+        if line.isascii():
+            return find_highlights
+        return [
+            (
+                len(line[:start].encode('utf-8')),
+                len(line[:end].encode('utf-8')),
+                highlight_name,
+            )
+            for start, end, highlight_name in find_highlights
+        ]
+
+    def get_long_line_index(self, row: int) -> Optional[LongLineIndex]:
+        """
+        The index of a line longer than the threshold, None for other lines
+        or when lines are wrapped
+        """
+        if not self.long_line_mode or self.soft_wrap:
+            return None
+        try:
+            line = self.document[row]
+        except IndexError:
+            return None
+        if len(line) <= self.long_line_threshold:
+            return None
+        long_line_index = self.long_line_indexes.get(row)
+        if (
+            long_line_index is None
+            or long_line_index.line is not line
+            or long_line_index.tab_size != self.indent_width
+        ):
+            long_line_index = LongLineIndex(
+                line=line, tab_size=self.indent_width
+            )
+            self.long_line_indexes[row] = long_line_index
+        return long_line_index
+
+    def detect_long_lines(self, lines: Iterable[str]) -> None:
+        if self.long_line_mode or self.long_line_threshold is None:
+            return
+        if max(map(len, lines), default=0) > self.long_line_threshold:
+            self.long_line_mode = True
+            self.set_status(key='long-lines', value='Long lines')
+
+    def render_line(self, y: int) -> Strip:
+        """
+        Long lines are rendered from the chunks under the visible columns.
+        The matches of the find pattern are searched in the rendered lines
+        only and drawn as extra syntax highlights
+        """
+        if self.find_pattern is None and not self.long_line_mode:
+            return super().render_line(y)
+        _, scroll_y = self.scroll_offset
+        try:
+            line_info = self.wrapped_document._offset_to_line_info[
+                y + scroll_y
+            ]
+        except IndexError:
+            line_info = None
+        if line_info is None:
+            return super().render_line(y)
+        line_index, _ = line_info
+        long_line_index = self.get_long_line_index(row=line_index)
+        if long_line_index is not None:
+            return self.render_long_line(
+                line_index=line_index, long_line_index=long_line_index
+            )
+        if self.find_pattern is None:
+            return super().render_line(y)
+
+        find_highlights = self.get_find_highlights(line_index=line_index)
+        if not find_highlights:
+            return super().render_line(y)
+
+        line_highlights = self._highlights.get(line_index)
+        self._highlights[line_index] = (
+            line_highlights or []
+        ) + find_highlights
+        try:
+            return super().render_line(y)
+        finally:
+            if line_highlights is None:
+                del self._highlights[line_index]
+            else:
+                self._highlights[line_index] = line_highlights
+
+    def render_long_line(
+        self, line_index: int, long_line_index: LongLineIndex
+    ) -> Strip:
+        """
+        `TextArea.render_line` for the chunks of a long line under the visible
+        columns, so the cost does not depend on the length of the line
+        """
+        theme = self._theme
+        if theme:
+            theme.apply_css(self)
+        line = long_line_index.line
+        scroll_x, _ = self.scroll_offset
+        gutter_width = self.gutter_width
+        text_width = max(self.size.width - gutter_width, 0)
+        start_column, end_column, start_cell = long_line_index.get_window(
+            start_cell=scroll_x, end_cell=scroll_x + text_width
+        )
+        # Spaces before the chunks keep their tabs on the tab stops of the
+        # whole line
+        padding = start_cell % self.indent_width
+        text = Text(' ' * padding + line[start_column:end_column], end='')
+        if end_column == len(line):
+            # Space at the end for the cursor
+            text.set_length(len(text) + 1)
+
+        def stylize(style: Optional[Style], start: int, end: int) -> None:
+            start, end = max(start, start_column), min(end, end_column + 1)
+            if style and start < end:
+                text.stylize(
+                    style,
+                    start - start_column + padding,
+                    end - start_column + padding,
+                )
+
+        selection = self.selection
+        start, end = selection
+        cursor_row, cursor_column = end
+        (top_row, top_column), (bottom_row, bottom_column) = sorted(selection)
+        cursor_line_style = theme.cursor_line_style if theme else None
+        if cursor_line_style and cursor_row == line_index:
+            text.stylize(cursor_line_style)
+        if theme and start != end and top_row <= line_index <= bottom_row:
+            stylize(
+                style=theme.selection_style,
+                start=top_column if top_row == line_index else 0,
+                end=bottom_column if bottom_row == line_index else len(line),
+            )
+
+        if theme:
+            line_highlights = long_line_index.get_highlights(
+                highlights=self._highlights.get(line_index, ()),
+                start_column=start_column,
+                end_column=end_column,
+            )
+            if self.find_pattern is not None:
+                line_highlights += self.get_find_columns(
+                    line_index=line_index,
+                    start_column=start_column,
+                    end_column=end_column,
+                )
+            get_highlight_from_theme = theme.syntax_styles.get
+            for (
+                highlight_start,
+                highlight_end,
+                highlight_name,
+            ) in line_highlights:
+                stylize(
+                    style=get_highlight_from_theme(highlight_name),
+                    start=highlight_start,
+                    end=highlight_end,
+                )
+
+        matching_bracket = self._matching_bracket_location
+        draw_matched_brackets = (
+            self.match_cursor_bracket
+            and matching_bracket is not None
+            and start == end
+        )
+        bracket_matching_style = (
+            theme.bracket_matching_style if theme else None
+        )
+        if cursor_row == line_index:
+            if draw_matched_brackets:
+                stylize(
+                    style=bracket_matching_style,
+                    start=cursor_column,
+                    end=cursor_column + 1,
+                )
+            draw_cursor = (
+                self.has_focus
+                and not self.cursor_blink
+                or (self.cursor_blink and self._cursor_visible)
+            )
+            if draw_cursor and theme:
+                stylize(
+                    style=theme.cursor_style,
+                    start=cursor_column,
+                    end=cursor_column + 1,
+                )
+        if draw_matched_brackets:
+            bracket_row, bracket_column = matching_bracket
+            if bracket_row == line_index:
+                stylize(
+                    style=bracket_matching_style,
+                    start=bracket_column,
+                    end=bracket_column + 1,
+                )
+
+        if self.show_line_numbers:
+            if cursor_row == line_index:
+                gutter_style = theme.cursor_line_gutter_style
+            else:
+                gutter_style = theme.gutter_style
+            gutter = Text(
+                f'{line_index + 1:>{gutter_width - 2}}  ',
+                style=gutter_style or '',
+                end='',
+            )
+        else:
+            gutter = Text('', end='')
+
+        text.expand_tabs(self.indent_width)
+        console = self.app.console
+        gutter_strip = Strip(console.render(gutter), cell_length=gutter_width)
+        text_strip = Strip(
+            console.render(
+                text, console.options.update_width(max(text.cell_len, 1))
+            )
+        )
+        crop_start = scroll_x - start_cell + padding
+        text_strip = text_strip.crop(crop_start, crop_start + text_width)
+        if cursor_row == line_index:
+            line_style = cursor_line_style
+        else:
+            line_style = theme.base_style if theme else None
+        text_strip = text_strip.extend_cell_length(text_width, line_style)
+        strip = Strip.join([gutter_strip, text_strip]).simplify()
+        return strip.apply_style(
+            theme.base_style
+            if theme and theme.base_style is not None
+            else self.rich_style
+        )
+
+    def _recompute_cursor_offset(self) -> None:
+        row, column = self.cursor_location
+        long_line_index = self.get_long_line_index(row=row)
+        if long_line_index is None:
+            super()._recompute_cursor_offset()
+            return
+        self._cursor_offset = Offset(
+            long_line_index.column_to_cell(column), row
+        )
+
+    def record_cursor_width(self) -> None:
+        row, column = self.cursor_location
+        long_line_index = self.get_long_line_index(row=row)
+        if long_line_index is None:
+            super().record_cursor_width()
+            return
+        self.navigator.last_x_offset = long_line_index.column_to_cell(column)
+
+    def get_column_width(self, row: int, column: int) -> int:
+        long_line_index = self.get_long_line_index(row=row)
+        if long_line_index is None:
+            return super().get_column_width(row, column)
+        return long_line_index.column_to_cell(column)
+
+    def cell_width_to_column_index(
+        self, cell_width: int, row_index: int
+    ) -> int:
+        long_line_index = self.get_long_line_index(row=row_index)
+        if long_line_index is None:
+            return super().cell_width_to_column_index(cell_width, row_index)
+        return long_line_index.cell_to_column(cell_width)
+
+    def find_matching_bracket(
+        self, bracket: str, search_from: Location
+    ) -> Optional[Location]:
+        row, column = search_from
+        long_line_index = self.get_long_line_index(row=row)
+        if long_line_index is None:
+            return super().find_matching_bracket(bracket, search_from)
+        bracket_column = long_line_index.find_matching_bracket(
+            column=column, max_distance=LONG_LINE_BRACKET_SEARCH_SIZE
+        )
+        return None if bracket_column is None else (row, bracket_column)
+
+    # The bracket matching of other lines also stops after
+    # `LONG_LINE_BRACKET_SEARCH_SIZE` characters, instead of walking the whole
+    # document when the cursor is on the first or last bracket of a big file
+    def _yield_character_locations(
+        self, start: Location
+    ) -> Iterable[tuple[str, Location]]:
+        return islice(
+            super()._yield_character_locations(start),
+            LONG_LINE_BRACKET_SEARCH_SIZE,
+        )
+
+    def _yield_character_locations_reverse(
+        self, start: Location
+    ) -> Iterable[tuple[str, Location]]:
+        return islice(
+            super()._yield_character_locations_reverse(start),
+            LONG_LINE_BRACKET_SEARCH_SIZE,
+        )
+
+    def get_long_line_location(self, rows: int) -> Optional[Location]:
+        """
+        The location `rows` above or below the cursor at the same cell, None
+        if neither line is long so the navigator handles it
+        """
+        row, column = self.cursor_location
+        if not self.long_line_mode or self.soft_wrap:
+            return None
+        target_row = min(max(row + rows, 0), self.document.line_count - 1)
+        if (
+            self.get_long_line_index(row=row) is None
+            and self.get_long_line_index(row=target_row) is None
+        ):
+            return None
+        if row + rows < 0:
+            return 0, 0
+        if row + rows >= self.document.line_count:
+            return target_row, len(self.document[target_row])
+        cell = max(
+            self.get_column_width(row=row, column=column),
+            self.navigator.last_x_offset,
+        )
+        return target_row, self.cell_width_to_column_index(cell, target_row)
+
+    def get_cursor_up_location(self) -> Location:
+        return (
+            self.get_long_line_location(rows=-1)
+            or super().get_cursor_up_location()
+        )
+
+    def get_cursor_down_location(self) -> Location:
+        return (
+            self.get_long_line_location(rows=1)
+            or super().get_cursor_down_location()
+        )
+
+    def action_cursor_page_up(self) -> None:
+        height = self.content_size.height
+        target = self.get_long_line_location(rows=-height)
+        if target is None:
+            super().action_cursor_page_up()
+            return
+        self.scroll_relative(y=-height, animate=False)
+        self.move_cursor(target)
+
+    def action_cursor_page_down(self) -> None:
+        height = self.content_size.height
+        target = self.get_long_line_location(rows=height)
+        if target is None:
+            super().action_cursor_page_down()
+            return
+        self.scroll_relative(y=height, animate=False)
+        self.move_cursor(target)
+
+    def edit(self, edit: Edit) -> EditResult:
+        old_syntax_tree = getattr(self.document, '_syntax_tree', None)
+        is_symbol_index_current = self.is_symbol_index_current
+        old_line_count = self.document.line_count
+        edit_result = super().edit(edit)
+        self.content_version += 1
+        if self.document.line_count != old_line_count:
+            self.long_line_indexes.clear()
+        self.detect_long_lines(
+            lines=self.document.lines[
+                edit.top[0] : edit_result.end_location[0] + 1
+            ]
+        )
+        if is_symbol_index_current and old_syntax_tree is not None:
+            # The old tree was edited in place before the new one was parsed
+            # from it, which is what `changed_ranges` needs
+            syntax_tree = self.document._syntax_tree
+            self.symbol_index.update(
+                root_node=syntax_tree.root_node,
+                lines=self.document.lines,
+                start_row=edit.top[0],
+                old_end_row=edit.bottom[0],
+                new_end_row=edit_result.end_location[0],
+                changed_ranges=old_syntax_tree.changed_ranges(syntax_tree),
+                version=self.content_version,
+            )
+        self.update_history_status()
+        if self.split_peer is not None:
+            self.split_peer.follow_edit(
+                top=edit.top,
+                old_bottom=edit.bottom,
+                new_bottom=edit_result.end_location,
+                old_line_count=old_line_count,
+            )
+        return edit_result
+
+    def _undo_batch(self, edits: Sequence[Edit]) -> None:
+        old_line_count = self.document.line_count
+        super()._undo_batch(edits)
+        self.content_version += 1
+        if self.split_peer is not None and edits:
+            self.split_peer.follow_edit(
+                top=min(edit.top for edit in edits),
+                old_bottom=max(
+                    edit._edit_result.end_location for edit in edits
+                ),
+                new_bottom=max(edit.bottom for edit in edits),
+                old_line_count=old_line_count,
+            )
+
+    def _redo_batch(self, edits: Sequence[Edit]) -> None:
+        old_line_count = self.document.line_count
+        super()._redo_batch(edits)
+        self.content_version += 1
+        if self.split_peer is not None and edits:
+            self.split_peer.follow_edit(
+                top=min(edit.top for edit in edits),
+                old_bottom=max(edit.bottom for edit in edits),
+                new_bottom=max(
+                    edit._edit_result.end_location for edit in edits
+                ),
+                old_line_count=old_line_count,
+            )
+
+    def follow_edit(
+        self,
+        top: Location,
+        old_bottom: Location,
+        new_bottom: Location,
+        old_line_count: int,
+    ) -> None:
+        """
+        Updates this view after the other view of its document replaced the
+        text between `top` and `old_bottom`. The document was parsed and
+        highlighted by that view, so only the wrapping, the cursor and the
+        scroll of this one follow the edit
+        """
+        # The gutter is as wide as the number of the last line
+        if len(str(old_line_count)) != len(str(self.document.line_count)):
+            self._rewrap_and_refresh_virtual_size()
+        else:
+            self.wrapped_document.wrap_range(top, old_bottom, new_bottom)
+            self.grow_virtual_size(start_row=top[0], end_row=new_bottom[0])
+        self.content_version += 1
+        self.detect_long_lines(
+            lines=self.document.lines[top[0] : new_bottom[0] + 1]
+        )
+        self.update_history_status()
+
+        def follow_location(location: Location) -> Location:
+            if location <= top:
+                return location
+            if location < old_bottom:
+                return top
+            row, column = location
+            if row == old_bottom[0]:
+                column += new_bottom[1] - old_bottom[1]
+            return (row + new_bottom[0] - old_bottom[0], column)
+
+        start, end = self.selection
+        # Set without the watcher, which would scroll to the cursor
+        self.set_reactive(
+            TextArea.selection,
+            Selection(start=follow_location(start), end=follow_location(end)),
+        )
+        # Lines added or removed above the view keep the visible lines in
+        # place
+        if not self.soft_wrap and old_bottom[0] < self.scroll_offset.y:
+            self.scroll_relative(
+                y=new_bottom[0] - old_bottom[0], animate=False
+            )
+        self.refresh()
+
+    def load_text(self, text: str) -> None:
+        super().load_text(text)
+        self.content_version += 1
+        self.symbol_index = None
+        self.long_line_mode = False
+        self.long_line_indexes.clear()
+        self.set_status(key='long-lines', value=None)
+        self.detect_long_lines(lines=self.document.lines)
+        self.update_history_status()
+
+    def _set_document(self, text: str, language: Optional[str]) -> None:
+        super()._set_document(text, language)
+        if isinstance(self.split_peer, SplitTextArea):
+            self.split_peer.share_document(source=self)
+
+    def load_document(self, text: str, language: Optional[str]) -> None:
+        # Setting `language` after `load_text` would parse the text twice
+        self.set_reactive(TextArea.language, language)
+        self.load_text(text)
+
+    @property
+    def document_end(self) -> tuple[int, int]:
+        last_line_index = self.document.line_count - 1
+        return (last_line_index, len(self.document[last_line_index]))
+
+    def append_text(self, text: str) -> None:
+        """
+        Appends text at the end of the document re-wrapping and measuring
+        only the appended lines. The document is not re-highlighted, so
+        `finish_appending` must be called after the last append
+        """
+        old_gutter_width = self.gutter_width
+        old_line_count = self.document.line_count
+        start = self.document_end
+        edit_result = self.document.replace_range(start, start, text)
+        self.content_version += 1
+        if self.split_peer is not None:
+            self.split_peer.follow_edit(
+                top=start,
+                old_bottom=start,
+                new_bottom=edit_result.end_location,
+                old_line_count=old_line_count,
+            )
+        start_row, _ = start
+        self.detect_long_lines(lines=self.document.lines[start_row:])
+        if self.soft_wrap or old_gutter_width != self.gutter_width:
+            self._rewrap_and_refresh_virtual_size()
+        else:
+            self.wrapped_document.wrap_range(
+                start, start, edit_result.end_location
+            )
+            self.grow_virtual_size(
+                start_row=start_row, end_row=self.document.line_count - 1
+            )
+        self.refresh()
+
+    def grow_virtual_size(self, start_row: int, end_row: int) -> None:
+        """
+        Updates the virtual size measuring only the lines between `start_row`
+        and `end_row` instead of the whole document, so it does not shrink
+        when the widest line gets shorter
+        """
+        if self.soft_wrap:
+            self.virtual_size = Size(0, self.wrapped_document.height)
+            return
+        edited_width = max(
+            cell_len(line.expandtabs(self.indent_width))
+            for line in self.document.lines[start_row : end_row + 1]
+        )
+        virtual_width, _ = self.virtual_size
+        self.virtual_size = Size(
+            max(virtual_width, edited_width + self.gutter_width + 1),
+            self.document.line_count,
+        )
+
+    def get_highlights(self) -> dict[int, list[Highlight]]:
+        return dict(self._highlights)
+
+    def finish_appending(
+        self, highlights: Optional[dict[int, list[Highlight]]] = None
+    ) -> None:
+        """
+        `highlights` are the highlights of the whole document when they are
+        known, so they are not built again
+        """
+        if highlights is None:
+            self._build_highlight_map()
+        else:
+            self._highlights.clear()
+            self._highlights.update(highlights)
+        self.refresh()
+        if self.split_peer is not None:
+            self.split_peer.refresh()
+        self.post_message(self.Changed(self))
 
     async def _on_key(self, event: Key) -> None:
-        if event.character in ['(', '[', '{', "'", '"']:
+        if self.read_only:
+            self.handle_read_only_bindings(event=event)
+        elif event.character in ['(', '[', '{', "'", '"']:
             self.handle_bracket_insertion(event=event)
         elif event.key == 'ctrl+c':
             self.handle_copy(event=event)
@@ -51,6 +740,16 @@ class CustomTextArea(TextArea):
         else:
             self.handle_default_bindings(event=event)
 
+    def handle_read_only_bindings(self, event: Key) -> None:
+        if event.key == 'ctrl+c':
+            self.handle_copy(event=event)
+        elif event.key == 'ctrl+a':
+            self.handle_select_all(event=event)
+        elif event.key in ['ctrl+s', 'ctrl+v', 'tab', 'shift+tab']:
+            event.prevent_default()
+        else:
+            self.handle_default_bindings(event=event)
+
     def handle_bracket_insertion(self, event: Key) -> None:
         BRACKETS_MAP = {
             '(': '()',
@@ -70,14 +769,14 @@ class CustomTextArea(TextArea):
             pyperclip.copy(text=line_content_original)
             event.prevent_default()
 
-        def copy_lines() -> None:
-            pyperclip.copy(text=self.selected_text)
-            event.prevent_default()
-
-        if self.selected_text.strip() == '':
+        # The selection is sliced once, its cost does not depend on the
+        # length of the lines
+        selected_text = self.selected_text
+        if selected_text.strip() == '':
             copy_line()
         else:
-            copy_lines()
+            pyperclip.copy(text=selected_text)
+            event.prevent_default()
 
     def handle_save(self, event: Key) -> None:
         self.post_message(
@@ -250,6 +949,312 @@ class CustomTextArea(TextArea):
             super()._on_key(event=event)
 
 
+class SplitTextArea(CustomTextArea):
+    """
+    Second view of the document of a `CustomTextArea`, with its own cursor,
+    scroll and wrapping. The document, undo history and highlights are
+    shared, so an edit is parsed and highlighted once whichever view makes
+    it
+    """
+
+    BORDER_TITLE = 'Split view'
+
+    def copy_settings(self, source: CustomTextArea) -> None:
+        self.theme = source.theme
+        self.tab_size = source.tab_size
+        self.long_line_threshold = source.long_line_threshold
+        self.show_line_numbers = source.show_line_numbers
+        self.soft_wrap = source.soft_wrap
+        self.read_only = source.read_only
+
+    def share_document(self, source: CustomTextArea) -> None:
+        self.split_peer = source
+        source.split_peer = self
+        self.copy_settings(source=source)
+        self.border_title = source.border_title
+        # Set without the watcher, which would parse the document again
+        self.set_reactive(TextArea.language, source.language)
+        self.document = source.document
+        self.history = source.history
+        self._highlight_query = source._highlight_query
+        self._highlights = source._highlights
+        # Indexes are checked against the line they were built from
+        self.long_line_indexes = source.long_line_indexes
+        self.long_line_mode = False
+        self.set_status(key='long-lines', value=None)
+        self.detect_long_lines(lines=self.document.lines)
+        self.wrapped_document = WrappedDocument(
+            self.document, tab_width=self.indent_width
+        )
+        self.navigator = DocumentNavigator(self.wrapped_document)
+        self._rewrap_and_refresh_virtual_size()
+        self.selection = source.selection
+        self.update_history_status()
+        self.refresh()
+
+    def detach_document(self) -> None:
+        """
+        Releases the shared document, its history and highlights stay with
+        the other view
+        """
+        if self.split_peer is not None:
+            self.split_peer.split_peer = None
+            self.split_peer = None
+        self.history = CompactEditHistory(
+            max_checkpoints=self.history.max_checkpoints,
+            checkpoint_timer=self.history.checkpoint_timer,
+            checkpoint_max_characters=self.history.checkpoint_max_characters,
+        )
+        self._highlights = defaultdict(list)
+        self.long_line_indexes = {}
+        self.load_document(text='', language=None)
+
+    async def _on_key(self, event: Key) -> None:
+        # Textual calls the handlers of the base classes next, which check
+        # `read_only`
+        if self.split_peer is not None:
+            self.read_only = self.split_peer.read_only
+
+
+class FindBar(Horizontal):
+    class Changed(Message):
+        pass
+
+    class Submitted(Message):
+        pass
+
+    def compose(self) -> ComposeResult:
+        yield Input(placeholder='Find', id='input-find-bar', classes='col-6')
+        yield Label('Regex?', classes='mt-1 ms-1')
+        yield Switch(False, id='find-bar-regex')
+        yield Label('Match case?', classes='mt-1 ms-1')
+        yield Switch(False, id='find-bar-match-case')
+        yield Label('', id='find-bar-status', classes='mt-1 ms-1')
+
+    def on_mount(self) -> None:
+        self.input_find = self.query_one(selector='#input-find-bar')
+        self.input_regex = self.query_one(selector='#find-bar-regex')
+        self.input_match_case = self.query_one(selector='#find-bar-match-case')
+        self.find_status = self.query_one(selector='#find-bar-status')
+
+    def get_pattern(self) -> Optional[re.Pattern]:
+        """
+        Raises `re.error` if the query is not a valid regex
+        """
+        if not self.input_find.value:
+            return None
+        return compile_pattern(
+            query=self.input_find.value,
+            is_regex=self.input_regex.value,
+            case_sensitive=self.input_match_case.value,
+        )
+
+    def set_status(self, status: str) -> None:
+        self.find_status.update(status)
+
+    @on(Input.Changed, '#input-find-bar')
+    @on(Switch.Changed)
+    def on_query_changed(self, event: Message) -> None:
+        event.stop()
+        self.post_message(self.Changed())
+
+    @on(Input.Submitted, '#input-find-bar')
+    def on_query_submitted(self, event: Input.Submitted) -> None:
+        event.stop()
+        self.post_message(self.Submitted())
+
+
+class SymbolOutline(OptionList):
+    BORDER_TITLE = 'Outline'
+
+    class SymbolSelected(Message):
+        def __init__(self, symbol: Symbol) -> None:
+            super().__init__()
+            self.symbol = symbol
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.symbols: list[Symbol] = []
+
+    def set_symbols(self, symbols: list[Symbol]) -> None:
+        if symbols == self.symbols:
+            return
+        self.symbols = list(symbols)
+        highlighted = self.highlighted
+        self.clear_options()
+        self.add_options(format_symbol(symbol) for symbol in self.symbols)
+        if highlighted is not None and self.symbols:
+            self.highlighted = min(highlighted, len(self.symbols) - 1)
+
+    def on_option_list_option_selected(
+        self, event: OptionList.OptionSelected
+    ) -> None:
+        event.stop()
+        self.post_message(
+            self.SymbolSelected(self.symbols[event.option_index])
+        )
+
+
+class CsvTable(ScrollView, can_focus=True):
+    """
+    Table of a `CsvFile` with its first row as a sticky header, rows are only
+    parsed when they are drawn
+    """
+
+    BORDER_TITLE = 'Table'
+    BINDINGS = [
+        Binding('up', 'move_cursor(-1)', show=False),
+        Binding('down', 'move_cursor(1)', show=False),
+        Binding('pageup', 'move_cursor_page(-1)', show=False),
+        Binding('pagedown', 'move_cursor_page(1)', show=False),
+        Binding('ctrl+home,home', 'go_to_row(0)', show=False),
+        Binding('ctrl+end,end', 'go_to_row(-1)', show=False),
+        Binding('left', 'scroll_left', show=False),
+        Binding('right', 'scroll_right', show=False),
+    ]
+
+    cursor_row: reactive[int] = reactive(0)
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.csv_file: Optional[CsvFile] = None
+        self.column_widths: list[int] = []
+        self.sampled_row_count: int = 0
+        self.row_cache: dict[int, list[str]] = {}
+
+    @property
+    def data_row_count(self) -> int:
+        if self.csv_file is None:
+            return 0
+        return max(self.csv_file.row_count - 1, 0)
+
+    @property
+    def gutter_width(self) -> int:
+        return len(str(self.data_row_count)) + 1
+
+    def set_csv_file(self, csv_file: Optional[CsvFile]) -> None:
+        self.csv_file = csv_file
+        self.column_widths = []
+        self.sampled_row_count = 0
+        self.row_cache.clear()
+        self.cursor_row = 0
+        self.scroll_to(0, 0, animate=False)
+        self.update_rows()
+
+    def update_rows(self) -> None:
+        """
+        Called when more rows are indexed, the column widths come from the
+        first `CSV_SAMPLE_ROWS` rows and grow when wider rows are drawn
+        """
+        sample_row_count = (
+            0
+            if self.csv_file is None
+            else min(self.csv_file.row_count, CSV_SAMPLE_ROWS)
+        )
+        # The last row may be cut until the next rows are indexed
+        self.row_cache.clear()
+        if sample_row_count != self.sampled_row_count:
+            self.column_widths = infer_column_widths(
+                rows=[self.get_row(row=row) for row in range(sample_row_count)]
+            )
+            self.sampled_row_count = sample_row_count
+        self.update_virtual_size()
+
+    def update_virtual_size(self) -> None:
+        self.virtual_size = Size(
+            self.gutter_width
+            + sum(self.column_widths)
+            + 3 * max(len(self.column_widths) - 1, 0),
+            self.data_row_count + 1,
+        )
+        self.refresh()
+
+    def get_row(self, row: int) -> list[str]:
+        if row not in self.row_cache:
+            if len(self.row_cache) >= CSV_ROW_CACHE_SIZE:
+                self.row_cache.clear()
+            self.row_cache[row] = self.csv_file.get_row(row=row)
+        return self.row_cache[row]
+
+    def render_cells(self, cells: list[str], style: Style) -> Text:
+        text = Text(style=style, end='')
+        for column, cell in enumerate(cells):
+            if column:
+                text.append(' │ ', style=Style(dim=True))
+            cell_text = Text(get_cell_text(cell), end='')
+            width = min(cell_text.cell_len, CSV_MAX_COLUMN_WIDTH)
+            if column == len(self.column_widths):
+                self.column_widths.append(0)
+            if width > self.column_widths[column]:
+                self.column_widths[column] = width
+                # The lines already drawn in this frame are drawn again
+                self.call_after_refresh(self.update_virtual_size)
+            width = self.column_widths[column]
+            cell_text.truncate(width, overflow='ellipsis', pad=True)
+            text.append_text(cell_text)
+        return text
+
+    def render_line(self, y: int) -> Strip:
+        width = self.scrollable_content_region.width
+        scroll_x, scroll_y = self.scroll_offset
+        row = 0 if y == 0 else scroll_y + y
+        if self.csv_file is None or row > self.data_row_count:
+            return Strip.blank(width, self.rich_style)
+
+        if row == 0:
+            gutter = Text(' ' * self.gutter_width, end='')
+            cells = self.render_cells(
+                cells=self.get_row(row=0), style=Style(bold=True)
+            )
+        else:
+            gutter = Text(
+                f'{row:>{self.gutter_width - 1}} ',
+                style=Style(dim=True),
+                end='',
+            )
+            cells = self.render_cells(
+                cells=self.get_row(row=row), style=Style()
+            )
+        console = self.app.console
+        gutter_strip = Strip(gutter.render(console))
+        cells_strip = Strip(cells.render(console)).crop(
+            scroll_x, scroll_x + width - self.gutter_width
+        )
+        strip = Strip.join([gutter_strip, cells_strip])
+        if row == self.cursor_row + 1:
+            strip = strip.apply_style(Style(reverse=True))
+        return strip.extend_cell_length(width).apply_style(self.rich_style)
+
+    def watch_cursor_row(self, cursor_row: int) -> None:
+        # The header takes the first line of the view
+        height = max(self.scrollable_content_region.height - 1, 1)
+        if cursor_row < self.scroll_offset.y:
+            self.scroll_to(y=cursor_row, animate=False)
+        elif cursor_row >= self.scroll_offset.y + height:
+            self.scroll_to(y=cursor_row - height + 1, animate=False)
+        self.refresh()
+
+    def action_move_cursor(self, rows: int) -> None:
+        self.go_to_row(row=self.cursor_row + rows)
+
+    def action_move_cursor_page(self, pages: int) -> None:
+        height = max(self.scrollable_content_region.height - 1, 1)
+        self.go_to_row(row=self.cursor_row + pages * height)
+
+    def action_go_to_row(self, row: int) -> None:
+        self.go_to_row(row=row if row >= 0 else self.data_row_count - 1)
+
+    def go_to_row(self, row: int, center: bool = False) -> None:
+        """
+        `row` counts the rows after the header from 0
+        """
+        row = min(max(row, 0), max(self.data_row_count - 1, 0))
+        if center:
+            height = max(self.scrollable_content_region.height - 1, 1)
+            self.scroll_to(y=max(row - height // 2, 0), animate=False)
+        self.cursor_row = row
+
+
 class CustomDirectoryTree(DirectoryTree):
     BORDER_TITLE = 'File manager'
 
@@ -289,19 +1294,207 @@ class CustomDirectoryTree(DirectoryTree):
             self.parent_path = parent_path
             self.path = path
 
-    def __init__(self, path: Union[Path, str]) -> None:
+    class FileOperationRequested(Message):
+        def __init__(
+            self,
+            node: TreeNode[DirEntry],
+            path: Path,
+            parent_path: Optional[Path],
+            operation: Literal['copy', 'move', 'rename'],
+        ) -> None:
+            super().__init__()
+            self.node = node
+            self.parent_path = parent_path
+            self.path = path
+            self.operation = operation
+
+    def __init__(
+        self, path: Union[Path, str], show_ignored_files: bool = False
+    ) -> None:
+        self.directory_listings: dict[Path, DirectoryListing] = {}
+        self.git_status: Optional[GitStatus] = None
+        self.disk_usage: Optional[dict[Path, int]] = None
+        self.ignore_matcher = IgnoreMatcher(root_path=Path(path))
+        self.show_ignored_files = show_ignored_files
         super().__init__(path)
         self.guide_depth = 2
 
-    def filter_paths(self, paths: Iterable[Path]) -> Iterable[Path]:
-        filtered_paths = [path for path in paths if path.name != '.git']
-        return filtered_paths
+    def filter_entries(
+        self, directory_path: Path, entries: Iterable[tuple[str, bool]]
+    ) -> Iterable[tuple[str, bool]]:
+        entries = (entry for entry in entries if entry[0] != '.git')
+        if self.show_ignored_files:
+            return entries
+        return self.ignore_matcher.filter_entries(
+            dir_path=directory_path, entries=entries
+        )
+
+    def get_ignore_key(self, directory_path: Path) -> str:
+        # The rules are also read when the ignored files are shown, so their
+        # style follows the changes of the ignore files
+        ignore_key = self.ignore_matcher.get_rules(dir_path=directory_path).key
+        if self.show_ignored_files:
+            return f'shown-{ignore_key}'
+        return ignore_key
+
+    @work(thread=True, exit_on_error=False)
+    def _load_directory(self, node: TreeNode[DirEntry]) -> DirectoryListing:
+        directory_path = node.data.path
+        try:
+            mtime_ns = directory_path.stat().st_mtime_ns
+        except OSError:
+            mtime_ns = None
+        ignore_key = self.get_ignore_key(directory_path=directory_path)
+
+        # Listings restored from a session are trusted while the directory
+        # mtime and its ignore rules are unchanged, so expanding them skips
+        # `scandir`.
+        directory_listing = self.directory_listings.get(directory_path)
+        if directory_listing is None or (
+            directory_listing.mtime_ns,
+            directory_listing.ignore_key,
+        ) != (mtime_ns, ignore_key):
+            worker = get_current_worker()
+
+            def scan_directory() -> Iterator[tuple[str, bool]]:
+                try:
+                    with os.scandir(directory_path) as dir_entries:
+                        for dir_entry in dir_entries:
+                            if worker.is_cancelled:
+                                return
+                            try:
+                                is_dir = dir_entry.is_dir()
+                            except OSError:
+                                is_dir = False
+                            yield dir_entry.name, is_dir
+                except OSError:
+                    return
+
+            entries = sorted(
+                self.filter_entries(
+                    directory_path=directory_path, entries=scan_directory()
+                ),
+                key=lambda entry: (not entry[1], entry[0].lower()),
+            )
+            directory_listing = DirectoryListing(
+                mtime_ns=mtime_ns, entries=entries, ignore_key=ignore_key
+            )
+            if not worker.is_cancelled:
+                self.directory_listings[directory_path] = directory_listing
+
+        return directory_listing
+
+    def _populate_node(
+        self, node: TreeNode[DirEntry], content: DirectoryListing
+    ) -> None:
+        node.remove_children()
+        self.add_page(node=node, directory_listing=content)
+        node.expand()
+        self.call_after_refresh(self.load_visible_pages)
+
+    def add_page(
+        self, node: TreeNode[DirEntry], directory_listing: DirectoryListing
+    ) -> None:
+        """
+        Adds the next page of children, followed by a placeholder node with no
+        data standing for the entries not created yet
+        """
+        offset = len(node.children)
+        page = directory_listing.entries[offset : offset + DIRECTORY_PAGE_SIZE]
+        for name, is_dir in page:
+            node.add(
+                name,
+                data=DirEntry(node.data.path.joinpath(name)),
+                allow_expand=is_dir,
+            )
+        remaining = len(directory_listing.entries) - offset - len(page)
+        if remaining > 0:
+            node.add_leaf(f'… {remaining} more', data=None)
+
+    def load_visible_pages(self) -> None:
+        """
+        Replaces placeholders within a screen of the viewport by their pages
+        """
+        while True:
+            start_line = round(self.scroll_offset.y)
+            end_line = start_line + 2 * max(self.size.height, 1)
+            for tree_line in self._tree_lines[start_line:end_line]:
+                placeholder = tree_line.node
+                if placeholder.data is None and placeholder.parent is not None:
+                    break
+            else:
+                return
+
+            node = placeholder.parent
+            directory_listing = self.directory_listings.get(node.data.path)
+            placeholder.remove()
+            if directory_listing is not None:
+                self.add_page(node=node, directory_listing=directory_listing)
+
+    def watch_scroll_y(self, old_value: float, new_value: float) -> None:
+        super().watch_scroll_y(old_value, new_value)
+        self.load_visible_pages()
+
+    def watch_cursor_line(self, previous_line: int, line: int) -> None:
+        super().watch_cursor_line(previous_line, line)
+        self.load_visible_pages()
+
+    def set_git_status(self, git_status: GitStatus) -> None:
+        self.git_status = git_status
+        self._invalidate()
+
+    def set_disk_usage(self, disk_usage: Optional[dict[Path, int]]) -> None:
+        """
+        Shows the size of the directories, or hides it with None
+        """
+        self.disk_usage = disk_usage
+        self._invalidate()
+
+    def update_disk_usage(self, sizes: dict[Path, int]) -> None:
+        if self.disk_usage is None:
+            return
+        self.disk_usage.update(sizes)
+        self._invalidate()
+
+    def get_expanded_paths(self) -> list[Path]:
+        expanded_paths = []
+        to_check = [self.root]
+        while to_check:
+            node = to_check.pop()
+            if node.allow_expand and node.is_expanded and node.data:
+                expanded_paths.append(node.data.path)
+                to_check.extend(node.children)
+        return expanded_paths
+
+    async def restore_expanded_paths(
+        self, expanded_paths: Iterable[Path]
+    ) -> None:
+        expanded_paths = set(expanded_paths)
+        async with self.lock:
+            to_reopen = [self.root]
+            while to_reopen:
+                node = to_reopen.pop()
+                if not node.data or not node.allow_expand:
+                    continue
+                if node != self.root and node.data.path not in expanded_paths:
+                    continue
+                try:
+                    content = await self._load_directory(node).wait()
+                except (WorkerCancelled, WorkerFailed):
+                    continue
+                node.data.loaded = True
+                self._populate_node(node, content)
+                to_reopen.extend(node.children)
 
     async def _on_key(self, event: Key) -> None:
-        if event.key == 'delete':
+        if self.cursor_node is None or self.cursor_node.data is None:
+            self.handle_default_bindings(event=event)
+        elif event.key == 'delete':
             self.handle_delete(event=event)
         elif event.key == 'insert':
             self.handle_create(event=event)
+        elif event.key in ['f2', 'f5', 'f6']:
+            self.handle_file_operation(event=event)
         else:
             self.handle_default_bindings(event=event)
 
@@ -355,6 +1548,41 @@ class CustomDirectoryTree(DirectoryTree):
             )
         event.prevent_default()
 
+    def handle_file_operation(self, event: Key) -> None:
+        FILE_OPERATIONS_MAP = {'f2': 'rename', 'f5': 'copy', 'f6': 'move'}
+        current_node = self.cursor_node
+        if self.cursor_node.parent and self.cursor_node.parent.data:
+            current_selected_parent_path = self.cursor_node.parent.data.path
+        else:
+            current_selected_parent_path = None
+        if current_selected_parent_path is not None:
+            self.post_message(
+                self.FileOperationRequested(
+                    node=current_node,
+                    parent_path=current_selected_parent_path,
+                    path=self.cursor_node.data.path,
+                    operation=FILE_OPERATIONS_MAP[event.key],
+                )
+            )
+        event.prevent_default()
+
+    def reload_directories(self, paths: Iterable[Path]) -> None:
+        """
+        Reloads the nodes of these directories if they are loaded, the other
+        nodes are left untouched
+        """
+        paths = set(paths)
+        to_check = [self.root]
+        while to_check:
+            node = to_check.pop()
+            if node.data is None or not node.allow_expand:
+                continue
+            if node.data.path in paths:
+                if node.data.loaded:
+                    self.reload_node(node)
+                continue
+            to_check.extend(node.children)
+
     def handle_default_bindings(self, event: Key) -> None:
         IGNORE_DEFAULT_BINDINGS = []
         if event.key in IGNORE_DEFAULT_BINDINGS:
@@ -370,6 +1598,12 @@ class CustomDirectoryTree(DirectoryTree):
         if not self.is_mounted:
             return node_label
 
+        if node.data is None:
+            node_label.stylize_before(
+                self.get_component_rich_style('directory-tree--hidden')
+            )
+            return node_label
+
         if node._allow_expand:
             prefix = (
                 '📂 ' if node.is_expanded else '📁 ',
@@ -431,5 +1665,43 @@ class CustomDirectoryTree(DirectoryTree):
                 self.get_component_rich_style('directory-tree--hidden')
             )
 
+        is_ignored = (
+            self.show_ignored_files
+            and self.ignore_matcher.is_ignored(
+                path=node.data.path, is_dir=node._allow_expand
+            )
+        )
+        if is_ignored:
+            node_label.stylize_before(
+                self.get_component_rich_style('directory-tree--hidden')
+            )
+        elif self.git_status is not None:
+            GIT_STATUS_COLORS_MAP = {
+                'M': 'yellow',
+                'A': 'green',
+                'D': 'red',
+                'U': 'red',
+                '?': 'green',
+                '●': 'yellow',
+            }
+            git_status_code = get_path_status(
+                git_status=self.git_status,
+                path=node.data.path,
+                is_dir=node._allow_expand,
+            )
+            if git_status_code is not None:
+                git_status_style = Style(
+                    color=GIT_STATUS_COLORS_MAP[git_status_code]
+                )
+                node_label.stylize(git_status_style)
+                node_label.append(f' {git_status_code}', git_status_style)
+
+        if self.disk_usage is not None and node._allow_expand:
+            size = self.disk_usage.get(node.data.path)
+            node_label.append(
+                f' {"…" if size is None else format_size(size)}',
+                Style(dim=True),
+            )
+
         text = Text.assemble(prefix, node_label)
         return text
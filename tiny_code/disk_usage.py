@@ -0,0 +1,195 @@
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    Future,
+    ThreadPoolExecutor,
+    wait,
+)
+from pathlib import Path
+from typing import Callable, Optional
+import os
+import stat
+import time
+
+from tiny_code.consts import DISK_USAGE_REFRESH_INTERVAL, DISK_USAGE_THREADS
+from tiny_code.entities import DirectoryUsage
+
+
+def get_disk_size(stat_result: os.stat_result) -> int:
+    """
+    Allocated size like `du`, so sparse files count only their blocks
+    """
+    blocks = getattr(stat_result, 'st_blocks', None)
+    if blocks is None:
+        return stat_result.st_size
+    return blocks * 512
+
+
+def scan_directory(
+    dir_path: str, device: int, cached_usage: Optional[DirectoryUsage]
+) -> Optional[DirectoryUsage]:
+    """
+    Usage of the entries right inside `dir_path`, the cached usage is reused
+    while the mtime of the directory is unchanged. Filesystems mounted inside
+    are skipped, like `du -x`
+    """
+    try:
+        dir_stat = os.lstat(dir_path)
+    except OSError:
+        return None
+    if (
+        cached_usage is not None
+        and cached_usage.mtime_ns == dir_stat.st_mtime_ns
+    ):
+        return cached_usage
+
+    size = get_disk_size(dir_stat)
+    linked_files = []
+    subdirectories = []
+    try:
+        with os.scandir(dir_path) as dir_entries:
+            for dir_entry in dir_entries:
+                try:
+                    entry_stat = dir_entry.stat(follow_symlinks=False)
+                except OSError:
+                    continue
+                if stat.S_ISDIR(entry_stat.st_mode):
+                    if entry_stat.st_dev == device:
+                        subdirectories.append(dir_entry.name)
+                elif entry_stat.st_nlink > 1:
+                    linked_files.append(
+                        (
+                            entry_stat.st_dev,
+                            entry_stat.st_ino,
+                            get_disk_size(entry_stat),
+                        )
+                    )
+                else:
+                    size += get_disk_size(entry_stat)
+    except OSError:
+        pass
+    return DirectoryUsage(
+        mtime_ns=dir_stat.st_mtime_ns,
+        size=size,
+        linked_files=linked_files,
+        subdirectories=subdirectories,
+    )
+
+
+class DiskUsageScanner:
+    """
+    Recursive sizes of the directories of a tree, each directory is scanned
+    by a pool of threads since `scandir` and `stat` release the GIL. A repeat
+    scan only stats the directories whose mtime is unchanged, so files
+    growing in place are seen once their directory changes. Hard links are
+    counted once
+    """
+
+    def __init__(self) -> None:
+        self.directory_usages: dict[str, DirectoryUsage] = {}
+        self.sizes: dict[Path, int] = {}
+
+    def scan(
+        self,
+        root_path: Path,
+        on_sizes: Callable[[dict[Path, int]], None],
+        is_cancelled: Callable[[], bool],
+    ) -> bool:
+        """
+        Calls `on_sizes` with the directories measured since the last call
+        every `DISK_USAGE_REFRESH_INTERVAL`, a directory is measured once all
+        its subdirectories are. Returns False if the scan was cancelled
+        """
+        try:
+            device = os.stat(root_path).st_dev
+        except OSError:
+            return False
+
+        directory_usages: dict[str, DirectoryUsage] = {}
+        sizes: dict[Path, int] = {}
+        measured_sizes: dict[Path, int] = {}
+        seen_inodes: set[tuple[int, int]] = set()
+        # Directory waiting for its subdirectories:
+        # [parent path or None, subdirectories left, size so far]
+        pending: dict[str, list] = {}
+        # Future of a directory scan: (path, parent path or None)
+        futures: dict[Future, tuple[str, Optional[str]]] = {}
+
+        def finish_directory(dir_path: str) -> None:
+            while True:
+                parent_path, _, size = pending.pop(dir_path)
+                sizes[Path(dir_path)] = measured_sizes[Path(dir_path)] = size
+                if parent_path is None:
+                    return
+                parent = pending[parent_path]
+                parent[1] -= 1
+                parent[2] += size
+                if parent[1]:
+                    return
+                dir_path = parent_path
+
+        executor = ThreadPoolExecutor(max_workers=DISK_USAGE_THREADS)
+
+        def submit(dir_path: str, parent_path: Optional[str]) -> None:
+            future = executor.submit(
+                scan_directory,
+                dir_path,
+                device,
+                self.directory_usages.get(dir_path),
+            )
+            futures[future] = (dir_path, parent_path)
+
+        try:
+            submit(dir_path=str(root_path), parent_path=None)
+            last_refresh = time.monotonic()
+            while futures:
+                done, _ = wait(
+                    futures,
+                    timeout=DISK_USAGE_REFRESH_INTERVAL,
+                    return_when=FIRST_COMPLETED,
+                )
+                if is_cancelled():
+                    self.directory_usages.update(directory_usages)
+                    self.sizes.update(sizes)
+                    return False
+                for future in done:
+                    dir_path, parent_path = futures.pop(future)
+                    usage = future.result()
+                    size = 0
+                    subdirectories = []
+                    if usage is not None:
+                        directory_usages[dir_path] = usage
+                        size = usage.size
+                        for device_id, inode, file_size in usage.linked_files:
+                            if (device_id, inode) not in seen_inodes:
+                                seen_inodes.add((device_id, inode))
+                                size += file_size
+                        subdirectories = usage.subdirectories
+                    pending[dir_path] = [
+                        parent_path,
+                        len(subdirectories),
+                        size,
+                    ]
+                    for name in subdirectories:
+                        submit(
+                            dir_path=os.path.join(dir_path, name),
+                            parent_path=dir_path,
+                        )
+                    if not subdirectories:
+                        finish_directory(dir_path=dir_path)
+                if (
+                    measured_sizes
+                    and time.monotonic() - last_refresh
+                    >= DISK_USAGE_REFRESH_INTERVAL
+                ):
+                    on_sizes(measured_sizes)
+                    measured_sizes = {}
+                    last_refresh = time.monotonic()
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+        if measured_sizes:
+            on_sizes(measured_sizes)
+        # Directories removed since the last scan are forgotten
+        self.directory_usages = directory_usages
+        self.sizes = sizes
+        return True
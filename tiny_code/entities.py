@@ -1,4 +1,6 @@
 from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Collection, Optional
 
 
 @dataclass
@@ -8,6 +10,68 @@ class Config:
     break_lines: bool
     theme: str
     tab_size: int
+    show_ignored_files: bool
+    undo_memory_limit_mb: int
+    follow_max_lines: int
+    follow_poll_interval: float
+    long_line_threshold: int
 
     def to_dict(self) -> dict[str, str]:
         return asdict(self)
+
+
+@dataclass
+class FileSnapshot:
+    size: int
+    mtime_ns: int
+    content_hash: Optional[str]
+
+
+@dataclass
+class DirectoryListing:
+    mtime_ns: Optional[int]
+    entries: list[tuple[str, bool]]
+    ignore_key: str = ''
+
+
+@dataclass
+class DirectoryUsage:
+    mtime_ns: int
+    # Size of the directory and of its files with a single link
+    size: int
+    # Files with hard links: (device, inode, size)
+    linked_files: list[tuple[int, int, int]]
+    subdirectories: list[str]
+
+
+@dataclass
+class OpenFile:
+    path: str
+    cursor_location: tuple[int, int]
+    scroll_offset: tuple[int, int]
+    language: Optional[str]
+
+
+@dataclass
+class Session:
+    expanded_paths: list[str]
+    directory_listings: dict[str, DirectoryListing]
+    open_files: list[OpenFile]
+
+    def to_dict(self) -> dict[str, object]:
+        return asdict(self)
+
+
+@dataclass
+class GitStatus:
+    work_tree: Path
+    file_statuses: dict[str, str]
+    dirty_directories: set[str]
+    tracked_files: Collection[str]
+    tracked_directories: set[str]
+
+
+@dataclass
+class FileArgument:
+    path: Path
+    cursor_location: tuple[int, int]
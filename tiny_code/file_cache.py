@@ -0,0 +1,130 @@
+from pathlib import Path
+from typing import Optional
+import hashlib
+import marshal
+import os
+import zlib
+
+from tiny_code.consts import (
+    FILE_CACHE_DIR_PATH,
+    FILE_CACHE_HEAD_SIZE,
+    FILE_CACHE_MAX_SIZE,
+)
+from tiny_code.long_lines import Highlight
+from tiny_code.utils import atomic_write_bytes
+
+FILE_CACHE_VERSION = 1
+
+# Identity of a file version: (size, mtime_ns, hash of its first bytes)
+FileKey = tuple[int, int, str]
+
+
+class FileCacheManager:
+    """
+    Syntax highlights of the files opened before, so reopening a large file
+    skips highlighting the whole document. Entries are checked against the
+    size, mtime and first bytes of the file, and the least recently used
+    ones are removed past `FILE_CACHE_MAX_SIZE`
+    """
+
+    @classmethod
+    def get_entry_path(cls, file_path: Path) -> Path:
+        entry_id = hashlib.sha1(
+            str(file_path.resolve()).encode('utf-8')
+        ).hexdigest()
+        return FILE_CACHE_DIR_PATH.joinpath(f'{entry_id}.bin')
+
+    @classmethod
+    def get_file_key(cls, file_path: Path) -> Optional[FileKey]:
+        try:
+            with file_path.open('rb') as file:
+                file_stat = os.fstat(file.fileno())
+                head = file.read(FILE_CACHE_HEAD_SIZE)
+        except OSError:
+            return None
+        return (
+            file_stat.st_size,
+            file_stat.st_mtime_ns,
+            hashlib.blake2b(head, digest_size=16).hexdigest(),
+        )
+
+    @classmethod
+    def get_highlights(
+        cls, file_path: Path, file_key: FileKey, language: str
+    ) -> Optional[dict[int, list[Highlight]]]:
+        entry_path = cls.get_entry_path(file_path=file_path)
+        try:
+            (
+                version,
+                entry_file_key,
+                entry_language,
+                highlights,
+            ) = marshal.loads(zlib.decompress(entry_path.read_bytes()))
+        except (OSError, ValueError, EOFError, TypeError, zlib.error):
+            return None
+        if (
+            version != FILE_CACHE_VERSION
+            or entry_language != language
+            or tuple(entry_file_key) != file_key
+        ):
+            return None
+        try:
+            # The mtime of the entries orders them for the eviction
+            os.utime(entry_path)
+        except OSError:
+            pass
+        return highlights
+
+    @classmethod
+    def set_highlights(
+        cls,
+        file_path: Path,
+        file_key: FileKey,
+        language: str,
+        highlights: dict[int, list[Highlight]],
+    ) -> None:
+        # The file changed since it was read, the highlights are of another
+        # version
+        if cls.get_file_key(file_path=file_path) != file_key:
+            return
+        entry_path = cls.get_entry_path(file_path=file_path)
+        entry_path.parent.mkdir(parents=True, exist_ok=True)
+        atomic_write_bytes(
+            file_path=entry_path,
+            data=zlib.compress(
+                marshal.dumps(
+                    (FILE_CACHE_VERSION, file_key, language, highlights)
+                ),
+                level=1,
+            ),
+        )
+        cls.evict()
+
+    @classmethod
+    def evict(cls) -> None:
+        entries = []
+        try:
+            with os.scandir(FILE_CACHE_DIR_PATH) as dir_entries:
+                for dir_entry in dir_entries:
+                    try:
+                        entry_stat = dir_entry.stat()
+                    except OSError:
+                        continue
+                    entries.append(
+                        (
+                            entry_stat.st_mtime_ns,
+                            entry_stat.st_size,
+                            dir_entry.path,
+                        )
+                    )
+        except OSError:
+            return
+        total_size = sum(size for _, size, _ in entries)
+        for _, size, entry_path in sorted(entries):
+            if total_size <= FILE_CACHE_MAX_SIZE:
+                break
+            try:
+                os.unlink(entry_path)
+            except OSError:
+                continue
+            total_size -= size
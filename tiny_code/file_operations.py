@@ -0,0 +1,228 @@
+from pathlib import Path
+from typing import Callable
+import errno
+import os
+import shutil
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+from tiny_code.consts import FILE_COPY_CHUNK_SIZE
+
+# Linux ioctl making a file share the extents of another one (reflink), on
+# filesystems like btrfs or xfs
+FICLONE = 0x40049409
+
+# Errors of `copy_file_range` and `sendfile` meaning the files are not
+# supported, the copy goes on with the next way of copying
+UNSUPPORTED_COPY_ERRNOS = {
+    errno.EXDEV,
+    errno.ENOSYS,
+    errno.EINVAL,
+    errno.EOPNOTSUPP,
+    errno.ENOTSUP,
+    errno.ETXTBSY,
+}
+
+
+class FileOperationCancelled(Exception):
+    pass
+
+
+def get_total_size(path: Path) -> int:
+    """
+    Bytes to copy, symbolic links are copied as links
+    """
+    if path.is_symlink():
+        return 0
+    if not path.is_dir():
+        return path.stat().st_size
+    total_size = 0
+    for dir_path, _, file_names in os.walk(path):
+        for file_name in file_names:
+            file_path = os.path.join(dir_path, file_name)
+            if not os.path.islink(file_path):
+                total_size += os.lstat(file_path).st_size
+    return total_size
+
+
+def check_destination(destination: Path) -> None:
+    if destination.exists() or destination.is_symlink():
+        raise FileExistsError(
+            errno.EEXIST, os.strerror(errno.EEXIST), str(destination)
+        )
+
+
+def copy_file_contents(
+    source_fd: int,
+    destination_fd: int,
+    on_progress: Callable[[int], None],
+    is_cancelled: Callable[[], bool],
+) -> None:
+    """
+    Shares the extents of the source with a reflink if the filesystem
+    supports it, otherwise copies in the kernel with `copy_file_range` or
+    `sendfile`, and only reads and writes the data if neither is supported
+    """
+    if fcntl is not None:
+        try:
+            fcntl.ioctl(destination_fd, FICLONE, source_fd)
+            on_progress(os.fstat(source_fd).st_size)
+            return
+        except OSError:
+            pass
+
+    use_copy_file_range = hasattr(os, 'copy_file_range')
+    use_sendfile = hasattr(os, 'sendfile')
+    offset = 0
+    while True:
+        if is_cancelled():
+            raise FileOperationCancelled()
+        try:
+            if use_copy_file_range:
+                copied_size = os.copy_file_range(
+                    source_fd,
+                    destination_fd,
+                    FILE_COPY_CHUNK_SIZE,
+                    offset,
+                    offset,
+                )
+            elif use_sendfile:
+                os.lseek(destination_fd, offset, os.SEEK_SET)
+                copied_size = os.sendfile(
+                    destination_fd, source_fd, offset, FILE_COPY_CHUNK_SIZE
+                )
+            else:
+                data = os.pread(source_fd, FILE_COPY_CHUNK_SIZE, offset)
+                copied_size = 0
+                while copied_size < len(data):
+                    copied_size += os.pwrite(
+                        destination_fd,
+                        data[copied_size:],
+                        offset + copied_size,
+                    )
+        except OSError as error:
+            if error.errno not in UNSUPPORTED_COPY_ERRNOS:
+                raise
+            if use_copy_file_range:
+                use_copy_file_range = False
+            elif use_sendfile:
+                use_sendfile = False
+            else:
+                raise
+            continue
+        if not copied_size:
+            return
+        offset += copied_size
+        on_progress(copied_size)
+
+
+def copy_file(
+    source: Path,
+    destination: Path,
+    on_progress: Callable[[int], None],
+    is_cancelled: Callable[[], bool],
+) -> None:
+    with open(source, 'rb') as source_file, open(
+        destination, 'xb'
+    ) as destination_file:
+        copy_file_contents(
+            source_fd=source_file.fileno(),
+            destination_fd=destination_file.fileno(),
+            on_progress=on_progress,
+            is_cancelled=is_cancelled,
+        )
+    shutil.copystat(source, destination)
+
+
+def copy_path(
+    source: Path,
+    destination: Path,
+    on_progress: Callable[[int], None],
+    is_cancelled: Callable[[], bool],
+) -> None:
+    """
+    Copies a file, a symbolic link or a directory tree to a destination that
+    must not exist. If the copy fails or is cancelled the destination is
+    removed
+    """
+    check_destination(destination=destination)
+    if source.is_dir() and not source.is_symlink():
+        if destination.resolve().is_relative_to(source.resolve()):
+            raise OSError(errno.EINVAL, 'Can not copy a directory into itself')
+    try:
+        if source.is_symlink():
+            os.symlink(os.readlink(source), destination)
+        elif not source.is_dir():
+            copy_file(
+                source=source,
+                destination=destination,
+                on_progress=on_progress,
+                is_cancelled=is_cancelled,
+            )
+        else:
+            destination.mkdir()
+            for dir_path, dir_names, file_names in os.walk(source):
+                destination_dir_path = destination.joinpath(
+                    os.path.relpath(dir_path, source)
+                )
+                for name in list(dir_names):
+                    if os.path.islink(os.path.join(dir_path, name)):
+                        dir_names.remove(name)
+                        file_names.append(name)
+                    else:
+                        destination_dir_path.joinpath(name).mkdir()
+                for name in file_names:
+                    source_path = Path(dir_path, name)
+                    if source_path.is_symlink():
+                        os.symlink(
+                            os.readlink(source_path),
+                            destination_dir_path.joinpath(name),
+                        )
+                        continue
+                    copy_file(
+                        source=source_path,
+                        destination=destination_dir_path.joinpath(name),
+                        on_progress=on_progress,
+                        is_cancelled=is_cancelled,
+                    )
+                shutil.copystat(dir_path, destination_dir_path)
+    except BaseException:
+        remove_path(path=destination)
+        raise
+
+
+def move_path(
+    source: Path,
+    destination: Path,
+    on_progress: Callable[[int], None],
+    is_cancelled: Callable[[], bool],
+) -> bool:
+    """
+    Moves within a filesystem are a rename, the others a copy followed by the
+    removal of the source. Returns True if the source was renamed
+    """
+    check_destination(destination=destination)
+    try:
+        os.rename(source, destination)
+        return True
+    except OSError as error:
+        if error.errno != errno.EXDEV:
+            raise
+    copy_path(
+        source=source,
+        destination=destination,
+        on_progress=on_progress,
+        is_cancelled=is_cancelled,
+    )
+    remove_path(path=source)
+    return False
+
+
+def remove_path(path: Path) -> None:
+    if path.is_dir() and not path.is_symlink():
+        shutil.rmtree(path, ignore_errors=True)
+    elif path.exists() or path.is_symlink():
+        path.unlink()
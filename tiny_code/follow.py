@@ -0,0 +1,52 @@
+from pathlib import Path
+from typing import Optional
+import codecs
+import os
+import threading
+
+from tiny_code.consts import FOLLOW_READ_CHUNK_SIZE
+
+
+class FileFollower:
+    def __init__(self, file_path: Path, offset: int) -> None:
+        self.file_path = file_path
+        self.offset = offset
+        self.inode = os.stat(file_path).st_ino
+        self.mtime_ns: Optional[int] = None
+        self.decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+        self.lock = threading.Lock()
+
+    def read_appended(self) -> tuple[str, bool]:
+        """
+        Returns the text appended since the last read and whether the file
+        was truncated or rotated (in which case the text starts from the
+        beginning of the new file)
+        """
+        with self.lock:
+            return self._read_appended()
+
+    def _read_appended(self) -> tuple[str, bool]:
+        try:
+            file_stat = os.stat(self.file_path)
+        except OSError:
+            return '', False
+
+        rotated = (
+            file_stat.st_ino != self.inode or file_stat.st_size < self.offset
+        )
+        if rotated:
+            self.inode = file_stat.st_ino
+            self.offset = 0
+            self.decoder.reset()
+        self.mtime_ns = file_stat.st_mtime_ns
+
+        if file_stat.st_size == self.offset:
+            return '', rotated
+
+        with open(self.file_path, 'rb') as file:
+            file.seek(self.offset)
+            data = file.read(
+                min(file_stat.st_size - self.offset, FOLLOW_READ_CHUNK_SIZE)
+            )
+        self.offset += len(data)
+        return self.decoder.decode(data), rotated
@@ -0,0 +1,337 @@
+from pathlib import Path
+from typing import Callable, Iterable, Optional
+import hashlib
+import os
+import stat
+import struct
+import threading
+
+from tiny_code.entities import GitStatus
+
+INDEX_ENTRY_STRUCT = struct.Struct('>10L20sH')
+INDEX_ASSUME_VALID_FLAG = 0x8000
+INDEX_EXTENDED_FLAG = 0x4000
+INDEX_STAGE_MASK = 0x3000
+INDEX_SKIP_WORKTREE_FLAG = 0x4000
+INDEX_INTENT_TO_ADD_FLAG = 0x2000
+
+MODIFIED = 'M'
+DELETED = 'D'
+ADDED = 'A'
+CONFLICTED = 'U'
+UNTRACKED = '?'
+DIRTY = '●'
+
+# Index entry: (mtime_ns, size, mode, sha1, state)
+IndexEntry = tuple[int, int, int, bytes, Optional[str]]
+
+
+def find_git_dir(dir_path: Path) -> Optional[tuple[Path, Path]]:
+    """
+    Returns the work tree and the git directory of the repository containing
+    `dir_path`, following `gitdir:` files used by worktrees and submodules
+    """
+    for work_tree in (dir_path, *dir_path.parents):
+        git_path = work_tree.joinpath('.git')
+        if git_path.is_dir():
+            return work_tree, git_path
+        if git_path.is_file():
+            try:
+                git_file_content = git_path.read_text().strip()
+            except OSError:
+                return None
+            if not git_file_content.startswith('gitdir:'):
+                return None
+            git_dir = work_tree.joinpath(
+                git_file_content.removeprefix('gitdir:').strip()
+            ).resolve()
+            return work_tree, git_dir
+    return None
+
+
+def read_index(index_path: Path) -> dict[str, IndexEntry]:
+    data = index_path.read_bytes()
+    signature, version, entries_count = struct.unpack_from('>4sLL', data)
+    if signature != b'DIRC' or version not in (2, 3, 4):
+        raise ValueError(f'Unsupported git index `{index_path}`')
+
+    entries = {}
+    offset = 12
+    previous_path = b''
+    for _ in range(entries_count):
+        entry_offset = offset
+        (
+            _,
+            _,
+            mtime_s,
+            mtime_ns,
+            _,
+            _,
+            mode,
+            _,
+            _,
+            size,
+            sha1,
+            flags,
+        ) = INDEX_ENTRY_STRUCT.unpack_from(data, offset)
+        offset += INDEX_ENTRY_STRUCT.size
+        extended_flags = 0
+        if flags & INDEX_EXTENDED_FLAG:
+            (extended_flags,) = struct.unpack_from('>H', data, offset)
+            offset += 2
+
+        if version == 4:
+            # Paths are prefix compressed against the previous entry
+            byte = data[offset]
+            offset += 1
+            strip_length = byte & 0x7F
+            while byte & 0x80:
+                byte = data[offset]
+                offset += 1
+                strip_length = ((strip_length + 1) << 7) | (byte & 0x7F)
+            path_end = data.index(b'\0', offset)
+            path = (
+                previous_path[: len(previous_path) - strip_length]
+                + data[offset:path_end]
+            )
+            offset = path_end + 1
+        else:
+            path_end = data.index(b'\0', offset)
+            path = data[offset:path_end]
+            offset = entry_offset + ((path_end - entry_offset + 8) & ~7)
+        previous_path = path
+
+        if flags & INDEX_STAGE_MASK:
+            state = CONFLICTED
+        elif flags & INDEX_ASSUME_VALID_FLAG or (
+            extended_flags & INDEX_SKIP_WORKTREE_FLAG
+        ):
+            state = None
+            mode = 0
+        elif extended_flags & INDEX_INTENT_TO_ADD_FLAG:
+            state = ADDED
+        else:
+            state = MODIFIED
+        entries[os.fsdecode(path)] = (
+            mtime_s * 1_000_000_000 + mtime_ns,
+            size,
+            mode,
+            sha1,
+            state,
+        )
+    return entries
+
+
+def hash_blob(file_path: str, file_stat: os.stat_result) -> bytes:
+    if stat.S_ISLNK(file_stat.st_mode):
+        content = os.fsencode(os.readlink(file_path))
+    else:
+        with open(file_path, 'rb') as file:
+            content = file.read()
+    return hashlib.sha1(f'blob {len(content)}\0'.encode() + content).digest()
+
+
+def get_path_status(
+    git_status: GitStatus, path: Path, is_dir: bool
+) -> Optional[str]:
+    try:
+        relative_path = path.relative_to(git_status.work_tree).as_posix()
+    except ValueError:
+        return None
+    if relative_path == '.':
+        return None
+
+    if is_dir:
+        if relative_path in git_status.dirty_directories:
+            return DIRTY
+        if relative_path not in git_status.tracked_directories:
+            return UNTRACKED
+        return None
+    if relative_path in git_status.file_statuses:
+        return git_status.file_statuses[relative_path]
+    if relative_path not in git_status.tracked_files:
+        return UNTRACKED
+    return None
+
+
+class GitStatusProvider:
+    """
+    Computes the work tree status against `.git/index` without running git.
+    Files whose stat matches the index are clean, the others are hashed once
+    and cached by their stat so rescans only hash what changed since
+    """
+
+    def __init__(self, work_tree: Path, git_dir: Path) -> None:
+        self.work_tree = work_tree
+        self.index_path = git_dir.joinpath('index')
+        self.index_stat: Optional[tuple[int, int, int]] = None
+        self.index_mtime_ns: int = 0
+        self.index_entries: dict[str, IndexEntry] = {}
+        self.tracked_directories: set[str] = set()
+        self.stat_cache: dict[str, tuple[int, int, Optional[str]]] = {}
+        self.file_statuses: dict[str, str] = {}
+        self.lock = threading.Lock()
+
+    def refresh(self, is_cancelled: Callable[[], bool]) -> Optional[GitStatus]:
+        with self.lock:
+            self.read_index_if_changed()
+            file_statuses = {}
+            for index, (relative_path, index_entry) in enumerate(
+                self.index_entries.items()
+            ):
+                if index % 1000 == 0 and is_cancelled():
+                    return None
+                file_status = self.get_file_status(
+                    relative_path=relative_path, index_entry=index_entry
+                )
+                if file_status is not None:
+                    file_statuses[relative_path] = file_status
+            self.file_statuses = file_statuses
+            self.stat_cache = {
+                relative_path: cached_stat
+                for relative_path, cached_stat in self.stat_cache.items()
+                if relative_path in self.index_entries
+            }
+            return self.get_git_status()
+
+    def refresh_paths(
+        self, paths: Iterable[Path], is_cancelled: Callable[[], bool]
+    ) -> Optional[GitStatus]:
+        """
+        Recomputes only `paths`, unless the index changed in the meantime in
+        which case every tracked file is checked again
+        """
+        if self.is_index_changed():
+            return self.refresh(is_cancelled=is_cancelled)
+
+        with self.lock:
+            file_statuses = dict(self.file_statuses)
+            for path in paths:
+                try:
+                    relative_path = path.relative_to(self.work_tree).as_posix()
+                except ValueError:
+                    continue
+                index_entry = self.index_entries.get(relative_path)
+                if index_entry is None:
+                    continue
+                file_status = self.get_file_status(
+                    relative_path=relative_path, index_entry=index_entry
+                )
+                if file_status is None:
+                    file_statuses.pop(relative_path, None)
+                else:
+                    file_statuses[relative_path] = file_status
+            if file_statuses == self.file_statuses:
+                return None
+            self.file_statuses = file_statuses
+            return self.get_git_status()
+
+    def is_index_changed(self) -> bool:
+        try:
+            index_stat = self.index_path.stat()
+        except OSError:
+            return self.index_stat is not None
+        return self.index_stat != (
+            index_stat.st_mtime_ns,
+            index_stat.st_size,
+            index_stat.st_ino,
+        )
+
+    def read_index_if_changed(self) -> None:
+        if not self.is_index_changed():
+            return
+        try:
+            index_stat = self.index_path.stat()
+            index_entries = read_index(index_path=self.index_path)
+        except (OSError, ValueError, struct.error):
+            self.index_stat = None
+            self.index_entries = {}
+            self.tracked_directories = set()
+            return
+
+        tracked_directories = set()
+        for relative_path in index_entries:
+            directory, _, _ = relative_path.rpartition('/')
+            while directory and directory not in tracked_directories:
+                tracked_directories.add(directory)
+                directory, _, _ = directory.rpartition('/')
+
+        self.index_stat = (
+            index_stat.st_mtime_ns,
+            index_stat.st_size,
+            index_stat.st_ino,
+        )
+        self.index_mtime_ns = index_stat.st_mtime_ns
+        self.index_entries = index_entries
+        self.tracked_directories = tracked_directories
+        self.stat_cache = {}
+
+    def get_file_status(
+        self, relative_path: str, index_entry: IndexEntry
+    ) -> Optional[str]:
+        mtime_ns, size, mode, sha1, state = index_entry
+        if state is None or stat.S_ISDIR(mode) or mode >> 12 == 0o16:
+            return None
+        if state == CONFLICTED:
+            return CONFLICTED
+
+        file_path = os.path.join(self.work_tree, relative_path)
+        try:
+            file_stat = os.lstat(file_path)
+        except (FileNotFoundError, NotADirectoryError):
+            return DELETED
+        except OSError:
+            return None
+        if state == ADDED:
+            return ADDED
+
+        if (
+            file_stat.st_size & 0xFFFFFFFF != size
+            or stat.S_IFMT(file_stat.st_mode) != stat.S_IFMT(mode)
+            or stat.S_ISREG(mode)
+            and bool(file_stat.st_mode & 0o100) != bool(mode & 0o100)
+        ):
+            return MODIFIED
+        # Files written in the same tick as the index are "racily clean",
+        # their mtime can't prove anything so they are always hashed
+        if (
+            file_stat.st_mtime_ns == mtime_ns
+            and file_stat.st_mtime_ns < self.index_mtime_ns
+        ):
+            return None
+
+        cached_stat = self.stat_cache.get(relative_path)
+        if cached_stat is not None and cached_stat[:2] == (
+            file_stat.st_mtime_ns,
+            file_stat.st_size,
+        ):
+            return cached_stat[2]
+        try:
+            file_status = (
+                None
+                if hash_blob(file_path=file_path, file_stat=file_stat) == sha1
+                else MODIFIED
+            )
+        except OSError:
+            return None
+        self.stat_cache[relative_path] = (
+            file_stat.st_mtime_ns,
+            file_stat.st_size,
+            file_status,
+        )
+        return file_status
+
+    def get_git_status(self) -> GitStatus:
+        dirty_directories = set()
+        for relative_path in self.file_statuses:
+            directory, _, _ = relative_path.rpartition('/')
+            while directory and directory not in dirty_directories:
+                dirty_directories.add(directory)
+                directory, _, _ = directory.rpartition('/')
+        return GitStatus(
+            work_tree=self.work_tree,
+            file_statuses=self.file_statuses,
+            dirty_directories=dirty_directories,
+            tracked_files=self.index_entries,
+            tracked_directories=self.tracked_directories,
+        )
@@ -0,0 +1,269 @@
+from array import array
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Optional
+import sys
+
+from textual.document._document import EditResult
+from textual.document._edit import Edit
+from textual.document._history import EditHistory
+from textual.widgets import TextArea
+from textual.widgets.text_area import Selection
+
+EDIT_MEMORY_OVERHEAD = 600
+LINE_DELTA_MEMORY_OVERHEAD = 120
+LINE_DELTA_MIN_CHARACTERS = 64
+
+# Line delta: (column, old text, new text, offsets of the lines in the edit
+# range it applies to). Block edits repeat the same few changes on every
+# line, so grouping them by change keeps a few bytes per line
+LineDelta = tuple[int, str, str, array]
+
+
+def apply_line_deltas(text: str, deltas: list[LineDelta], undo: bool) -> str:
+    lines = text.split('\n')
+    for column, old_text, new_text, line_offsets in deltas:
+        if undo:
+            old_text, new_text = new_text, old_text
+        for line_offset in line_offsets:
+            line = lines[line_offset]
+            lines[line_offset] = (
+                line[:column] + new_text + line[column + len(old_text) :]
+            )
+    return '\n'.join(lines)
+
+
+@dataclass
+class LineDeltaEdit(Edit):
+    """
+    Block edit (indentation, comments) that keeps only the changed fragment
+    of each line instead of full copies of the replaced and inserted texts
+    """
+
+    deltas: list[LineDelta] = field(default_factory=list)
+    _redo_selection: Optional[Selection] = field(init=False, default=None)
+
+    @classmethod
+    def from_edit(cls, edit: Edit) -> Optional['LineDeltaEdit']:
+        old_lines = edit._edit_result.replaced_text.split('\n')
+        new_lines = edit.text.split('\n')
+        if len(old_lines) != len(new_lines):
+            return None
+
+        deltas = {}
+        for line_offset, (old_line, new_line) in enumerate(
+            zip(old_lines, new_lines)
+        ):
+            if old_line == new_line:
+                continue
+            prefix_length = 0
+            max_prefix_length = min(len(old_line), len(new_line))
+            while (
+                prefix_length < max_prefix_length
+                and old_line[prefix_length] == new_line[prefix_length]
+            ):
+                prefix_length += 1
+            suffix_length = 0
+            max_suffix_length = max_prefix_length - prefix_length
+            while (
+                suffix_length < max_suffix_length
+                and old_line[-suffix_length - 1]
+                == new_line[-suffix_length - 1]
+            ):
+                suffix_length += 1
+            delta = (
+                prefix_length,
+                old_line[prefix_length : len(old_line) - suffix_length],
+                new_line[prefix_length : len(new_line) - suffix_length],
+            )
+            if delta not in deltas:
+                deltas[delta] = array('L')
+            deltas[delta].append(line_offset)
+
+        line_delta_edit = cls(
+            text='',
+            from_location=edit.top,
+            to_location=edit.bottom,
+            maintain_selection_offset=edit.maintain_selection_offset,
+            deltas=[
+                (column, old_text, new_text, line_offsets)
+                for (
+                    column,
+                    old_text,
+                    new_text,
+                ), line_offsets in deltas.items()
+            ],
+        )
+        line_delta_edit._original_selection = edit._original_selection
+        line_delta_edit._updated_selection = edit._updated_selection
+        line_delta_edit._redo_selection = edit._updated_selection
+        line_delta_edit._edit_result = EditResult(
+            end_location=edit._edit_result.end_location, replaced_text=''
+        )
+        return line_delta_edit
+
+    def do(
+        self, text_area: TextArea, record_selection: bool = True
+    ) -> EditResult:
+        if record_selection:
+            self._original_selection = text_area.selection
+        document = text_area.document
+        old_text = document.get_text_range(self.top, self.bottom)
+        edit_result = document.replace_range(
+            self.top,
+            self.bottom,
+            apply_line_deltas(text=old_text, deltas=self.deltas, undo=False),
+        )
+        self._edit_result = EditResult(
+            end_location=edit_result.end_location, replaced_text=''
+        )
+        self._updated_selection = self._redo_selection
+        return self._edit_result
+
+    def undo(self, text_area: TextArea) -> EditResult:
+        document = text_area.document
+        end_location = self._edit_result.end_location
+        new_text = document.get_text_range(self.top, end_location)
+        edit_result = document.replace_range(
+            self.top,
+            end_location,
+            apply_line_deltas(text=new_text, deltas=self.deltas, undo=True),
+        )
+        self._updated_selection = self._original_selection
+        return edit_result
+
+    def get_memory_usage(self) -> int:
+        return EDIT_MEMORY_OVERHEAD + sum(
+            LINE_DELTA_MEMORY_OVERHEAD
+            + sys.getsizeof(old_text)
+            + sys.getsizeof(new_text)
+            + sys.getsizeof(line_offsets)
+            for _, old_text, new_text, line_offsets in self.deltas
+        )
+
+
+def get_edit_memory_usage(edit: Edit) -> int:
+    if isinstance(edit, LineDeltaEdit):
+        return edit.get_memory_usage()
+    replaced_text = (
+        edit._edit_result.replaced_text if edit._edit_result else ''
+    )
+    return (
+        EDIT_MEMORY_OVERHEAD
+        + sys.getsizeof(edit.text)
+        + sys.getsizeof(replaced_text)
+    )
+
+
+def merge_edits(previous_edit: Edit, edit: Edit) -> Optional[Edit]:
+    """
+    Merges two consecutive single line insertions or deletions into a single
+    edit, returns None if they are not adjacent
+    """
+    if isinstance(previous_edit, LineDeltaEdit) or isinstance(
+        edit, LineDeltaEdit
+    ):
+        return None
+    previous_replaced_text = previous_edit._edit_result.replaced_text
+    replaced_text = edit._edit_result.replaced_text
+    if (
+        '\n' in previous_edit.text + previous_replaced_text
+        or '\n' in edit.text + replaced_text
+    ):
+        return None
+
+    if (
+        not previous_replaced_text
+        and not replaced_text
+        and edit.top == previous_edit._edit_result.end_location
+    ):
+        previous_edit.text += edit.text
+        previous_edit._edit_result = EditResult(
+            end_location=edit._edit_result.end_location, replaced_text=''
+        )
+    elif not previous_edit.text and not edit.text:
+        if edit.bottom == previous_edit.top:
+            replaced_text += previous_replaced_text
+        elif edit.top == previous_edit.top:
+            replaced_text = previous_replaced_text + replaced_text
+        else:
+            return None
+        row, column = edit.top
+        previous_edit.from_location = (row, column)
+        previous_edit.to_location = (row, column + len(replaced_text))
+        previous_edit._edit_result = EditResult(
+            end_location=(row, column), replaced_text=replaced_text
+        )
+    else:
+        return None
+
+    previous_edit._updated_selection = edit._updated_selection
+    return previous_edit
+
+
+@dataclass
+class CompactEditHistory(EditHistory):
+    """
+    Edit history that merges adjacent keystrokes, stores block edits as line
+    deltas and evicts the oldest checkpoints above `memory_limit` bytes
+    """
+
+    memory_limit: int = 64 * 1024 * 1024
+    memory_usage: int = field(init=False, default=0)
+
+    def __post_init__(self) -> None:
+        super().__post_init__()
+        # Checkpoints are evicted here, a bounded deque would drop them
+        # without updating the memory usage
+        self._undo_stack = deque()
+
+    def record(self, edit: Edit) -> None:
+        edit_result = edit._edit_result
+        if (
+            edit_result is not None
+            and not edit.text
+            and not edit_result.replaced_text
+        ):
+            return
+
+        self.memory_usage -= sum(
+            get_edit_memory_usage(redo_edit)
+            for batch in self._redo_stack
+            for redo_edit in batch
+        )
+        super().record(edit)
+        batch = self._undo_stack[-1]
+
+        if (
+            len(edit.text) + len(edit_result.replaced_text)
+            >= LINE_DELTA_MIN_CHARACTERS
+        ):
+            line_delta_edit = LineDeltaEdit.from_edit(edit)
+            if line_delta_edit is not None:
+                batch[-1] = line_delta_edit
+        self.memory_usage += get_edit_memory_usage(batch[-1])
+
+        if len(batch) > 1:
+            previous_edit_memory_usage = get_edit_memory_usage(batch[-2])
+            edit_memory_usage = get_edit_memory_usage(batch[-1])
+            merged_edit = merge_edits(previous_edit=batch[-2], edit=batch[-1])
+            if merged_edit is not None:
+                batch.pop()
+                self.memory_usage += (
+                    get_edit_memory_usage(merged_edit)
+                    - previous_edit_memory_usage
+                    - edit_memory_usage
+                )
+
+        while len(self._undo_stack) > 1 and (
+            len(self._undo_stack) > self.max_checkpoints
+            or self.memory_usage > self.memory_limit
+        ):
+            self.memory_usage -= sum(
+                get_edit_memory_usage(evicted_edit)
+                for evicted_edit in self._undo_stack.popleft()
+            )
+
+    def clear(self) -> None:
+        super().clear()
+        self.memory_usage = 0
@@ -0,0 +1,358 @@
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Iterable, Iterator, Optional
+import hashlib
+import os
+import re
+import threading
+
+from tiny_code.git_status import find_git_dir
+
+IGNORE_FILE_NAMES = ('.gitignore', '.ignore')
+
+# Compiled rule: (regex over the path relative to the matcher root, negated,
+# directory only)
+IgnoreRule = tuple[str, bool, bool]
+
+
+@dataclass
+class DirectoryRules:
+    key: str
+    rules: list[IgnoreRule]
+    directory_pattern: Optional[re.Pattern] = field(init=False)
+    directory_negations: list[bool] = field(init=False)
+    file_pattern: Optional[re.Pattern] = field(init=False)
+    file_negations: list[bool] = field(init=False)
+
+    def __post_init__(self) -> None:
+        # Rules are joined last to first, so the alternative that matches is
+        # the last matching rule, as git requires
+        def compile_rules(
+            rules: list[IgnoreRule],
+        ) -> tuple[Optional[re.Pattern], list[bool]]:
+            if not rules:
+                return None, []
+            rules = rules[::-1]
+            pattern = re.compile(
+                '|'.join(f'({regex})' for regex, _, _ in rules), re.DOTALL
+            )
+            return pattern, [negated for _, negated, _ in rules]
+
+        self.directory_pattern, self.directory_negations = compile_rules(
+            self.rules
+        )
+        self.file_pattern, self.file_negations = compile_rules(
+            [rule for rule in self.rules if not rule[2]]
+        )
+
+    def is_ignored(self, relative_path: str, is_dir: bool) -> bool:
+        if is_dir:
+            pattern, negations = (
+                self.directory_pattern,
+                self.directory_negations,
+            )
+        else:
+            pattern, negations = self.file_pattern, self.file_negations
+        if pattern is None:
+            return False
+        match = pattern.fullmatch(relative_path)
+        return match is not None and not negations[match.lastindex - 1]
+
+
+def translate_glob(pattern: str) -> str:
+    regex = []
+    index = 0
+    while index < len(pattern):
+        char = pattern[index]
+        if char == '*':
+            is_double_star = (
+                pattern[index : index + 2] == '**'
+                and (index == 0 or pattern[index - 1] == '/')
+                and (index + 2 == len(pattern) or pattern[index + 2] == '/')
+            )
+            if is_double_star and index + 2 == len(pattern):
+                regex.append('.*')
+                index += 2
+            elif is_double_star:
+                regex.append('(?:.*/)?')
+                index += 3
+            else:
+                regex.append('[^/]*')
+                index += 1
+        elif char == '?':
+            regex.append('[^/]')
+            index += 1
+        elif char == '[':
+            class_end = pattern.find(']', index + 2)
+            if class_end == -1:
+                regex.append(re.escape(char))
+                index += 1
+                continue
+            class_content = pattern[index + 1 : class_end]
+            if class_content[0] in '!^':
+                class_content = '^' + class_content[1:]
+            class_content = class_content.replace('\\', '\\\\')
+            regex.append(f'[{class_content}]')
+            index = class_end + 1
+        elif char == '\\' and index + 1 < len(pattern):
+            regex.append(re.escape(pattern[index + 1]))
+            index += 2
+        else:
+            regex.append(re.escape(char))
+            index += 1
+    return ''.join(regex)
+
+
+def compile_rule(line: str, relative_dir: str) -> Optional[IgnoreRule]:
+    line = line.rstrip('\r\n')
+    if not line or line.startswith('#'):
+        return None
+    while line.endswith(' ') and not line.endswith('\\ '):
+        line = line[:-1]
+
+    negated = line.startswith('!')
+    if negated:
+        line = line[1:]
+    directory_only = line.endswith('/')
+    line = line.rstrip('/')
+    if not line:
+        return None
+
+    # A separator anywhere but at the end anchors the pattern to the
+    # directory of the ignore file, otherwise it matches at any depth
+    anchored = '/' in line
+    regex = translate_glob(line.lstrip('/'))
+    if not anchored:
+        regex = '(?:.*/)?' + regex
+    if relative_dir:
+        regex = re.escape(relative_dir + '/') + regex
+    return regex, negated, directory_only
+
+
+def read_rules(file_path: Path, relative_dir: str) -> list[IgnoreRule]:
+    try:
+        lines = file_path.read_text(encoding='utf-8', errors='replace')
+    except OSError:
+        return []
+    return [
+        rule
+        for line in lines.splitlines()
+        if (rule := compile_rule(line=line, relative_dir=relative_dir))
+    ]
+
+
+class IgnoreMatcher:
+    """
+    Matches paths against the `.gitignore` and `.ignore` files found from the
+    repository root (or `root_path` outside of a repository) down to them,
+    plus `.git/info/exclude`. Rules are compiled once per directory and kept
+    while the stats of the ignore files they came from are unchanged
+    """
+
+    def __init__(self, root_path: Path) -> None:
+        git_dir = find_git_dir(dir_path=root_path)
+        if git_dir is not None:
+            self.root_path, git_dir_path = git_dir
+            self.exclude_path = git_dir_path.joinpath('info', 'exclude')
+        else:
+            self.root_path = root_path
+            self.exclude_path = None
+        self.directory_rules: dict[Path, DirectoryRules] = {}
+        # Directory: (its path relative to the root, its rules, whether it or
+        # one of its parents is ignored), kept until `get_rules` finds an
+        # ignore file changed
+        self.directory_states: dict[
+            Path, tuple[Optional[str], DirectoryRules, bool]
+        ] = {}
+        self.lock = threading.Lock()
+
+    def get_relative_path(self, path: Path) -> Optional[str]:
+        try:
+            relative_path = path.relative_to(self.root_path).as_posix()
+        except ValueError:
+            return None
+        return '' if relative_path == '.' else relative_path
+
+    def get_rules(
+        self,
+        dir_path: Path,
+        parent_rules: Optional[DirectoryRules] = None,
+    ) -> DirectoryRules:
+        relative_dir = self.get_relative_path(dir_path)
+        if relative_dir is None:
+            return DirectoryRules(key='', rules=[])
+
+        if relative_dir == '':
+            source_paths = [self.exclude_path] if self.exclude_path else []
+            parent_key = ''
+            parent_rules_list = []
+        else:
+            if parent_rules is None:
+                parent_rules = self.get_rules(dir_path=dir_path.parent)
+            source_paths = []
+            parent_key = parent_rules.key
+            parent_rules_list = parent_rules.rules
+        source_paths.extend(
+            dir_path.joinpath(file_name) for file_name in IGNORE_FILE_NAMES
+        )
+
+        source_stats = []
+        for source_path in source_paths:
+            try:
+                source_stat = os.stat(source_path)
+                source_stats.append(
+                    (source_stat.st_mtime_ns, source_stat.st_size)
+                )
+            except OSError:
+                source_stats.append(None)
+        if relative_dir and not any(source_stats):
+            with self.lock:
+                # Its ignore files were removed
+                if self.directory_rules.pop(dir_path, None) is not None:
+                    self.directory_states.clear()
+            return parent_rules
+        key = hashlib.sha1(
+            f'{parent_key}{source_stats}'.encode('utf-8')
+        ).hexdigest()[:16]
+
+        with self.lock:
+            directory_rules = self.directory_rules.get(dir_path)
+        if directory_rules is not None and directory_rules.key == key:
+            return directory_rules
+
+        rules = list(parent_rules_list)
+        for source_path, source_stat in zip(source_paths, source_stats):
+            if source_stat is not None:
+                rules.extend(
+                    read_rules(
+                        file_path=source_path, relative_dir=relative_dir
+                    )
+                )
+        directory_rules = DirectoryRules(key=key, rules=rules)
+        with self.lock:
+            self.directory_rules[dir_path] = directory_rules
+            self.directory_states.clear()
+        return directory_rules
+
+    def get_directory_state(
+        self, dir_path: Path
+    ) -> tuple[Optional[str], DirectoryRules, bool]:
+        with self.lock:
+            directory_state = self.directory_states.get(dir_path)
+        if directory_state is not None:
+            return directory_state
+
+        relative_dir = self.get_relative_path(dir_path)
+        if not relative_dir:
+            directory_state = (
+                relative_dir,
+                self.get_rules(dir_path=dir_path),
+                False,
+            )
+        else:
+            _, parent_rules, is_parent_ignored = self.get_directory_state(
+                dir_path=dir_path.parent
+            )
+            directory_state = (
+                relative_dir,
+                self.get_rules(dir_path=dir_path, parent_rules=parent_rules),
+                is_parent_ignored
+                or parent_rules.is_ignored(
+                    relative_path=relative_dir, is_dir=True
+                ),
+            )
+        with self.lock:
+            self.directory_states[dir_path] = directory_state
+        return directory_state
+
+    def is_ignored(self, path: Path, is_dir: bool) -> bool:
+        """
+        Also True for the paths inside an ignored directory. The state of the
+        directories is kept, so it does not read the ignore files again on
+        each call
+        """
+        (
+            relative_dir,
+            directory_rules,
+            is_parent_ignored,
+        ) = self.get_directory_state(dir_path=path.parent)
+        # The root is never ignored, nor the paths outside of it
+        if relative_dir is None or path.parent == path:
+            return False
+        relative_path = (
+            f'{relative_dir}/{path.name}' if relative_dir else path.name
+        )
+        return is_parent_ignored or directory_rules.is_ignored(
+            relative_path=relative_path, is_dir=is_dir
+        )
+
+    def filter_entries(
+        self, dir_path: Path, entries: Iterable[tuple[str, bool]]
+    ) -> Iterator[tuple[str, bool]]:
+        """
+        Drops the ignored `(name, is_dir)` entries of `dir_path`
+        """
+        relative_dir = self.get_relative_path(dir_path)
+        if relative_dir is None:
+            yield from entries
+            return
+        directory_rules = self.get_rules(dir_path=dir_path)
+        prefix = f'{relative_dir}/' if relative_dir else ''
+        for name, is_dir in entries:
+            if not directory_rules.is_ignored(
+                relative_path=prefix + name, is_dir=is_dir
+            ):
+                yield name, is_dir
+
+    def walk(
+        self,
+        top_path: Path,
+        is_cancelled: Callable[[], bool] = lambda: False,
+    ) -> Iterator[tuple[Path, list[str], list[str]]]:
+        """
+        Walks `top_path` like `os.walk`, pruning `.git` and ignored
+        subtrees before they are listed. Symlinked directories are reported
+        but not followed
+        """
+        to_walk = [(top_path, None)]
+        while to_walk and not is_cancelled():
+            dir_path, parent_rules = to_walk.pop()
+            directory_rules = self.get_rules(
+                dir_path=dir_path, parent_rules=parent_rules
+            )
+            try:
+                with os.scandir(dir_path) as dir_entries:
+                    entries = []
+                    for dir_entry in dir_entries:
+                        if dir_entry.name == '.git':
+                            continue
+                        try:
+                            is_dir = dir_entry.is_dir()
+                            is_symlink = dir_entry.is_symlink()
+                        except OSError:
+                            continue
+                        entries.append((dir_entry.name, is_dir, is_symlink))
+            except OSError:
+                continue
+
+            relative_dir = self.get_relative_path(dir_path)
+            prefix = f'{relative_dir}/' if relative_dir else ''
+            dir_names, file_names, symlink_names = [], [], set()
+            for name, is_dir, is_symlink in entries:
+                if relative_dir is not None and directory_rules.is_ignored(
+                    relative_path=prefix + name, is_dir=is_dir
+                ):
+                    continue
+                if is_dir:
+                    dir_names.append(name)
+                    if is_symlink:
+                        symlink_names.add(name)
+                else:
+                    file_names.append(name)
+
+            yield dir_path, dir_names, file_names
+            to_walk.extend(
+                (dir_path.joinpath(name), directory_rules)
+                for name in reversed(dir_names)
+                if name not in symlink_names
+            )
@@ -0,0 +1,152 @@
+from typing import Optional
+import re
+
+JSON_TOKEN_PATTERN = re.compile(
+    # Unrolled so an unterminated string backtracks in linear time, without
+    # the possessive quantifiers of Python 3.11
+    r'(?P<string>"[^"\\]*(?:\\.[^"\\]*)*")'
+    r'|(?P<punctuation>[\[\]{},:])'
+    r'|(?P<scalar>[^\s\[\]{},:"]+)'
+    r'|(?P<space>\s+)'
+    r'|(?P<invalid>.)',
+    re.DOTALL,
+)
+
+JSON_SCALAR_PATTERN = re.compile(
+    r'-?(?:0|[1-9][0-9]*)(?:\.[0-9]+)?(?:[eE][+-]?[0-9]+)?|true|false|null'
+)
+
+# Strings without control characters or unknown escapes
+JSON_STRING_PATTERN = re.compile(
+    r'"[^"\\\x00-\x1f]*'
+    r'(?:\\(?:["\\/bfnrt]|u[0-9a-fA-F]{4})[^"\\\x00-\x1f]*)*"'
+)
+
+JSON_CLOSING_BRACKETS = {'[': ']', '{': '}'}
+
+# Formatter state kept between chunks: (opening brackets of the enclosing
+# arrays and objects, opening bracket not written yet or '', next token
+# expected: 'value', 'key', 'colon' or 'next' for a comma or a closing
+# bracket)
+JsonFormatState = tuple[str, str, str]
+
+JSON_INITIAL_STATE: JsonFormatState = ('', '', 'value')
+
+
+class JsonFormatError(ValueError):
+    def __init__(self, message: str, offset: int) -> None:
+        super().__init__(message, offset)
+        self.message = message
+        self.offset = offset
+
+
+def format_json_chunk(
+    text: str, state: JsonFormatState, indent: Optional[int], is_final: bool
+) -> tuple[str, JsonFormatState, int]:
+    """
+    Re-indents the tokens of a chunk of JSON, or minifies them when `indent`
+    is None. The grammar is checked but the values are not parsed, so
+    numbers, strings and duplicated keys are kept as they are. Returns the
+    formatted text, the state for the next chunk and the number of
+    characters consumed, the rest is a token cut by the end of the chunk
+    """
+    brackets, pending_bracket, expected = state
+    output = []
+    append = output.append
+    line_breaks = {}
+
+    def append_line_break() -> None:
+        if indent is None:
+            return
+        depth = len(brackets)
+        if depth not in line_breaks:
+            line_breaks[depth] = '\n' + ' ' * (indent * depth)
+        append(line_breaks[depth])
+
+    for match in JSON_TOKEN_PATTERN.finditer(text):
+        kind = match.lastgroup
+        token = match.group()
+        if not is_final and (
+            kind == 'invalid'
+            and token == '"'
+            or kind == 'scalar'
+            and match.end() == len(text)
+        ):
+            return (
+                ''.join(output),
+                (brackets, pending_bracket, expected),
+                match.start(),
+            )
+        if kind == 'space':
+            continue
+
+        # Only the tokens the grammar allows here, so the tokens of an
+        # invalid document are not joined into a different one
+        if token == ']' or token == '}':
+            is_expected = expected == 'next' or (
+                pending_bracket != ''
+                and JSON_CLOSING_BRACKETS[pending_bracket] == token
+            )
+        elif token == ',':
+            is_expected = expected == 'next' and brackets != ''
+        elif token == ':':
+            is_expected = expected == 'colon'
+        elif expected == 'key':
+            is_expected = kind == 'string'
+        else:
+            is_expected = expected == 'value'
+        if (
+            not is_expected
+            or kind == 'invalid'
+            or (kind == 'scalar' and not JSON_SCALAR_PATTERN.fullmatch(token))
+        ):
+            raise JsonFormatError(
+                message=f'Unexpected `{token}`', offset=match.start()
+            )
+        if kind == 'string' and not JSON_STRING_PATTERN.fullmatch(token):
+            raise JsonFormatError(
+                message='Invalid escape or control character in a string',
+                offset=match.start(),
+            )
+
+        if pending_bracket:
+            if token == JSON_CLOSING_BRACKETS[pending_bracket]:
+                append(pending_bracket + token)
+                pending_bracket = ''
+                expected = 'next'
+                continue
+            append(pending_bracket)
+            brackets += pending_bracket
+            pending_bracket = ''
+            append_line_break()
+
+        if token == '[' or token == '{':
+            # Written with the next token, empty arrays and objects stay on
+            # one line
+            pending_bracket = token
+            expected = 'value' if token == '[' else 'key'
+        elif token == ']' or token == '}':
+            if not brackets or JSON_CLOSING_BRACKETS[brackets[-1]] != token:
+                raise JsonFormatError(
+                    message=f'Unexpected `{token}`', offset=match.start()
+                )
+            brackets = brackets[:-1]
+            append_line_break()
+            append(token)
+            expected = 'next'
+        elif token == ',':
+            append(token)
+            append_line_break()
+            expected = 'key' if brackets[-1] == '{' else 'value'
+        elif token == ':':
+            append(': ' if indent is not None else ':')
+            expected = 'value'
+        else:
+            append(token)
+            expected = 'colon' if expected == 'key' else 'next'
+
+    if is_final and (brackets or pending_bracket or expected != 'next'):
+        raise JsonFormatError(
+            message='Unexpected end of the document', offset=len(text)
+        )
+    return ''.join(output), (brackets, pending_bracket, expected), len(text)
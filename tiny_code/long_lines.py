@@ -0,0 +1,217 @@
+from bisect import bisect_right
+from collections import defaultdict
+from typing import Optional, Sequence
+import re
+
+from rich.cells import cell_len
+from textual._cells import cell_width_to_column_index
+from textual.expand_tabs import expand_tabs_inline
+from textual.widgets._text_area import build_byte_to_codepoint_dict
+
+from tiny_code.consts import LONG_LINE_CHUNK_SIZE
+
+BRACKETS_PATTERN = re.compile(r'[()\[\]{}]')
+OPENING_BRACKETS = {'(': ')', '[': ']', '{': '}'}
+CLOSING_BRACKETS = {')': '(', ']': '[', '}': '{'}
+
+# Syntax highlight: (start, end or None for the end of the line, name)
+Highlight = tuple[int, Optional[int], str]
+
+
+def get_cell_width(text: str, start_cell: int, tab_size: int) -> int:
+    """
+    Cell width of `text` drawn from `start_cell`, which decides where its
+    tabs stop
+    """
+    if '\t' not in text:
+        return cell_len(text)
+    padding = start_cell % tab_size
+    return (
+        cell_len(expand_tabs_inline(' ' * padding + text, tab_size)) - padding
+    )
+
+
+class LongLineIndex:
+    """
+    Cell and utf-8 byte offsets of a long line every `LONG_LINE_CHUNK_SIZE`
+    characters, so columns, cells and bytes are converted from the nearest
+    chunk instead of from the start of the line
+    """
+
+    def __init__(self, line: str, tab_size: int) -> None:
+        self.line = line
+        self.tab_size = tab_size
+        self.is_ascii = line.isascii()
+        self.cell_offsets = [0]
+        self.byte_offsets = [0]
+        for start in range(0, len(line), LONG_LINE_CHUNK_SIZE):
+            chunk = line[start : start + LONG_LINE_CHUNK_SIZE]
+            self.cell_offsets.append(
+                self.cell_offsets[-1]
+                + get_cell_width(
+                    text=chunk,
+                    start_cell=self.cell_offsets[-1],
+                    tab_size=tab_size,
+                )
+            )
+            self.byte_offsets.append(
+                self.byte_offsets[-1]
+                + (len(chunk) if self.is_ascii else len(chunk.encode('utf-8')))
+            )
+        self.highlights: Optional[Sequence[Highlight]] = None
+        self.highlight_buckets: dict[int, list[Highlight]] = {}
+
+    def column_to_cell(self, column: int) -> int:
+        chunk_index = min(
+            column // LONG_LINE_CHUNK_SIZE, len(self.cell_offsets) - 1
+        )
+        start_cell = self.cell_offsets[chunk_index]
+        return start_cell + get_cell_width(
+            text=self.line[chunk_index * LONG_LINE_CHUNK_SIZE : column],
+            start_cell=start_cell,
+            tab_size=self.tab_size,
+        )
+
+    def cell_to_column(self, cell: int) -> int:
+        chunk_index = max(bisect_right(self.cell_offsets, cell) - 1, 0)
+        if chunk_index >= len(self.cell_offsets) - 1:
+            return len(self.line)
+        start = chunk_index * LONG_LINE_CHUNK_SIZE
+        start_cell = self.cell_offsets[chunk_index]
+        padding = start_cell % self.tab_size
+        column = cell_width_to_column_index(
+            ' ' * padding + self.line[start : start + LONG_LINE_CHUNK_SIZE],
+            cell - start_cell + padding,
+            self.tab_size,
+        )
+        return start + column - padding
+
+    def get_window(
+        self, start_cell: int, end_cell: int
+    ) -> tuple[int, int, int]:
+        """
+        Columns of the chunks drawn between `start_cell` and `end_cell`, and
+        the cell where the first of them starts
+        """
+        first_chunk = max(bisect_right(self.cell_offsets, start_cell) - 1, 0)
+        last_chunk = bisect_right(self.cell_offsets, end_cell)
+        return (
+            min(first_chunk * LONG_LINE_CHUNK_SIZE, len(self.line)),
+            min(last_chunk * LONG_LINE_CHUNK_SIZE, len(self.line)),
+            self.cell_offsets[min(first_chunk, len(self.cell_offsets) - 1)],
+        )
+
+    def bucket_highlights(self, highlights: Sequence[Highlight]) -> None:
+        self.highlights = highlights
+        self.highlight_buckets = defaultdict(list)
+        last_chunk = len(self.byte_offsets) - 2
+        for highlight in highlights:
+            start, end, _ = highlight
+            first_chunk = bisect_right(self.byte_offsets, start) - 1
+            if end is None:
+                end_chunk = last_chunk
+            else:
+                end_chunk = bisect_right(
+                    self.byte_offsets, max(end - 1, start)
+                )
+                end_chunk -= 1
+            for chunk_index in range(
+                max(first_chunk, 0), min(end_chunk, last_chunk) + 1
+            ):
+                self.highlight_buckets[chunk_index].append(highlight)
+
+    def get_highlights(
+        self,
+        highlights: Sequence[Highlight],
+        start_column: int,
+        end_column: int,
+    ) -> list[tuple[int, int, str]]:
+        """
+        Highlights of the chunks between `start_column` and `end_column`, with
+        columns instead of utf-8 byte offsets. `start_column` must be the
+        start of a chunk
+        """
+        if highlights is not self.highlights:
+            self.bucket_highlights(highlights=highlights)
+        if end_column <= start_column:
+            return []
+        first_chunk = start_column // LONG_LINE_CHUNK_SIZE
+        last_chunk = (end_column - 1) // LONG_LINE_CHUNK_SIZE
+        window_highlights = dict.fromkeys(
+            highlight
+            for chunk_index in range(first_chunk, last_chunk + 1)
+            for highlight in self.highlight_buckets.get(chunk_index, ())
+        )
+        if not window_highlights:
+            return []
+
+        start_byte = self.byte_offsets[first_chunk]
+        end_byte = self.byte_offsets[last_chunk + 1]
+        if self.is_ascii:
+            byte_to_column = None
+        else:
+            byte_to_column = build_byte_to_codepoint_dict(
+                self.line[start_column:end_column].encode('utf-8')
+            )
+
+        def to_column(byte_offset: int) -> int:
+            byte_offset = min(max(byte_offset, start_byte), end_byte)
+            if byte_to_column is None:
+                return byte_offset
+            return start_column + byte_to_column.get(
+                byte_offset - start_byte, end_column - start_column
+            )
+
+        return [
+            (
+                to_column(byte_offset=start),
+                to_column(byte_offset=end_byte if end is None else end),
+                name,
+            )
+            for start, end, name in window_highlights
+        ]
+
+    def find_matching_bracket(
+        self, column: int, max_distance: int
+    ) -> Optional[int]:
+        """
+        Column of the bracket matching the one at `column`, searched in this
+        line only and at most `max_distance` characters away
+        """
+        bracket = self.line[column : column + 1]
+        if bracket in OPENING_BRACKETS:
+            candidates = BRACKETS_PATTERN.finditer(
+                self.line, column, column + max_distance
+            )
+            opening_brackets, closing_brackets = (
+                OPENING_BRACKETS,
+                CLOSING_BRACKETS,
+            )
+        elif bracket in CLOSING_BRACKETS:
+            candidates = reversed(
+                list(
+                    BRACKETS_PATTERN.finditer(
+                        self.line, max(column - max_distance, 0), column + 1
+                    )
+                )
+            )
+            opening_brackets, closing_brackets = (
+                CLOSING_BRACKETS,
+                OPENING_BRACKETS,
+            )
+        else:
+            return None
+
+        bracket_stack = []
+        for match in candidates:
+            candidate = match.group()
+            if candidate in opening_brackets:
+                bracket_stack.append(candidate)
+            elif (
+                bracket_stack
+                and bracket_stack[-1] == closing_brackets[candidate]
+            ):
+                bracket_stack.pop()
+                if not bracket_stack:
+                    return match.start()
+        return None
@@ -1,4 +1,17 @@
-from textual import on
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    BrokenExecutor,
+    ProcessPoolExecutor,
+    wait,
+)
+from dataclasses import replace
+import os
+import re
+import sqlite3
+import time
+
+from rich.text import Text
+from textual import on, work
 from textual.app import ComposeResult
 from textual.containers import Horizontal, ScrollableContainer
 from textual.screen import ModalScreen
@@ -12,12 +25,39 @@ from textual.widgets import (
     RadioButton,
     Input,
     Markdown,
+    OptionList,
+    ProgressBar,
+    SelectionList,
 )
+from textual.worker import get_current_worker
 
 from tiny_code.config import ConfigManager
-from tiny_code.consts import TEXT_AREA_COLOR_THEMES
-from tiny_code.entities import Config
-from typing import Optional, Literal
+from tiny_code.consts import (
+    FILE_OPERATION_PROGRESS_INTERVAL,
+    GO_TO_MAX_RESULTS,
+    SEARCH_FILES_PER_TASK,
+    SEARCH_MAX_RESULTS,
+    TEXT_AREA_COLOR_THEMES,
+)
+from tiny_code.entities import FileSnapshot
+from tiny_code.file_operations import (
+    FileOperationCancelled,
+    copy_path,
+    get_total_size,
+    move_path,
+)
+from tiny_code.outline import format_symbol
+from tiny_code.workspace_index import WorkspaceSymbol
+from tiny_code.utils import create_process_pool
+from tiny_code.search import (
+    SearchResult,
+    compile_pattern,
+    replace_in_files,
+    replace_text,
+    search_files,
+    search_text,
+)
+from typing import Callable, Iterator, Optional, Literal, Union
 
 
 class HelpScreen(ModalScreen):
@@ -28,9 +68,24 @@ class HelpScreen(ModalScreen):
 - **f1**        => *Get help*
 - **f12**       => *Set configs*
 - **ctrl+b**    => *Show/Hide sidebar file manager*
+- **ctrl+t**    => *Follow/Unfollow the open file (like `tail -f`)*
+- **f9**        => *Start/Stop the profiler (saved in `~/.cache/tiny-code/profiles`)*
+- **ctrl+f**    => *Show/Hide the find bar of the open file*
+- **f3**        => *Go to the next match (shift+f3 for the previous one)*
+- **ctrl+r**    => *Find & replace in all files*
+- **ctrl+o**    => *Show/Hide the outline of the open file*
+- **ctrl+g**    => *Go to a line number or a symbol of the open file (a row number in tables)*
+- **f4**        => *Show a CSV/TSV file as a table or as text*
+- **ctrl+backslash** => *Split/Unsplit the view of the open file, both views edit the same document*
+- **ctrl+p**    => *Go to the definition of a name in all files*
+- **ctrl+pagedown** => *Open the next file given in the command line (ctrl+pageup for the previous one)*
 ### In file manager
 - **delete**    => *Delete a file or directory*
 - **insert**    => *Create a file or directory*
+- **f2**        => *Rename a file or directory*
+- **f5**        => *Copy a file or directory*
+- **f6**        => *Move a file or directory*
+- **f7**        => *Show/Hide the disk usage of the directories*
 ### In code editor
 - **ctrl+z**    => *Undo changes*
 - **ctrl+y**    => *Redo changes*
@@ -40,6 +95,7 @@ class HelpScreen(ModalScreen):
 - **ctrl+v**    => *Paste line/lines from clipboard*
 - **ctrl+s**    => *Save file*
 - **ctrl+/**    => *Comment/Uncomment line/lines*
+- **f8**        => *Format the JSON file, press again to cancel (shift+f8 to minify it)*
 - **tab**       => *Tab line/lines*
 - **shift+tab** => *Untab line/lines*
 """
@@ -93,6 +149,11 @@ class ConfigsScreen(ModalScreen):
                     id='input-tab-size',
                     classes='col-9',
                 )
+            with Horizontal(classes='row mt-1'):
+                yield Label('Show ignored files?', classes='col-3 mt-1')
+                yield Switch(
+                    False, id='input-show-ignored-files', classes='col-2'
+                )
             with Horizontal(classes='row align-left-bottom mt-1'):
                 yield Button(
                     'Cancel',
@@ -115,6 +176,9 @@ class ConfigsScreen(ModalScreen):
         self.input_break_lines = self.query_one(selector='#input-break-lines')
         self.input_theme = self.query_one(selector='#input-theme')
         self.input_tab_size = self.query_one(selector='#input-tab-size')
+        self.input_show_ignored_files = self.query_one(
+            selector='#input-show-ignored-files'
+        )
 
         current_config = ConfigManager.get()
         self.input_dark_mode.value = current_config.dark_mode
@@ -122,16 +186,20 @@ class ConfigsScreen(ModalScreen):
         self.input_break_lines.value = current_config.break_lines
         self.input_theme.value = current_config.theme
         self.input_tab_size.value = current_config.tab_size
+        self.input_show_ignored_files.value = current_config.show_ignored_files
 
     @on(Button.Pressed, '#confirm')
     def confirm(self) -> None:
+        current_config = ConfigManager.get()
         ConfigManager.set(
-            config=Config(
+            config=replace(
+                current_config,
                 dark_mode=self.input_dark_mode.value,
                 show_line_numbers=self.input_show_line_numbers.value,
                 break_lines=self.input_break_lines.value,
                 theme=self.input_theme.value,
                 tab_size=self.input_tab_size.value,
+                show_ignored_files=self.input_show_ignored_files.value,
             )
         )
         self.app.dark = self.input_dark_mode.value
@@ -141,6 +209,15 @@ class ConfigsScreen(ModalScreen):
         self.app.text_area.soft_wrap = self.input_break_lines.value
         self.app.text_area.theme = self.input_theme.value
         self.app.text_area.tab_size = self.input_tab_size.value
+        self.app.split_text_area.copy_settings(source=self.app.text_area)
+        if (
+            self.app.dir_tree.show_ignored_files
+            != self.input_show_ignored_files.value
+        ):
+            self.app.dir_tree.show_ignored_files = (
+                self.input_show_ignored_files.value
+            )
+            self.app.dir_tree.reload()
         self.app.pop_screen()
         self.app.modal_screen_active = False
 
@@ -257,3 +334,1004 @@ class CreateFileOrDirScreen(ModalScreen):
     def cancel(self) -> None:
         self.app.pop_screen()
         self.app.modal_screen_active = False
+
+
+class FileOperationScreen(ModalScreen):
+    """
+    Copies, moves or renames a file or directory in a worker, showing the
+    progress of the copies. A cancelled copy is removed
+    """
+
+    OPERATIONS_PAST_MAP = {
+        'copy': 'copied',
+        'move': 'moved',
+        'rename': 'renamed',
+    }
+
+    def __init__(
+        self, path: Path, operation: Literal['copy', 'move', 'rename']
+    ) -> None:
+        super().__init__()
+        self.path = path
+        self.operation = operation
+        self.operation_running = False
+
+    def get_default_destination(self) -> str:
+        if self.operation != 'copy':
+            return self.path.name
+        if self.path.is_dir():
+            return f'{self.path.name} copy'
+        return f'{self.path.stem} copy{self.path.suffix}'
+
+    def compose(self) -> ComposeResult:
+        with ScrollableContainer(classes='modal'):
+            with Horizontal(classes='row'):
+                yield Label(
+                    f'{self.operation.capitalize()} `{self.path.name}` to:',
+                    classes='col-12',
+                )
+            with Horizontal(classes='row mt-1'):
+                yield Label(
+                    'Name: ' if self.operation == 'rename' else 'Path: ',
+                    classes='col-3 mt-1',
+                )
+                yield Input(
+                    value=self.get_default_destination(),
+                    id='input-destination',
+                    classes='col-9',
+                )
+            with Horizontal(classes='row mt-1'):
+                yield ProgressBar(
+                    id='file-operation-progress',
+                    show_eta=True,
+                    classes='col-12',
+                )
+            with Horizontal(classes='row mt-1'):
+                yield Label('', id='file-operation-status', classes='col-12')
+            with Horizontal(classes='row align-left-bottom mt-1'):
+                yield Button(
+                    'Cancel',
+                    variant='error',
+                    id='cancel',
+                    classes='col-3 me-1',
+                )
+                yield Button(
+                    'Confirm',
+                    variant='success',
+                    id='confirm',
+                    classes=' col-3 ms-1',
+                )
+
+    def on_mount(self) -> None:
+        self.input_destination = self.query_one(selector='#input-destination')
+        self.file_operation_progress = self.query_one(
+            selector='#file-operation-progress'
+        )
+        self.file_operation_status = self.query_one(
+            selector='#file-operation-status'
+        )
+        self.confirm_button = self.query_one(selector='#confirm')
+        self.input_destination.focus()
+
+    def get_destination(self) -> Optional[Path]:
+        destination_name = self.input_destination.value.strip()
+        if destination_name == '':
+            self.notify(
+                title='❌',
+                message='Name can not be empty.',
+                severity='error',
+                timeout=4,
+            )
+            return None
+        if self.operation == 'rename' and os.sep in destination_name:
+            self.notify(
+                title='❌',
+                message=f'Name can not contain `{os.sep}`.',
+                severity='error',
+                timeout=4,
+            )
+            return None
+        destination = Path(
+            os.path.normpath(self.path.parent.joinpath(destination_name))
+        )
+        # Like `cp` and `mv`, an existing directory receives the source
+        if self.operation != 'rename' and destination.is_dir():
+            destination = destination.joinpath(self.path.name)
+        if destination == self.path:
+            self.notify(
+                title='❌',
+                message='The destination is the source.',
+                severity='error',
+                timeout=4,
+            )
+            return None
+        return destination
+
+    @on(Input.Submitted, '#input-destination')
+    @on(Button.Pressed, '#confirm')
+    def confirm(self) -> None:
+        if self.operation_running:
+            return
+        destination = self.get_destination()
+        if destination is None:
+            self.app.bell()
+            return
+        self.operation_running = True
+        self.input_destination.disabled = True
+        self.confirm_button.disabled = True
+        self.file_operation_progress.styles.display = 'block'
+        self.file_operation_status.update(
+            f'{self.operation.capitalize()} to `{str(destination)}`...'
+        )
+        self.run_file_operation(destination=destination)
+
+    @work(
+        thread=True,
+        exclusive=True,
+        group='file-operation',
+        exit_on_error=False,
+    )
+    def run_file_operation(self, destination: Path) -> None:
+        worker = get_current_worker()
+        start_time = time.perf_counter()
+        total_size: Optional[int] = None
+        copied_size = 0
+        last_update_time = 0.0
+
+        def on_progress(size: int) -> None:
+            nonlocal total_size, copied_size, last_update_time
+            # Moves only copy across filesystems, the size is not computed
+            # for the renames
+            if total_size is None:
+                total_size = get_total_size(path=self.path)
+            copied_size += size
+            now = time.perf_counter()
+            if now - last_update_time >= FILE_OPERATION_PROGRESS_INTERVAL:
+                last_update_time = now
+                self.app.call_from_thread(
+                    self.file_operation_progress.update,
+                    total=total_size,
+                    progress=copied_size,
+                )
+
+        try:
+            if self.operation == 'copy':
+                copy_path(
+                    source=self.path,
+                    destination=destination,
+                    on_progress=on_progress,
+                    is_cancelled=lambda: worker.is_cancelled,
+                )
+            else:
+                move_path(
+                    source=self.path,
+                    destination=destination,
+                    on_progress=on_progress,
+                    is_cancelled=lambda: worker.is_cancelled,
+                )
+        except FileOperationCancelled:
+            return
+        except OSError as error:
+            self.app.call_from_thread(self.fail_file_operation, error)
+            return
+        self.app.call_from_thread(
+            self.finish_file_operation,
+            destination=destination,
+            copied_size=copied_size,
+            elapsed=time.perf_counter() - start_time,
+        )
+
+    def fail_file_operation(self, error: OSError) -> None:
+        self.notify(
+            title='❌',
+            message=f'Fail to {self.operation} `{str(self.path)}` | '
+            f'{str(error)}.',
+            severity='error',
+            timeout=10,
+        )
+        self.app.bell()
+        self.operation_running = False
+        self.input_destination.disabled = False
+        self.confirm_button.disabled = False
+        self.file_operation_status.update('')
+        self.input_destination.focus()
+
+    def finish_file_operation(
+        self, destination: Path, copied_size: int, elapsed: float
+    ) -> None:
+        self.app.pop_screen()
+        self.app.modal_screen_active = False
+        self.app.finish_file_operation(
+            source=self.path, destination=destination, operation=self.operation
+        )
+        message = (
+            f'`{self.path.name}` {self.OPERATIONS_PAST_MAP[self.operation]} '
+            f'to `{str(destination)}`'
+        )
+        if copied_size:
+            message += (
+                f', {copied_size / 1024 / 1024:.1f} MiB in {elapsed:.2f}s'
+            )
+        self.app.notify(title='✅', message=f'{message}.', timeout=10)
+
+    @on(Button.Pressed, '#cancel')
+    def cancel(self) -> None:
+        # The worker removes what was copied when it sees the cancellation
+        self.workers.cancel_group(self, 'file-operation')
+        self.app.pop_screen()
+        self.app.modal_screen_active = False
+
+
+class FileChangedScreen(ModalScreen):
+    def __init__(
+        self,
+        file_path: Path,
+        disk_snapshot: FileSnapshot,
+        content: Optional[Union[str, bytes]],
+    ) -> None:
+        super().__init__()
+        self.file_path = file_path
+        self.disk_snapshot = disk_snapshot
+        self.content = content
+
+    def compose(self) -> ComposeResult:
+        with ScrollableContainer(classes='modal'):
+            with Horizontal(classes='row'):
+                yield Label(
+                    f'`{self.file_path.name}` was changed on disk since it '
+                    'was opened.',
+                    classes='col-12 mt-1',
+                )
+            with Horizontal(classes='row align-left-bottom mt-1'):
+                yield Button(
+                    'Reload',
+                    variant='primary',
+                    id='reload',
+                    classes='col-3 me-1',
+                )
+                yield Button(
+                    'Merge',
+                    variant='success',
+                    id='merge',
+                    classes='col-3 me-1',
+                )
+                if self.content is not None:
+                    yield Button(
+                        'Overwrite',
+                        variant='warning',
+                        id='overwrite',
+                        classes='col-3 me-1',
+                    )
+                yield Button(
+                    'Cancel',
+                    variant='error',
+                    id='cancel',
+                    classes='col-3',
+                )
+
+    @on(Button.Pressed, '#reload')
+    def reload(self) -> None:
+        self.app.pop_screen()
+        self.app.modal_screen_active = False
+        self.app.reload_file_selected()
+
+    @on(Button.Pressed, '#merge')
+    def merge(self) -> None:
+        self.app.pop_screen()
+        self.app.modal_screen_active = False
+        self.app.merge_file_selected()
+
+    @on(Button.Pressed, '#overwrite')
+    def overwrite(self) -> None:
+        self.app.pop_screen()
+        self.app.modal_screen_active = False
+        self.app.save_file(content=self.content)
+
+    @on(Button.Pressed, '#cancel')
+    def cancel(self) -> None:
+        self.app.file_dismissed_snapshot = self.disk_snapshot
+        self.app.pop_screen()
+        self.app.modal_screen_active = False
+
+
+class FindReplaceScreen(ModalScreen):
+    """
+    Searches every file of the workspace in worker processes, listing the
+    matches as they are found, and replaces them in the selected files. The
+    file open in the editor is searched and replaced in its buffer, so its
+    unsaved changes and undo history are kept
+    """
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.executor: Optional[ProcessPoolExecutor] = None
+        self.search_id: int = 0
+        self.search_query: Optional[tuple[str, bool, bool]] = None
+        self.search_results: dict[str, SearchResult] = {}
+
+    def compose(self) -> ComposeResult:
+        with ScrollableContainer(classes='modal'):
+            with Horizontal(classes='row'):
+                yield Label('Find:', classes='col-3 mt-1')
+                yield Input(id='input-find', classes='col-9')
+            with Horizontal(classes='row mt-1'):
+                yield Label('Replace:', classes='col-3 mt-1')
+                yield Input(id='input-replace', classes='col-9')
+            with Horizontal(classes='row mt-1'):
+                yield Label('Regex?', classes='col-3 mt-1')
+                yield Switch(False, id='input-regex', classes='col-2')
+                yield Label('Match case?', classes='col-3 mt-1 ms-1')
+                yield Switch(False, id='input-match-case', classes='col-2')
+            with Horizontal(classes='row mt-1'):
+                yield SelectionList(id='search-results', classes='col-12')
+            with Horizontal(classes='row mt-1'):
+                yield Label('', id='search-status', classes='col-12')
+            with Horizontal(classes='row align-left-bottom mt-1'):
+                yield Button(
+                    'Cancel',
+                    variant='error',
+                    id='cancel',
+                    classes='col-3 me-1',
+                )
+                yield Button(
+                    'Search',
+                    variant='primary',
+                    id='search',
+                    classes='col-3 me-1',
+                )
+                yield Button(
+                    'Replace',
+                    variant='success',
+                    id='replace',
+                    classes='col-3',
+                )
+
+    def on_mount(self) -> None:
+        self.input_find = self.query_one(selector='#input-find')
+        self.input_replace = self.query_one(selector='#input-replace')
+        self.input_regex = self.query_one(selector='#input-regex')
+        self.input_match_case = self.query_one(selector='#input-match-case')
+        self.search_results_list = self.query_one(selector='#search-results')
+        self.search_status = self.query_one(selector='#search-status')
+        self.input_find.focus()
+
+    def on_unmount(self) -> None:
+        self.workers.cancel_group(self, 'find-replace')
+        if self.executor is not None:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+
+    def get_executor(self) -> ProcessPoolExecutor:
+        if self.executor is None:
+            self.executor = create_process_pool()
+        return self.executor
+
+    def get_open_file(self) -> Optional[Path]:
+        if self.app.file_selected is None or self.app.file_loading:
+            return None
+        return self.app.file_selected
+
+    def fail_files_task(
+        self, search_id: int, action: str, error: Exception
+    ) -> None:
+        # A crashed worker process breaks the pool, the next task starts a
+        # new one
+        if isinstance(error, BrokenExecutor) and self.executor is not None:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            self.executor = None
+        if search_id != self.search_id:
+            return
+        self.search_status.update(f'Fail to {action} the files.')
+        self.notify(
+            title='❌',
+            message=f'Fail to {action} the files | {str(error)}.',
+            severity='error',
+            timeout=10,
+        )
+        self.app.bell()
+
+    def walk_files(
+        self, is_cancelled: Callable[[], bool]
+    ) -> Iterator[list[str]]:
+        dir_tree = self.app.dir_tree
+        if dir_tree.show_ignored_files:
+            for dir_path, dir_names, file_names in os.walk(self.app.dir_path):
+                if is_cancelled():
+                    return
+                dir_names[:] = [name for name in dir_names if name != '.git']
+                yield [
+                    os.path.join(dir_path, file_name)
+                    for file_name in file_names
+                ]
+            return
+        for dir_path, _, file_names in dir_tree.ignore_matcher.walk(
+            top_path=self.app.dir_path, is_cancelled=is_cancelled
+        ):
+            yield [
+                os.path.join(dir_path, file_name) for file_name in file_names
+            ]
+
+    @on(Input.Submitted, '#input-find')
+    @on(Button.Pressed, '#search')
+    def search(self) -> None:
+        query = self.input_find.value
+        if query == '':
+            self.notify(
+                title='❌',
+                message='Search can not be empty.',
+                severity='error',
+                timeout=4,
+            )
+            self.app.bell()
+            return
+        try:
+            pattern = compile_pattern(
+                query=query,
+                is_regex=self.input_regex.value,
+                case_sensitive=self.input_match_case.value,
+            )
+        except re.error as error:
+            self.notify(
+                title='❌',
+                message=f'Invalid regex | {str(error)}.',
+                severity='error',
+                timeout=10,
+            )
+            self.app.bell()
+            return
+
+        self.search_id += 1
+        self.search_query = (
+            query,
+            self.input_regex.value,
+            self.input_match_case.value,
+        )
+        self.search_results = {}
+        self.search_results_list.clear_options()
+        self.search_status.update('Searching...')
+
+        open_file = self.get_open_file()
+        if open_file is not None:
+            match_count, preview_lines = search_text(
+                text=self.app.text_area.text, pattern=pattern
+            )
+            if match_count:
+                self.add_search_results(
+                    search_id=self.search_id,
+                    search_results=[
+                        (str(open_file), 0, 0, match_count, preview_lines)
+                    ],
+                    status=None,
+                )
+        self.search_files(search_id=self.search_id, open_file=open_file)
+
+    @work(
+        thread=True, exclusive=True, group='find-replace', exit_on_error=False
+    )
+    def search_files(self, search_id: int, open_file: Optional[Path]) -> None:
+        worker = get_current_worker()
+        query, is_regex, case_sensitive = self.search_query
+        start_time = time.perf_counter()
+        searched_count = 0
+        match_count = 0
+        futures = {}
+
+        def collect(timeout: Optional[float]) -> bool:
+            nonlocal searched_count, match_count
+            done, _ = wait(
+                futures, timeout=timeout, return_when=FIRST_COMPLETED
+            )
+            search_results = []
+            for future in done:
+                searched_count += futures.pop(future)
+                search_results.extend(future.result())
+            if not done or worker.is_cancelled:
+                return not worker.is_cancelled
+            match_count += sum(
+                search_result[3] for search_result in search_results
+            )
+            elapsed = time.perf_counter() - start_time
+            self.app.call_from_thread(
+                self.add_search_results,
+                search_id=search_id,
+                search_results=search_results,
+                status=f'{match_count} matches, {searched_count} files '
+                f'searched ({searched_count / elapsed:.0f} files/s)...',
+            )
+            return True
+
+        batch = []
+        open_file_path = None if open_file is None else str(open_file)
+        try:
+            executor = self.get_executor()
+            for file_paths in self.walk_files(
+                is_cancelled=lambda: worker.is_cancelled
+            ):
+                batch.extend(
+                    file_path
+                    for file_path in file_paths
+                    if file_path != open_file_path
+                )
+                while len(batch) >= SEARCH_FILES_PER_TASK:
+                    futures[
+                        executor.submit(
+                            search_files,
+                            file_paths=batch[:SEARCH_FILES_PER_TASK],
+                            query=query,
+                            is_regex=is_regex,
+                            case_sensitive=case_sensitive,
+                        )
+                    ] = SEARCH_FILES_PER_TASK
+                    del batch[:SEARCH_FILES_PER_TASK]
+                    if not collect(timeout=0):
+                        return
+            if batch:
+                futures[
+                    executor.submit(
+                        search_files,
+                        file_paths=batch,
+                        query=query,
+                        is_regex=is_regex,
+                        case_sensitive=case_sensitive,
+                    )
+                ] = len(batch)
+            while futures:
+                if not collect(timeout=None):
+                    return
+        except Exception as error:
+            self.app.call_from_thread(
+                self.fail_files_task,
+                search_id=search_id,
+                action='search',
+                error=error,
+            )
+            return
+        finally:
+            for future in futures:
+                future.cancel()
+
+        elapsed = time.perf_counter() - start_time
+        self.app.call_from_thread(
+            self.add_search_results,
+            search_id=search_id,
+            search_results=[],
+            status=f'{match_count} matches, {searched_count} files searched '
+            f'in {elapsed:.2f}s ({searched_count / elapsed:.0f} files/s).',
+        )
+
+    def add_search_results(
+        self,
+        search_id: int,
+        search_results: list[SearchResult],
+        status: Optional[str],
+    ) -> None:
+        if search_id != self.search_id:
+            return
+        query, is_regex, case_sensitive = self.search_query
+        pattern = compile_pattern(
+            query=query, is_regex=is_regex, case_sensitive=case_sensitive
+        )
+        options = []
+        for search_result in search_results:
+            file_path, _, _, match_count, preview_lines = search_result
+            if len(self.search_results) >= SEARCH_MAX_RESULTS:
+                break
+            self.search_results[file_path] = search_result
+            prompt = Text(
+                f'{os.path.relpath(file_path, self.app.dir_path)} '
+                f'({match_count})',
+                style='bold',
+            )
+            for line_number, line in preview_lines:
+                preview = Text(f'\n  {line_number + 1}: {line.strip()}')
+                preview.highlight_regex(pattern, style='reverse')
+                prompt.append_text(preview)
+            options.append((prompt, file_path, True))
+        if options:
+            self.search_results_list.add_options(options)
+        if status is not None:
+            if len(self.search_results) >= SEARCH_MAX_RESULTS:
+                status += f' Showing the first {SEARCH_MAX_RESULTS} files.'
+            self.search_status.update(status)
+
+    @on(Button.Pressed, '#replace')
+    def replace(self) -> None:
+        selected_paths = self.search_results_list.selected
+        if self.search_query is None or not selected_paths:
+            self.notify(
+                title='❌',
+                message='Search and select the files to replace first.',
+                severity='error',
+                timeout=4,
+            )
+            self.app.bell()
+            return
+
+        query, is_regex, case_sensitive = self.search_query
+        replacement = self.input_replace.value
+        files = []
+        buffer_replacement_count = 0
+        open_file = self.get_open_file()
+        # Replacing it on disk would be undone by saving the buffer it is
+        # loaded in
+        loading_file = (
+            str(self.app.file_selected) if self.app.file_loading else None
+        )
+        for file_path in selected_paths:
+            if file_path == loading_file:
+                self.notify(
+                    title='⚠️',
+                    message=f'`{file_path}` is loading, it was not replaced.',
+                    severity='warning',
+                    timeout=10,
+                )
+                continue
+            if open_file is not None and file_path == str(open_file):
+                try:
+                    buffer_replacement_count = self.replace_in_buffer(
+                        pattern=compile_pattern(
+                            query=query,
+                            is_regex=is_regex,
+                            case_sensitive=case_sensitive,
+                        ),
+                        replacement=replacement,
+                        is_regex=is_regex,
+                    )
+                except re.error as error:
+                    self.notify(
+                        title='❌',
+                        message=f'Invalid replacement | {str(error)}.',
+                        severity='error',
+                        timeout=10,
+                    )
+                    self.app.bell()
+                    return
+                continue
+            _, mtime_ns, size, _, _ = self.search_results[file_path]
+            files.append((file_path, mtime_ns, size))
+
+        self.search_id += 1
+        self.search_results = {}
+        self.search_results_list.clear_options()
+        self.search_status.update('Replacing...')
+        self.replace_files(
+            search_id=self.search_id,
+            files=files,
+            replacement=replacement,
+            buffer_replacement_count=buffer_replacement_count,
+        )
+
+    def replace_in_buffer(
+        self, pattern: re.Pattern, replacement: str, is_regex: bool
+    ) -> int:
+        """
+        Replaces the matches as a single edit spanning from the first to the
+        last one, so it is undone in one step
+        """
+        text_area = self.app.text_area
+        text = text_area.text
+        matches = list(pattern.finditer(text))
+        if not matches:
+            return 0
+        new_text, replacement_count = replace_text(
+            text=text,
+            pattern=pattern,
+            replacement=replacement,
+            is_regex=is_regex,
+        )
+        start_offset = matches[0].start()
+        end_offset = matches[-1].end()
+
+        def get_location(offset: int) -> tuple[int, int]:
+            row = text.count('\n', 0, offset)
+            return row, offset - text.rfind('\n', 0, offset) - 1
+
+        text_area.replace(
+            new_text[start_offset : len(new_text) - len(text) + end_offset],
+            start=get_location(start_offset),
+            end=get_location(end_offset),
+            maintain_selection_offset=False,
+        )
+        return replacement_count
+
+    @work(
+        thread=True, exclusive=True, group='find-replace', exit_on_error=False
+    )
+    def replace_files(
+        self,
+        search_id: int,
+        files: list[tuple[str, int, int]],
+        replacement: str,
+        buffer_replacement_count: int,
+    ) -> None:
+        worker = get_current_worker()
+        query, is_regex, case_sensitive = self.search_query
+        start_time = time.perf_counter()
+        futures = []
+        replacement_count = buffer_replacement_count
+        replaced_paths = []
+        written_bytes = 0
+        errors = []
+        processed_count = 0
+        try:
+            executor = self.get_executor()
+            futures.extend(
+                executor.submit(
+                    replace_in_files,
+                    files=files[index : index + SEARCH_FILES_PER_TASK],
+                    query=query,
+                    replacement=replacement,
+                    is_regex=is_regex,
+                    case_sensitive=case_sensitive,
+                )
+                for index in range(0, len(files), SEARCH_FILES_PER_TASK)
+            )
+            while futures:
+                done, _ = wait(futures, return_when=FIRST_COMPLETED)
+                if worker.is_cancelled:
+                    return
+                for future in done:
+                    futures.remove(future)
+                    for (
+                        file_path,
+                        file_replacement_count,
+                        file_written_bytes,
+                        error,
+                    ) in future.result():
+                        processed_count += 1
+                        if error is not None:
+                            errors.append(f'{file_path}: {error}')
+                        elif file_replacement_count:
+                            replaced_paths.append(Path(file_path))
+                            replacement_count += file_replacement_count
+                            written_bytes += file_written_bytes
+                self.app.call_from_thread(
+                    self.search_status.update,
+                    f'Replacing... {processed_count}/{len(files)} files.',
+                )
+        except Exception as error:
+            self.app.call_from_thread(
+                self.fail_files_task,
+                search_id=search_id,
+                action='replace',
+                error=error,
+            )
+            return
+        finally:
+            for future in futures:
+                future.cancel()
+
+        elapsed = time.perf_counter() - start_time
+        self.app.call_from_thread(
+            self.finish_replace,
+            replacement_count=replacement_count,
+            replaced_paths=replaced_paths,
+            written_bytes=written_bytes,
+            errors=errors,
+            elapsed=elapsed,
+            buffer_replaced=buffer_replacement_count > 0,
+        )
+
+    def finish_replace(
+        self,
+        replacement_count: int,
+        replaced_paths: list[Path],
+        written_bytes: int,
+        errors: list[str],
+        elapsed: float,
+        buffer_replaced: bool,
+    ) -> None:
+        files_per_second = len(replaced_paths) / elapsed if elapsed else 0
+        status = (
+            f'Replaced {replacement_count} matches in '
+            f'{len(replaced_paths) + buffer_replaced} files, '
+            f'{written_bytes / 1024:.1f} KiB rewritten in {elapsed:.2f}s '
+            f'({files_per_second:.0f} files/s).'
+        )
+        if buffer_replaced:
+            status += ' The open file was changed in the editor, save it.'
+        self.search_status.update(status)
+        self.notify(title='✅', message=status, timeout=10)
+        if errors:
+            self.notify(
+                title='❌',
+                message=f'Fail to replace {len(errors)} files | '
+                + ' | '.join(errors[:3]),
+                severity='error',
+                timeout=10,
+            )
+            self.app.bell()
+        if replaced_paths:
+            self.app.refresh_git_paths(paths=replaced_paths)
+
+    @on(Button.Pressed, '#cancel')
+    def cancel(self) -> None:
+        self.app.pop_screen()
+        self.app.modal_screen_active = False
+
+
+class GoToScreen(ModalScreen):
+    def __init__(self) -> None:
+        super().__init__()
+        self.locations: list[tuple[int, int]] = []
+
+    def compose(self) -> ComposeResult:
+        with ScrollableContainer(classes='modal'):
+            with Horizontal(classes='row'):
+                yield Label('Go to:', classes='col-3 mt-1')
+                yield Input(
+                    placeholder='Line number or symbol name',
+                    id='input-go-to',
+                    classes='col-9',
+                )
+            with Horizontal(classes='row mt-1'):
+                yield OptionList(id='go-to-results', classes='col-12')
+            with Horizontal(classes='row align-left-bottom mt-1'):
+                yield Button(
+                    'Cancel',
+                    variant='error',
+                    id='cancel',
+                    classes='col-3 me-1',
+                )
+                yield Button(
+                    'Go',
+                    variant='success',
+                    id='confirm',
+                    classes=' col-3 ms-1',
+                )
+
+    def on_mount(self) -> None:
+        self.input_go_to = self.query_one(selector='#input-go-to')
+        self.go_to_results = self.query_one(selector='#go-to-results')
+        self.input_go_to.focus()
+        self.update_results()
+
+    @on(Input.Changed, '#input-go-to')
+    def update_results(self) -> None:
+        query = self.input_go_to.value.strip()
+        text_area = self.app.text_area
+        self.go_to_results.clear_options()
+        if query.lstrip(':').isdigit():
+            line_number = max(int(query.lstrip(':')), 1)
+            self.locations = [(line_number - 1, 0)]
+            self.go_to_results.add_option(
+                f'Go to row {line_number}'
+                if self.app.csv_table.csv_file is not None
+                else f'Go to line {line_number}'
+            )
+        elif text_area.is_symbol_index_current:
+            symbol_index = text_area.symbol_index
+            symbols = (
+                symbol_index.find(query=query, limit=GO_TO_MAX_RESULTS)
+                if query
+                else symbol_index.symbols[:GO_TO_MAX_RESULTS]
+            )
+            self.locations = [(symbol[0], symbol[1]) for symbol in symbols]
+            self.go_to_results.add_options(
+                format_symbol(symbol) for symbol in symbols
+            )
+        else:
+            self.locations = []
+            if self.app.request_symbol_index():
+                self.go_to_results.add_option('Indexing symbols...')
+        if self.locations:
+            self.go_to_results.highlighted = 0
+
+    @on(Input.Submitted, '#input-go-to')
+    @on(Button.Pressed, '#confirm')
+    def confirm(self) -> None:
+        highlighted = self.go_to_results.highlighted
+        if not self.locations:
+            self.app.bell()
+            return
+        self.go_to(location=self.locations[highlighted or 0])
+
+    @on(OptionList.OptionSelected, '#go-to-results')
+    def option_selected(self, event: OptionList.OptionSelected) -> None:
+        if event.option_index < len(self.locations):
+            self.go_to(location=self.locations[event.option_index])
+
+    def go_to(self, location: tuple[int, int]) -> None:
+        self.app.pop_screen()
+        self.app.modal_screen_active = False
+        self.app.go_to_location(location=location)
+
+    @on(Button.Pressed, '#cancel')
+    def cancel(self) -> None:
+        self.app.pop_screen()
+        self.app.modal_screen_active = False
+
+
+class WorkspaceSymbolsScreen(ModalScreen):
+    def __init__(self, symbol_name: str = '') -> None:
+        super().__init__()
+        self.symbol_name = symbol_name
+        self.workspace_symbols: list[WorkspaceSymbol] = []
+
+    def compose(self) -> ComposeResult:
+        with ScrollableContainer(classes='modal'):
+            with Horizontal(classes='row'):
+                yield Label('Definition:', classes='col-3 mt-1')
+                yield Input(
+                    value=self.symbol_name,
+                    placeholder='Name or start of a name',
+                    id='input-symbol-name',
+                    classes='col-9',
+                )
+            with Horizontal(classes='row mt-1'):
+                yield OptionList(id='workspace-symbols', classes='col-12')
+            with Horizontal(classes='row align-left-bottom mt-1'):
+                yield Button(
+                    'Cancel',
+                    variant='error',
+                    id='cancel',
+                    classes='col-3 me-1',
+                )
+                yield Button(
+                    'Go',
+                    variant='success',
+                    id='confirm',
+                    classes=' col-3 ms-1',
+                )
+
+    def on_mount(self) -> None:
+        self.input_symbol_name = self.query_one(selector='#input-symbol-name')
+        self.workspace_symbols_list = self.query_one(
+            selector='#workspace-symbols'
+        )
+        self.input_symbol_name.focus()
+        self.update_results()
+
+    @on(Input.Changed, '#input-symbol-name')
+    def update_results(self) -> None:
+        try:
+            self.workspace_symbols = self.app.workspace_index.find(
+                prefix=self.input_symbol_name.value, limit=GO_TO_MAX_RESULTS
+            )
+        except sqlite3.Error as error:
+            self.workspace_symbols = []
+            self.notify(
+                title='❌',
+                message=f'Fail to read the symbols index | {str(error)}.',
+                severity='error',
+                timeout=10,
+            )
+            self.app.bell()
+        self.workspace_symbols_list.clear_options()
+        self.workspace_symbols_list.add_options(
+            Text.assemble(
+                (kind, 'dim'),
+                ' ',
+                name,
+                (f' {path}:{line + 1}', 'dim'),
+            )
+            for name, kind, path, line, _ in self.workspace_symbols
+        )
+        if self.workspace_symbols:
+            self.workspace_symbols_list.highlighted = 0
+
+    @on(Input.Submitted, '#input-symbol-name')
+    @on(Button.Pressed, '#confirm')
+    def confirm(self) -> None:
+        if not self.workspace_symbols:
+            self.app.bell()
+            return
+        highlighted = self.workspace_symbols_list.highlighted
+        self.go_to(workspace_symbol=self.workspace_symbols[highlighted or 0])
+
+    @on(OptionList.OptionSelected, '#workspace-symbols')
+    def option_selected(self, event: OptionList.OptionSelected) -> None:
+        self.go_to(workspace_symbol=self.workspace_symbols[event.option_index])
+
+    def go_to(self, workspace_symbol: WorkspaceSymbol) -> None:
+        _, _, path, line, column = workspace_symbol
+        self.app.pop_screen()
+        self.app.modal_screen_active = False
+        self.app.go_to_file_location(
+            file_path=self.app.dir_path.joinpath(path),
+            location=(line, column),
+        )
+
+    @on(Button.Pressed, '#cancel')
+    def cancel(self) -> None:
+        self.app.pop_screen()
+        self.app.modal_screen_active = False
@@ -15,3 +15,25 @@ def monkey_patch_pathlib() -> None:
     Path.is_readable = is_readable
     Path.is_writable = is_writable
     Path.is_executable = is_executable
+
+
+def monkey_patch_wrapped_document() -> None:
+    from textual.document import _wrapped_document
+    from textual.document._wrapped_document import WrappedDocument
+
+    get_tab_widths = _wrapped_document.get_tab_widths
+
+    def get_tab_widths_fast(line: str, tab_size: int = 4) -> list:
+        # Re-wrapping a whole document splits each line on tabs with a regex,
+        # most lines have none
+        if '\t' not in line:
+            return [(line, 0)] if line else []
+        return get_tab_widths(line, tab_size)
+
+    def height(self: WrappedDocument) -> int:
+        # Every wrapped line has one entry, so there is no need to sum the
+        # wrap offsets of the whole document on each rendered line
+        return len(self._offset_to_line_info)
+
+    WrappedDocument.height = property(height)
+    _wrapped_document.get_tab_widths = get_tab_widths_fast
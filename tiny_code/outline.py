@@ -0,0 +1,290 @@
+from bisect import bisect_left, bisect_right
+from typing import Iterable, Optional
+
+from rich.text import Text
+
+from tiny_code.consts import OUTLINE_MAX_UPDATE_ROWS
+
+try:
+    from tree_sitter import Node
+    from tree_sitter_languages import get_parser
+except ImportError:
+    get_parser = None
+
+# Symbol: (line, column, depth, kind, name)
+Symbol = tuple[int, int, int, str, str]
+
+# Language: (symbol node types and their kind, node types that can contain
+# symbols). Only those nodes are walked, so the outline of a big module does
+# not visit its expressions
+OUTLINE_LANGUAGES = {
+    'python': (
+        {'class_definition': 'class', 'function_definition': 'def'},
+        {
+            'module',
+            'block',
+            'decorated_definition',
+            'if_statement',
+            'elif_clause',
+            'else_clause',
+            'try_statement',
+            'except_clause',
+            'finally_clause',
+            'with_statement',
+        },
+    ),
+    'markdown': ({'atx_heading': '#'}, {'document', 'section'}),
+    'toml': (
+        {'table': '[]', 'table_array_element': '[[]]'},
+        {'document'},
+    ),
+    'css': (
+        {'rule_set': 'rule', 'media_statement': '@media'},
+        {'stylesheet', 'block'},
+    ),
+}
+
+
+def format_symbol(symbol: Symbol) -> Text:
+    line, _, depth, kind, name = symbol
+    return Text.assemble(
+        '  ' * depth,
+        (kind, 'dim'),
+        ' ',
+        name,
+        (f' :{line + 1}', 'dim'),
+    )
+
+
+def get_node_text(
+    lines: list[str], start_point: tuple[int, int], end_point: tuple[int, int]
+) -> str:
+    """
+    Tree-sitter columns are utf-8 byte offsets, only the first line of the
+    node is returned
+    """
+    row, start_byte = start_point
+    line = lines[row] if row < len(lines) else ''
+    end_byte = end_point[1] if end_point[0] == row else None
+    if line.isascii():
+        return line[start_byte:end_byte]
+    return line.encode('utf-8')[start_byte:end_byte].decode(
+        'utf-8', errors='ignore'
+    )
+
+
+def get_column(lines: list[str], point: tuple[int, int]) -> int:
+    row, column = point
+    line = lines[row] if row < len(lines) else ''
+    if line.isascii():
+        return column
+    return len(line.encode('utf-8')[:column].decode('utf-8', errors='ignore'))
+
+
+def get_symbol(
+    node: 'Node', kind: str, depth: int, lines: list[str]
+) -> Symbol:
+    name_node = node.child_by_field_name('name')
+    if name_node is None and kind == '#':
+        for child in node.children:
+            if child.type.startswith('atx_h') and child.type.endswith(
+                '_marker'
+            ):
+                depth = int(child.type[5]) - 1
+            elif child.type == 'heading_content':
+                name_node = child
+    if name_node is not None:
+        name = get_node_text(
+            lines=lines,
+            start_point=name_node.start_point,
+            end_point=name_node.end_point,
+        )
+    else:
+        name = get_node_text(
+            lines=lines, start_point=node.start_point, end_point=node.end_point
+        ).split('{')[0]
+    row = node.start_point[0]
+    return (
+        row,
+        get_column(lines=lines, point=node.start_point),
+        depth,
+        kind,
+        name.strip(),
+    )
+
+
+def collect_symbols(
+    nodes: Iterable['Node'],
+    language: str,
+    lines: list[str],
+    depth: int = 0,
+) -> list[Symbol]:
+    symbol_types, container_types = OUTLINE_LANGUAGES[language]
+    # Keeps the symbols of the code that does not parse while it is typed
+    container_types = container_types | {'ERROR'}
+    symbols = []
+    to_walk = [(node, depth) for node in reversed(list(nodes))]
+    while to_walk:
+        node, node_depth = to_walk.pop()
+        kind = symbol_types.get(node.type)
+        if kind is not None:
+            symbols.append(
+                get_symbol(node=node, kind=kind, depth=node_depth, lines=lines)
+            )
+            to_walk.extend(
+                (child, node_depth + 1) for child in reversed(node.children)
+            )
+        elif node.type in container_types:
+            to_walk.extend(
+                (child, node_depth) for child in reversed(node.children)
+            )
+    return symbols
+
+
+class SymbolIndex:
+    """
+    Symbols of a buffer sorted by line, valid for the buffer `version` it was
+    built or last updated for. After an edit only the top level nodes around
+    the edited rows and the ranges tree-sitter reports as changed are walked
+    again, the symbols below them are shifted. The rows of the top level
+    nodes are kept to also walk again the ones the edit split or merged
+    """
+
+    def __init__(
+        self,
+        language: str,
+        symbols: list[Symbol],
+        node_rows: list[tuple[int, int]],
+        version: int,
+    ) -> None:
+        self.language = language
+        self.symbols = symbols
+        self.symbol_lines = [symbol[0] for symbol in symbols]
+        self.node_start_rows = [start_row for start_row, _ in node_rows]
+        self.node_end_rows = [end_row for _, end_row in node_rows]
+        self.version = version
+
+    @classmethod
+    def build(
+        cls, text: str, language: str, version: int
+    ) -> Optional['SymbolIndex']:
+        if get_parser is None or language not in OUTLINE_LANGUAGES:
+            return None
+        tree = get_parser(language).parse(text.encode('utf-8'))
+        return cls(
+            language=language,
+            symbols=collect_symbols(
+                nodes=[tree.root_node],
+                language=language,
+                lines=text.split('\n'),
+            ),
+            node_rows=[
+                (node.start_point[0], node.end_point[0])
+                for node in tree.root_node.children
+            ],
+            version=version,
+        )
+
+    def update(
+        self,
+        root_node: 'Node',
+        lines: list[str],
+        start_row: int,
+        old_end_row: int,
+        new_end_row: int,
+        changed_ranges: Iterable,
+        version: int,
+    ) -> bool:
+        """
+        Returns False, leaving the index outdated for a full build, if the
+        edit changed too many rows to be walked right away (e.g. an unclosed
+        string) or left syntax errors around it, whose recovery can move the
+        symbols anywhere
+        """
+        row_delta = new_end_row - old_end_row
+        region_start, region_end = start_row, new_end_row
+        for changed_range in changed_ranges:
+            region_start = min(region_start, changed_range.start_point[0])
+            region_end = max(region_end, changed_range.end_point[0])
+
+        # The region starts before the edit and ends after it, so its rows
+        # before the edit were `region_start` to `region_end - row_delta`.
+        # It grows to the top level nodes it overlaps before and after the
+        # edit until they all lie inside it
+        children = root_node.children
+        while True:
+            nodes = [
+                node
+                for node in children
+                if node.end_point[0] >= region_start
+                and node.start_point[0] <= region_end
+            ]
+            old_start_index = bisect_left(self.node_end_rows, region_start)
+            old_end_index = bisect_right(
+                self.node_start_rows, region_end - row_delta
+            )
+            new_region_start, new_region_end = region_start, region_end
+            if nodes:
+                new_region_start = min(
+                    new_region_start, nodes[0].start_point[0]
+                )
+                new_region_end = max(new_region_end, nodes[-1].end_point[0])
+            if old_start_index < old_end_index:
+                new_region_start = min(
+                    new_region_start, self.node_start_rows[old_start_index]
+                )
+                new_region_end = max(
+                    new_region_end,
+                    self.node_end_rows[old_end_index - 1] + row_delta,
+                )
+            if (new_region_start, new_region_end) == (
+                region_start,
+                region_end,
+            ):
+                break
+            region_start, region_end = new_region_start, new_region_end
+            if region_end - region_start > OUTLINE_MAX_UPDATE_ROWS:
+                return False
+        if region_end - region_start > OUTLINE_MAX_UPDATE_ROWS or any(
+            node.has_error for node in nodes
+        ):
+            return False
+
+        start_index = bisect_left(self.symbol_lines, region_start)
+        end_index = bisect_right(self.symbol_lines, region_end - row_delta)
+        region_symbols = collect_symbols(
+            nodes=nodes, language=self.language, lines=lines
+        )
+        shifted_symbols = [
+            (line + row_delta, column, depth, kind, name)
+            for line, column, depth, kind, name in self.symbols[end_index:]
+        ]
+        self.symbols[start_index:] = region_symbols + shifted_symbols
+        self.symbol_lines[start_index:] = [
+            symbol[0] for symbol in self.symbols[start_index:]
+        ]
+        self.node_start_rows[old_start_index:] = [
+            node.start_point[0] for node in nodes
+        ] + [row + row_delta for row in self.node_start_rows[old_end_index:]]
+        self.node_end_rows[old_start_index:] = [
+            node.end_point[0] for node in nodes
+        ] + [row + row_delta for row in self.node_end_rows[old_end_index:]]
+        self.version = version
+        return True
+
+    def find(self, query: str, limit: int) -> list[Symbol]:
+        """
+        Symbols whose name contains `query` ignoring case, the ones starting
+        with it first
+        """
+        query = query.lower()
+        prefixed_symbols, other_symbols = [], []
+        for symbol in self.symbols:
+            index = symbol[4].lower().find(query)
+            if index == 0:
+                prefixed_symbols.append(symbol)
+                if len(prefixed_symbols) >= limit:
+                    break
+            elif index > 0 and len(other_symbols) < limit:
+                other_symbols.append(symbol)
+        return (prefixed_symbols + other_symbols)[:limit]
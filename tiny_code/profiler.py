@@ -0,0 +1,70 @@
+from pathlib import Path
+from typing import Optional
+import cProfile
+import io
+import json
+import platform
+import pstats
+import time
+
+from textual import __version__ as textual_version
+
+from tiny_code.consts import PROFILES_DIR_PATH
+from tiny_code.utils import atomic_write_text
+
+
+class Profiler:
+    """
+    cProfile around the event loop thread. Stopping it writes a `.prof` file
+    (readable with `pstats`, snakeviz...), a `.txt` summary and a `.json`
+    file with the context it was recorded in
+    """
+
+    def __init__(self) -> None:
+        self.profile: Optional[cProfile.Profile] = None
+        self.started_at: float = 0
+
+    @property
+    def is_running(self) -> bool:
+        return self.profile is not None
+
+    def start(self) -> None:
+        self.profile = cProfile.Profile()
+        self.started_at = time.time()
+        self.profile.enable()
+
+    def stop(self, metadata: dict[str, object]) -> Path:
+        self.profile.disable()
+        profile, self.profile = self.profile, None
+
+        PROFILES_DIR_PATH.mkdir(parents=True, exist_ok=True)
+        profile_name = time.strftime(
+            'tiny-code-%Y%m%d-%H%M%S', time.localtime(self.started_at)
+        )
+        profile_path = PROFILES_DIR_PATH.joinpath(f'{profile_name}.prof')
+        profile.dump_stats(profile_path)
+
+        summary = io.StringIO()
+        pstats.Stats(profile, stream=summary).sort_stats(
+            pstats.SortKey.CUMULATIVE
+        ).print_stats(50)
+        atomic_write_text(
+            file_path=profile_path.with_suffix('.txt'),
+            text=summary.getvalue(),
+        )
+
+        atomic_write_text(
+            file_path=profile_path.with_suffix('.json'),
+            text=json.dumps(
+                {
+                    **metadata,
+                    'started_at': self.started_at,
+                    'duration': time.time() - self.started_at,
+                    'python_version': platform.python_version(),
+                    'textual_version': textual_version,
+                    'platform': platform.platform(),
+                },
+                indent=2,
+            ),
+        )
+        return profile_path
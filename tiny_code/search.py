@@ -0,0 +1,338 @@
+from array import array
+from bisect import bisect_left, bisect_right
+from pathlib import Path
+from typing import Callable, Optional, Sequence
+import os
+import re
+import shutil
+import tempfile
+import time
+
+from tiny_code.consts import (
+    FIND_CHUNK_SIZE,
+    FIND_MAX_MATCHES,
+    SEARCH_BINARY_SNIFF_SIZE,
+    SEARCH_MAX_FILE_SIZE,
+    SEARCH_MAX_PREVIEW_LINES,
+)
+
+# Search result: (file path, mtime_ns, size, match count, preview lines as
+# (line number, line))
+SearchResult = tuple[str, int, int, int, list[tuple[int, str]]]
+
+# Replace result: (file path, replacement count, bytes written, error)
+ReplaceResult = tuple[str, int, int, Optional[str]]
+
+
+def compile_pattern(
+    query: str, is_regex: bool, case_sensitive: bool
+) -> re.Pattern:
+    return re.compile(
+        query if is_regex else re.escape(query),
+        re.MULTILINE if case_sensitive else re.MULTILINE | re.IGNORECASE,
+    )
+
+
+def search_text(
+    text: str, pattern: re.Pattern
+) -> tuple[int, list[tuple[int, str]]]:
+    match_count = 0
+    preview_lines = []
+    line_number = 0
+    line_start = 0
+    for match in pattern.finditer(text):
+        match_count += 1
+        if len(preview_lines) >= SEARCH_MAX_PREVIEW_LINES:
+            continue
+        # Counts the lines from the previous match only
+        line_number += text.count('\n', line_start, match.start())
+        line_start = text.rfind('\n', 0, match.start()) + 1
+        if preview_lines and preview_lines[-1][0] == line_number:
+            continue
+        line_end = text.find('\n', match.start())
+        preview_lines.append(
+            (
+                line_number,
+                text[line_start : None if line_end == -1 else line_end],
+            )
+        )
+    return match_count, preview_lines
+
+
+def read_text_file(file_path: str) -> Optional[tuple[str, os.stat_result]]:
+    """
+    Returns the text and stat of a file, or None for files too big, binary or
+    not encoded in utf-8
+    """
+    file_stat = os.stat(file_path)
+    if file_stat.st_size > SEARCH_MAX_FILE_SIZE:
+        return None
+    with open(file_path, 'rb') as file:
+        content = file.read()
+    if b'\0' in content[:SEARCH_BINARY_SNIFF_SIZE]:
+        return None
+    try:
+        return content.decode('utf-8'), file_stat
+    except UnicodeDecodeError:
+        return None
+
+
+def search_files(
+    file_paths: list[str], query: str, is_regex: bool, case_sensitive: bool
+) -> list[SearchResult]:
+    """
+    Runs in the worker processes, each task searches a batch of files to
+    keep the inter process traffic low
+    """
+    pattern = compile_pattern(
+        query=query, is_regex=is_regex, case_sensitive=case_sensitive
+    )
+    search_results = []
+    for file_path in file_paths:
+        try:
+            text_file = read_text_file(file_path=file_path)
+        except OSError:
+            continue
+        if text_file is None:
+            continue
+        text, file_stat = text_file
+        match_count, preview_lines = search_text(text=text, pattern=pattern)
+        if match_count:
+            search_results.append(
+                (
+                    file_path,
+                    file_stat.st_mtime_ns,
+                    file_stat.st_size,
+                    match_count,
+                    preview_lines,
+                )
+            )
+    return search_results
+
+
+def replace_text(
+    text: str, pattern: re.Pattern, replacement: str, is_regex: bool
+) -> tuple[str, int]:
+    if is_regex:
+        return pattern.subn(replacement, text)
+    return pattern.subn(lambda _: replacement, text)
+
+
+def replace_in_file(
+    file_path: str,
+    mtime_ns: int,
+    size: int,
+    pattern: re.Pattern,
+    replacement: str,
+    is_regex: bool,
+) -> ReplaceResult:
+    """
+    Rewrites the file through a temporary file that atomically replaces it,
+    files changed since they were searched are left untouched
+    """
+    try:
+        file_stat = os.stat(file_path)
+        if (file_stat.st_mtime_ns, file_stat.st_size) != (mtime_ns, size):
+            return file_path, 0, 0, 'changed since the search'
+        with open(file_path, 'rb') as file:
+            text = file.read().decode('utf-8')
+        new_text, replacement_count = replace_text(
+            text=text,
+            pattern=pattern,
+            replacement=replacement,
+            is_regex=is_regex,
+        )
+        if not replacement_count:
+            return file_path, 0, 0, None
+        content = new_text.encode('utf-8')
+
+        file_descriptor, temp_path = tempfile.mkstemp(
+            dir=Path(file_path).parent,
+            prefix=f'.{Path(file_path).name}.',
+            suffix='.tmp',
+        )
+        try:
+            with os.fdopen(file_descriptor, 'wb') as temp_file:
+                temp_file.write(content)
+            shutil.copymode(file_path, temp_path)
+            os.replace(temp_path, file_path)
+        except BaseException:
+            os.unlink(temp_path)
+            raise
+    except (OSError, UnicodeDecodeError, re.error) as error:
+        return file_path, 0, 0, str(error)
+    return file_path, replacement_count, len(content), None
+
+
+def replace_in_files(
+    files: list[tuple[str, int, int]],
+    query: str,
+    replacement: str,
+    is_regex: bool,
+    case_sensitive: bool,
+) -> list[ReplaceResult]:
+    pattern = compile_pattern(
+        query=query, is_regex=is_regex, case_sensitive=case_sensitive
+    )
+    return [
+        replace_in_file(
+            file_path=file_path,
+            mtime_ns=mtime_ns,
+            size=size,
+            pattern=pattern,
+            replacement=replacement,
+            is_regex=is_regex,
+        )
+        for file_path, mtime_ns, size in files
+    ]
+
+
+def pack_location(location: tuple[int, int]) -> int:
+    """
+    Packs a (row, column) location in one integer that sorts like the tuple
+    """
+    row, column = location
+    return row << 32 | column
+
+
+def unpack_location(packed_location: int) -> tuple[int, int]:
+    return packed_location >> 32, packed_location & 0xFFFFFFFF
+
+
+class FindMatches:
+    """
+    Packed start and end locations of the matches in a buffer, sorted, so
+    going to the next or previous match is a binary search. `is_complete` is
+    False if the search stopped at `FIND_MAX_MATCHES`
+    """
+
+    def __init__(
+        self, starts: array, ends: array, is_complete: bool, version: int = 0
+    ) -> None:
+        self.starts = starts
+        self.ends = ends
+        self.is_complete = is_complete
+        self.version = version
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def get_match(self, index: int) -> tuple[tuple[int, int], tuple[int, int]]:
+        return (
+            unpack_location(self.starts[index]),
+            unpack_location(self.ends[index]),
+        )
+
+    def index_of(
+        self, start: tuple[int, int], end: tuple[int, int]
+    ) -> Optional[int]:
+        index = bisect_left(self.starts, pack_location(start))
+        if index < len(self.starts) and self.get_match(index) == (start, end):
+            return index
+        return None
+
+    def find_next(
+        self, location: tuple[int, int], include_location: bool
+    ) -> Optional[int]:
+        """
+        Index of the first match starting after `location`, or at it if
+        `include_location`, wrapping around to the first match
+        """
+        if not self.starts:
+            return None
+        if include_location:
+            index = bisect_left(self.starts, pack_location(location))
+        else:
+            index = bisect_right(self.starts, pack_location(location))
+        return index if index < len(self.starts) else 0
+
+    def find_previous(self, location: tuple[int, int]) -> Optional[int]:
+        if not self.starts:
+            return None
+        index = bisect_left(self.starts, pack_location(location)) - 1
+        return index if index >= 0 else len(self.starts) - 1
+
+
+def find_in_lines(
+    lines: Sequence[str],
+    pattern: re.Pattern,
+    start: tuple[int, int] = (0, 0),
+    max_size: Optional[int] = None,
+    max_matches: int = FIND_MAX_MATCHES,
+    is_cancelled: Callable[[], bool] = lambda: False,
+) -> Optional[FindMatches]:
+    """
+    Searches the lines from `start` in chunks of about `FIND_CHUNK_SIZE`
+    characters joined back with newlines, a longer line is searched in
+    windows of that size in place. The whole buffer is never copied and a
+    worker thread releases the GIL between chunks. Matches spanning two
+    chunks are not found, the search stops after about `max_size`
+    characters. Returns None if cancelled
+    """
+    start_row, start_column = start
+    end_row = len(lines)
+    starts, ends = array('q'), array('q')
+    chunk_start_row, searched_size = start_row, 0
+    while chunk_start_row < end_row and (
+        max_size is None or searched_size < max_size
+    ):
+        if is_cancelled():
+            return None
+        line = lines[chunk_start_row]
+        if len(line) > FIND_CHUNK_SIZE:
+            column = start_column if chunk_start_row == start_row else 0
+            while column < len(line):
+                if is_cancelled():
+                    return None
+                end_column = min(column + FIND_CHUNK_SIZE, len(line))
+                for match in pattern.finditer(line, column, end_column):
+                    start, end = match.span()
+                    starts.append(chunk_start_row << 32 | start)
+                    ends.append(chunk_start_row << 32 | end)
+                    if len(starts) >= max_matches:
+                        return FindMatches(
+                            starts=starts, ends=ends, is_complete=False
+                        )
+                searched_size += end_column - column
+                column = end_column
+                if max_size is not None and searched_size >= max_size:
+                    break
+                time.sleep(0)
+            chunk_start_row += 1
+            continue
+
+        chunk_end_row, chunk_size = chunk_start_row, 0
+        while (
+            chunk_end_row < end_row
+            and chunk_size < FIND_CHUNK_SIZE
+            and len(lines[chunk_end_row]) <= FIND_CHUNK_SIZE
+        ):
+            chunk_size += len(lines[chunk_end_row]) + 1
+            chunk_end_row += 1
+        searched_size += chunk_size
+        text = '\n'.join(lines[chunk_start_row:chunk_end_row])
+
+        row, row_start, position = chunk_start_row, 0, 0
+        for match in pattern.finditer(
+            text, start_column if chunk_start_row == start_row else 0
+        ):
+            start, end = match.span()
+            # Counts the newlines from the previous match only
+            newline_count = text.count('\n', position, start)
+            if newline_count:
+                row += newline_count
+                row_start = text.rfind('\n', position, start) + 1
+            starts.append(row << 32 | start - row_start)
+            newline_count = text.count('\n', start, end)
+            if newline_count:
+                row += newline_count
+                row_start = text.rfind('\n', start, end) + 1
+            ends.append(row << 32 | end - row_start)
+            position = end
+            if len(starts) >= max_matches:
+                return FindMatches(starts=starts, ends=ends, is_complete=False)
+        chunk_start_row = chunk_end_row
+        # Gives the GIL back to the event loop right away instead of after
+        # the switch interval, so typing is not slowed down
+        time.sleep(0)
+    return FindMatches(starts=starts, ends=ends, is_complete=True)
@@ -0,0 +1,58 @@
+from pathlib import Path
+from typing import Optional
+import hashlib
+import json
+
+from tiny_code.consts import SESSIONS_DIR_PATH
+from tiny_code.entities import DirectoryListing, OpenFile, Session
+from tiny_code.utils import atomic_write_text
+
+
+class SessionManager:
+    @classmethod
+    def get_session_path(cls, dir_path: Path) -> Path:
+        session_id = hashlib.sha1(str(dir_path).encode('utf-8')).hexdigest()
+        return SESSIONS_DIR_PATH.joinpath(f'{session_id}.json')
+
+    @classmethod
+    def get(cls, dir_path: Path) -> Optional[Session]:
+        session_path = cls.get_session_path(dir_path=dir_path)
+        try:
+            current_session = json.loads(
+                session_path.read_text(encoding='utf-8')
+            )
+            return Session(
+                expanded_paths=current_session.get('expanded_paths', []),
+                directory_listings={
+                    path: DirectoryListing(
+                        mtime_ns=listing['mtime_ns'],
+                        entries=[
+                            (name, is_dir)
+                            for name, is_dir in listing['entries']
+                        ],
+                        ignore_key=listing.get('ignore_key', ''),
+                    )
+                    for path, listing in current_session.get(
+                        'directory_listings', {}
+                    ).items()
+                },
+                open_files=[
+                    OpenFile(
+                        path=open_file['path'],
+                        cursor_location=tuple(open_file['cursor_location']),
+                        scroll_offset=tuple(open_file['scroll_offset']),
+                        language=open_file.get('language'),
+                    )
+                    for open_file in current_session.get('open_files', [])
+                ],
+            )
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+
+    @classmethod
+    def set(cls, dir_path: Path, session: Session) -> None:
+        session_path = cls.get_session_path(dir_path=dir_path)
+        session_path.parent.mkdir(parents=True, exist_ok=True)
+        atomic_write_text(
+            file_path=session_path, text=json.dumps(session.to_dict())
+        )
@@ -0,0 +1,87 @@
+from pathlib import Path
+from typing import BinaryIO, Optional
+import codecs
+import os
+import select
+import tempfile
+
+from tiny_code.consts import (
+    STDIN_DIR_PATH,
+    STDIN_MAX_BUFFER_SIZE,
+    STDIN_READ_SIZE,
+)
+
+
+class StdinReader:
+    """
+    Reads a pipe incrementally. Up to `STDIN_MAX_BUFFER_SIZE` bytes are
+    decoded for the editor, past that (or once the editor is detached) the
+    whole stream is spilled to a temporary file so nothing is lost
+    """
+
+    def __init__(self, fd: int) -> None:
+        self.fd = fd
+        self.decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+        self.read_size: int = 0
+        self.buffer = bytearray()
+        self.detached: bool = False
+        self.is_finished: bool = False
+        self.spill_file: Optional[BinaryIO] = None
+        self.spill_path: Optional[Path] = None
+
+    @property
+    def is_spilled(self) -> bool:
+        return self.spill_path is not None
+
+    def read(self, timeout: float) -> str:
+        """
+        Waits up to `timeout` for data and returns the text to append to the
+        editor, `is_finished` is set at the end of the stream
+        """
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return ''
+        data = os.read(self.fd, STDIN_READ_SIZE)
+        if not data:
+            self.is_finished = True
+            if self.detached and self.spill_file is None:
+                self.start_spilling()
+            self.close()
+            if self.is_spilled:
+                return ''
+            return self.decoder.decode(b'', final=True)
+
+        shown_size = max(STDIN_MAX_BUFFER_SIZE - self.read_size, 0)
+        self.read_size += len(data)
+        if self.spill_file is None and (
+            self.detached or self.read_size > STDIN_MAX_BUFFER_SIZE
+        ):
+            self.start_spilling()
+        if self.spill_file is None:
+            self.buffer += data
+            return self.decoder.decode(data)
+
+        self.spill_file.write(data)
+        if self.detached or not shown_size:
+            return ''
+        return self.decoder.decode(data[:shown_size], final=True)
+
+    def start_spilling(self) -> None:
+        STDIN_DIR_PATH.mkdir(parents=True, exist_ok=True)
+        spill_fd, spill_path = tempfile.mkstemp(
+            prefix='stdin-', suffix='.txt', dir=STDIN_DIR_PATH
+        )
+        self.spill_file = os.fdopen(spill_fd, 'wb')
+        self.spill_path = Path(spill_path)
+        self.spill_file.write(self.buffer)
+        self.buffer = bytearray()
+
+    def close(self) -> None:
+        if self.spill_file is not None:
+            self.spill_file.close()
+            self.spill_file = None
+        self.buffer = bytearray()
+        try:
+            os.close(self.fd)
+        except OSError:
+            pass
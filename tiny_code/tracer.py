@@ -0,0 +1,184 @@
+from collections import deque
+from pathlib import Path
+from typing import Optional
+import json
+import os
+import time
+
+from textual.app import App
+from textual.events import Event, Key
+from textual.message import Message
+from textual.message_pump import MessagePump
+
+from tiny_code.consts import (
+    TRACE_LAG_INTERVAL,
+    TRACE_RING_SIZE,
+    TRACES_DIR_PATH,
+)
+from tiny_code.utils import atomic_write_text
+
+# Trace record: (phase, name, category, lane, start_ns, duration_ns or value)
+TraceRecord = tuple[str, str, str, int, int, float]
+
+
+class MessageTracer:
+    """
+    Records how long every message handler of the traced message pumps takes
+    into a bounded ring, and dumps it as a Chrome trace (chrome://tracing,
+    Perfetto). Each message pump gets its own lane, as each one runs in its
+    own task
+    """
+
+    def __init__(self, capacity: int = TRACE_RING_SIZE) -> None:
+        self.records: deque[TraceRecord] = deque(maxlen=capacity)
+        self.lanes: dict[int, tuple[int, str]] = {}
+        self.started_at = time.time()
+        self.started_ns = time.perf_counter_ns()
+        self.last_lag_check_ns = self.started_ns
+        self.patched: list[tuple[type, str, object]] = []
+
+    def get_lane(self, message_pump: MessagePump) -> int:
+        lane = self.lanes.get(id(message_pump))
+        if lane is None:
+            name = type(message_pump).__name__
+            if getattr(message_pump, 'id', None):
+                name = f'{name}#{message_pump.id}'
+            lane = self.lanes[id(message_pump)] = (len(self.lanes) + 1, name)
+        return lane[0]
+
+    def install(self, traced_types: tuple[type, ...]) -> None:
+        tracer = self
+        records = self.records
+        dispatch_message = MessagePump._dispatch_message
+        push_screen = App.push_screen
+        pop_screen = App.pop_screen
+
+        async def traced_dispatch_message(
+            self: MessagePump, message: Message
+        ) -> None:
+            if not isinstance(self, traced_types):
+                return await dispatch_message(self, message)
+            start_ns = time.perf_counter_ns()
+            try:
+                await dispatch_message(self, message)
+            finally:
+                name = type(message).__qualname__
+                if isinstance(message, Key):
+                    name = f'{name}({message.key})'
+                records.append(
+                    (
+                        'X',
+                        name,
+                        'event' if isinstance(message, Event) else 'message',
+                        tracer.get_lane(self),
+                        start_ns,
+                        time.perf_counter_ns() - start_ns,
+                    )
+                )
+
+        def traced_push_screen(self: App, screen, *args, **kwargs):
+            screen_name = (
+                screen if isinstance(screen, str) else type(screen).__name__
+            )
+            records.append(
+                (
+                    'i',
+                    f'push_screen({screen_name})',
+                    'screen',
+                    tracer.get_lane(self),
+                    time.perf_counter_ns(),
+                    0,
+                )
+            )
+            return push_screen(self, screen, *args, **kwargs)
+
+        def traced_pop_screen(self: App):
+            records.append(
+                (
+                    'i',
+                    f'pop_screen({type(self.screen).__name__})',
+                    'screen',
+                    tracer.get_lane(self),
+                    time.perf_counter_ns(),
+                    0,
+                )
+            )
+            return pop_screen(self)
+
+        for owner, attribute, function in (
+            (MessagePump, '_dispatch_message', traced_dispatch_message),
+            (App, 'push_screen', traced_push_screen),
+            (App, 'pop_screen', traced_pop_screen),
+        ):
+            self.patched.append((owner, attribute, getattr(owner, attribute)))
+            setattr(owner, attribute, function)
+
+    def uninstall(self) -> None:
+        for owner, attribute, function in reversed(self.patched):
+            setattr(owner, attribute, function)
+        self.patched.clear()
+
+    def record_lag(self) -> None:
+        """
+        Called every `TRACE_LAG_INTERVAL` seconds, records how late it was
+        called, i.e. how long the event loop was blocked
+        """
+        now_ns = time.perf_counter_ns()
+        lag_ms = max(
+            0,
+            (now_ns - self.last_lag_check_ns) / 1e6 - TRACE_LAG_INTERVAL * 1e3,
+        )
+        self.last_lag_check_ns = now_ns
+        self.records.append(('C', 'event loop lag', 'loop', 0, now_ns, lag_ms))
+
+    def dump(self, metadata: Optional[dict[str, object]] = None) -> Path:
+        pid = os.getpid()
+        trace_events = [
+            {
+                'name': 'thread_name',
+                'ph': 'M',
+                'pid': pid,
+                'tid': lane,
+                'args': {'name': name},
+            }
+            for lane, name in self.lanes.values()
+        ]
+        for phase, name, category, lane, start_ns, value in list(self.records):
+            trace_event = {
+                'name': name,
+                'cat': category,
+                'ph': phase,
+                'ts': (start_ns - self.started_ns) / 1e3,
+                'pid': pid,
+                'tid': lane,
+            }
+            if phase == 'X':
+                trace_event['dur'] = value / 1e3
+            elif phase == 'i':
+                trace_event['s'] = 't'
+            elif phase == 'C':
+                trace_event['args'] = {'ms': value}
+            trace_events.append(trace_event)
+
+        TRACES_DIR_PATH.mkdir(parents=True, exist_ok=True)
+        trace_path = TRACES_DIR_PATH.joinpath(
+            time.strftime(
+                'tiny-code-%Y%m%d-%H%M%S.json', time.localtime(self.started_at)
+            )
+        )
+        atomic_write_text(
+            file_path=trace_path,
+            text=json.dumps(
+                {
+                    'traceEvents': trace_events,
+                    'displayTimeUnit': 'ms',
+                    'otherData': {
+                        **(metadata or {}),
+                        'started_at': self.started_at,
+                        'ring_size': self.records.maxlen,
+                        'ring_full': len(self.records) == self.records.maxlen,
+                    },
+                }
+            ),
+        )
+        return trace_path
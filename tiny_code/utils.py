@@ -1,6 +1,14 @@
+from concurrent.futures import ProcessPoolExecutor
+from difflib import SequenceMatcher
 from math import ceil, floor
 from pathlib import Path
-from typing import Literal, Union
+from typing import Callable, Literal, Optional, Union
+import contextlib
+import hashlib
+import multiprocessing
+import os
+import sys
+import tempfile
 
 
 def find_first_char_non_void(string: str) -> int:
@@ -81,6 +89,148 @@ def comment_or_uncomment_text(text: str, comment_char: str) -> str:
     return '\n'.join(updated_lines)
 
 
+def atomic_write_text(
+    file_path: Union[Path, str], text: str, encoding: str = 'utf-8'
+) -> None:
+    file_path = Path(file_path)
+    file_descriptor, temp_path = tempfile.mkstemp(
+        dir=file_path.parent, prefix=f'.{file_path.name}.', suffix='.tmp'
+    )
+    try:
+        with os.fdopen(file_descriptor, 'w', encoding=encoding) as temp_file:
+            temp_file.write(text)
+        os.replace(temp_path, file_path)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
+
+
+def atomic_write_bytes(
+    file_path: Union[Path, str], data: bytes, mode: Optional[int] = None
+) -> None:
+    """
+    `mode` sets the permissions of the file, otherwise it is only readable
+    and writable by its owner
+    """
+    file_path = Path(file_path)
+    file_descriptor, temp_path = tempfile.mkstemp(
+        dir=file_path.parent, prefix=f'.{file_path.name}.', suffix='.tmp'
+    )
+    try:
+        with os.fdopen(file_descriptor, 'wb') as temp_file:
+            temp_file.write(data)
+        if mode is not None:
+            os.chmod(temp_path, mode)
+        os.replace(temp_path, file_path)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
+
+
+def create_process_pool() -> ProcessPoolExecutor:
+    """
+    Process pool safe to start from the app: `spawn` does not fork its
+    threads in a random state, and Textual captures stderr with an invalid
+    file descriptor that the multiprocessing resource tracker needs when it
+    is started
+    """
+    with contextlib.redirect_stderr(sys.__stderr__):
+        return ProcessPoolExecutor(
+            mp_context=multiprocessing.get_context('spawn')
+        )
+
+
+def hash_file(
+    file_path: Union[Path, str],
+    chunk_size: int = 1024 * 1024,
+    is_cancelled: Optional[Callable[[], bool]] = None,
+) -> Optional[str]:
+    file_hash = hashlib.blake2b(digest_size=16)
+    with open(file_path, 'rb') as file:
+        while chunk := file.read(chunk_size):
+            if is_cancelled is not None and is_cancelled():
+                return None
+            file_hash.update(chunk)
+    return file_hash.hexdigest()
+
+
+def format_size(size: int) -> str:
+    for unit in ('B', 'KiB', 'MiB', 'GiB'):
+        if size < 1024:
+            break
+        size /= 1024
+    else:
+        unit = 'TiB'
+    if unit == 'B':
+        return f'{size} B'
+    return f'{size:.1f} {unit}'
+
+
+def merge_lines(
+    base_lines: list[str], our_lines: list[str], their_lines: list[str]
+) -> tuple[list[str], bool]:
+    def get_changes(
+        changed_lines: list[str], side: str
+    ) -> list[tuple[int, int, list[str], str]]:
+        matcher = SequenceMatcher(None, base_lines, changed_lines, False)
+        return [
+            (base_start, base_end, changed_lines[start:end], side)
+            for tag, base_start, base_end, start, end in matcher.get_opcodes()
+            if tag != 'equal'
+        ]
+
+    def apply_changes(
+        start: int, end: int, changes: list[tuple[int, int, list[str], str]]
+    ) -> list[str]:
+        lines = []
+        position = start
+        for base_start, base_end, replacement, _ in changes:
+            lines.extend(base_lines[position:base_start])
+            lines.extend(replacement)
+            position = base_end
+        lines.extend(base_lines[position:end])
+        return lines
+
+    changes = sorted(
+        get_changes(our_lines, 'ours') + get_changes(their_lines, 'theirs'),
+        key=lambda change: (change[0], change[1]),
+    )
+    merged_lines = []
+    has_conflicts = False
+    position = 0
+    index = 0
+    while index < len(changes):
+        # Group the changes of both sides touching the same base lines
+        group_start, group_end = changes[index][0], changes[index][1]
+        group = [changes[index]]
+        index += 1
+        while index < len(changes) and changes[index][0] <= group_end:
+            group_end = max(group_end, changes[index][1])
+            group.append(changes[index])
+            index += 1
+
+        merged_lines.extend(base_lines[position:group_start])
+        our_changes = [change for change in group if change[3] == 'ours']
+        their_changes = [change for change in group if change[3] == 'theirs']
+        our_part = apply_changes(group_start, group_end, our_changes)
+        their_part = apply_changes(group_start, group_end, their_changes)
+        if not their_changes or our_part == their_part:
+            merged_lines.extend(our_part)
+        elif not our_changes:
+            merged_lines.extend(their_part)
+        else:
+            has_conflicts = True
+            merged_lines.append('<<<<<<< editor')
+            merged_lines.extend(our_part)
+            merged_lines.append('=======')
+            merged_lines.extend(their_part)
+            merged_lines.append('>>>>>>> disk')
+        position = group_end
+
+    merged_lines.extend(base_lines[position:])
+    return merged_lines, has_conflicts
+
+
 def remove_dir_or_file(dir_or_file_path: Union[Path, str]) -> None:
     dir_or_file_path = Path(dir_or_file_path)
     if not dir_or_file_path.exists():
@@ -97,12 +247,15 @@ def clear_dir(dir_path: Union[Path, str]) -> None:
     if not dir_path.is_dir():
         return
 
-    dir_content = dir_path.rglob('*', True)
+    dir_content = list(dir_path.rglob('*'))
 
     for path in dir_content:
-        if path.is_file():
+        if path.is_symlink() or not path.is_dir():
             path.unlink()
 
-    for path in dir_content:
+    # A directory must be empty to be removed, so the deepest go first
+    for path in sorted(
+        dir_content, key=lambda path: len(path.parts), reverse=True
+    ):
         if path.is_dir():
             path.rmdir()
@@ -0,0 +1,302 @@
+from concurrent.futures import FIRST_COMPLETED, wait
+from pathlib import Path
+from typing import Callable, Iterable, Optional
+import hashlib
+import os
+import sqlite3
+
+from tiny_code.consts import (
+    LANGUAGES_MAP,
+    WORKSPACE_INDEX_BULK_FILES,
+    WORKSPACE_INDEX_FILES_PER_TASK,
+    WORKSPACE_INDEX_MAX_FILE_SIZE,
+    WORKSPACE_INDEXES_DIR_PATH,
+)
+from tiny_code.ignore import IgnoreMatcher
+from tiny_code.outline import OUTLINE_LANGUAGES, Symbol, SymbolIndex
+from tiny_code.utils import create_process_pool
+
+WORKSPACE_INDEX_SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    id INTEGER PRIMARY KEY,
+    path TEXT NOT NULL UNIQUE,
+    mtime_ns INTEGER NOT NULL,
+    size INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS symbols (
+    name TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    file_id INTEGER NOT NULL,
+    line INTEGER NOT NULL,
+    column INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS symbols_file_id ON symbols (file_id);
+"""
+
+# Built after bulk inserts, it is faster than updating it on each insert
+WORKSPACE_INDEX_NAME_INDEX = """
+CREATE INDEX IF NOT EXISTS symbols_name ON symbols (name COLLATE NOCASE);
+"""
+
+# Indexed file: (path relative to the workspace, mtime_ns, size)
+IndexedFile = tuple[str, int, int]
+
+# Workspace symbol: (name, kind, path relative to the workspace, line,
+# column)
+WorkspaceSymbol = tuple[str, str, str, int, int]
+
+
+def get_language(file_path: str) -> Optional[str]:
+    _, extension = os.path.splitext(file_path)
+    language = LANGUAGES_MAP.get(extension.lower())
+    return language if language in OUTLINE_LANGUAGES else None
+
+
+def extract_symbols(
+    dir_path: str, files: list[IndexedFile]
+) -> list[tuple[IndexedFile, list[Symbol]]]:
+    """
+    Runs in the worker processes, files that can't be read are indexed
+    without symbols so they are not read again until they change
+    """
+    results = []
+    for indexed_file in files:
+        relative_path, _, size = indexed_file
+        symbols = []
+        if size <= WORKSPACE_INDEX_MAX_FILE_SIZE:
+            try:
+                with open(
+                    os.path.join(dir_path, relative_path),
+                    encoding='utf-8',
+                ) as file:
+                    text = file.read()
+                symbol_index = SymbolIndex.build(
+                    text=text,
+                    language=get_language(file_path=relative_path),
+                    version=0,
+                )
+                if symbol_index is not None:
+                    symbols = symbol_index.symbols
+            except (OSError, UnicodeDecodeError):
+                pass
+        results.append((indexed_file, symbols))
+    return results
+
+
+class WorkspaceIndex:
+    """
+    Definitions of every file of the workspace in a sqlite database, keyed by
+    path, mtime and size so updates only extract the files that changed.
+    Names are looked up by prefix, ignoring case, through an index
+    """
+
+    def __init__(self, dir_path: Path) -> None:
+        self.dir_path = dir_path
+        index_id = hashlib.sha1(str(dir_path).encode('utf-8')).hexdigest()
+        self.index_path = WORKSPACE_INDEXES_DIR_PATH.joinpath(
+            f'{index_id}.sqlite3'
+        )
+        self.read_connection: Optional[sqlite3.Connection] = None
+
+    def connect(self) -> sqlite3.Connection:
+        """
+        Connection of the indexing workers, it creates the schema and can
+        wait for the lock of another one
+        """
+        self.index_path.parent.mkdir(parents=True, exist_ok=True)
+        connection = sqlite3.connect(self.index_path, timeout=10)
+        connection.execute('PRAGMA journal_mode=WAL')
+        connection.execute('PRAGMA synchronous=NORMAL')
+        connection.executescript(WORKSPACE_INDEX_SCHEMA)
+        connection.executescript(WORKSPACE_INDEX_NAME_INDEX)
+        return connection
+
+    def connect_read_only(self) -> sqlite3.Connection:
+        """
+        Connection of the lookups on the UI thread, it runs no schema change
+        and, in WAL mode, does not wait for the writers
+        """
+        return sqlite3.connect(f'{self.index_path.as_uri()}?mode=ro', uri=True)
+
+    def get_disk_files(
+        self,
+        paths: Optional[Iterable[Path]],
+        is_cancelled: Callable[[], bool],
+    ) -> dict[str, tuple[int, int]]:
+        if paths is not None:
+            file_paths = [str(path) for path in paths]
+        else:
+            file_paths = [
+                os.path.join(dir_path, file_name)
+                for dir_path, _, file_names in IgnoreMatcher(
+                    root_path=self.dir_path
+                ).walk(top_path=self.dir_path, is_cancelled=is_cancelled)
+                for file_name in file_names
+                if get_language(file_path=file_name) is not None
+            ]
+
+        disk_files = {}
+        for file_path in file_paths:
+            try:
+                file_stat = os.stat(file_path)
+            except OSError:
+                continue
+            relative_path = os.path.relpath(file_path, self.dir_path)
+            if relative_path.startswith('..') or not get_language(
+                file_path=relative_path
+            ):
+                continue
+            disk_files[relative_path] = (
+                file_stat.st_mtime_ns,
+                file_stat.st_size,
+            )
+        return disk_files
+
+    def update(
+        self,
+        is_cancelled: Callable[[], bool],
+        paths: Optional[Iterable[Path]] = None,
+    ) -> int:
+        """
+        Indexes the changed files of the workspace, or only `paths`, and
+        drops the deleted ones. Returns the number of files indexed
+        """
+        if paths is not None:
+            paths = list(paths)
+        disk_files = self.get_disk_files(
+            paths=paths, is_cancelled=is_cancelled
+        )
+        if is_cancelled():
+            return 0
+
+        connection = self.connect()
+        try:
+            indexed_files = {
+                path: (mtime_ns, size)
+                for path, mtime_ns, size in connection.execute(
+                    'SELECT path, mtime_ns, size FROM files'
+                )
+            }
+            if paths is None:
+                removed_paths = indexed_files.keys() - disk_files.keys()
+            else:
+                removed_paths = {
+                    os.path.relpath(path, self.dir_path) for path in paths
+                } - disk_files.keys()
+            self.remove_files(connection=connection, paths=removed_paths)
+            connection.commit()
+
+            changed_files = [
+                (path, mtime_ns, size)
+                for path, (mtime_ns, size) in disk_files.items()
+                if indexed_files.get(path) != (mtime_ns, size)
+            ]
+            if len(changed_files) <= WORKSPACE_INDEX_FILES_PER_TASK:
+                self.store_symbols(
+                    connection=connection,
+                    results=extract_symbols(
+                        dir_path=str(self.dir_path), files=changed_files
+                    ),
+                )
+                connection.commit()
+                return len(changed_files)
+
+            if len(changed_files) >= WORKSPACE_INDEX_BULK_FILES:
+                connection.execute('DROP INDEX IF EXISTS symbols_name')
+            with create_process_pool() as executor:
+                futures = {
+                    executor.submit(
+                        extract_symbols,
+                        dir_path=str(self.dir_path),
+                        files=changed_files[
+                            index : index + WORKSPACE_INDEX_FILES_PER_TASK
+                        ],
+                    )
+                    for index in range(
+                        0, len(changed_files), WORKSPACE_INDEX_FILES_PER_TASK
+                    )
+                }
+                try:
+                    while futures:
+                        done, futures = wait(
+                            futures, return_when=FIRST_COMPLETED
+                        )
+                        if is_cancelled():
+                            break
+                        for future in done:
+                            self.store_symbols(
+                                connection=connection,
+                                results=future.result(),
+                            )
+                        connection.commit()
+                finally:
+                    for future in futures:
+                        future.cancel()
+            return len(changed_files)
+        finally:
+            connection.executescript(WORKSPACE_INDEX_NAME_INDEX)
+            connection.close()
+
+    def remove_files(
+        self, connection: sqlite3.Connection, paths: Iterable[str]
+    ) -> None:
+        for path in paths:
+            connection.execute(
+                'DELETE FROM symbols WHERE file_id IN '
+                '(SELECT id FROM files WHERE path = ?)',
+                (path,),
+            )
+            connection.execute('DELETE FROM files WHERE path = ?', (path,))
+
+    def store_symbols(
+        self,
+        connection: sqlite3.Connection,
+        results: list[tuple[IndexedFile, list[Symbol]]],
+    ) -> None:
+        # Removed by path rather than from the files read at the start of the
+        # update, the update of the saved files can store them meanwhile. The
+        # removal and the inserts are in the same transaction
+        self.remove_files(
+            connection=connection,
+            paths=[relative_path for (relative_path, _, _), _ in results],
+        )
+        rows = []
+        for indexed_file, symbols in results:
+            file_id = connection.execute(
+                'INSERT INTO files (path, mtime_ns, size) VALUES (?, ?, ?)',
+                indexed_file,
+            ).lastrowid
+            rows.extend(
+                (name, kind, file_id, line, column)
+                for line, column, _, kind, name in symbols
+                if name
+            )
+        connection.executemany(
+            'INSERT INTO symbols (name, kind, file_id, line, column) '
+            'VALUES (?, ?, ?, ?, ?)',
+            rows,
+        )
+
+    def find(self, prefix: str, limit: int) -> list[WorkspaceSymbol]:
+        prefix = prefix.strip()
+        if not prefix:
+            return []
+        if self.read_connection is None:
+            # Not created until the first update
+            if not self.index_path.exists():
+                return []
+            self.read_connection = self.connect_read_only()
+        return self.read_connection.execute(
+            'SELECT symbols.name, symbols.kind, files.path, symbols.line, '
+            'symbols.column FROM symbols JOIN files '
+            'ON files.id = symbols.file_id '
+            'WHERE symbols.name >= ? COLLATE NOCASE '
+            'AND symbols.name < ? COLLATE NOCASE '
+            'ORDER BY symbols.name COLLATE NOCASE LIMIT ?',
+            (prefix, prefix + '\U0010ffff', limit),
+        ).fetchall()
+
+    def close(self) -> None:
+        if self.read_connection is not None:
+            self.read_connection.close()
+            self.read_connection = None